@@ -1,4 +1,17 @@
+import sys
 import game_enviornment as game
+import maze_pool
 
-APP = game.App("find_exit", (1, 1, 1))
-APP.on_execute()
+# Optional maze dimensions and game mode, e.g.
+# python maze_pro.py 200x200 gather
+DIMENSIONS = (tuple(int(size) for size in sys.argv[1].split('x'))
+              if len(sys.argv) > 1 else (50, 50))
+MODE = sys.argv[2] if len(sys.argv) > 2 else game.FIND_EXIT
+# The single resource of find_exit is the exit, gather spreads resources
+# of 5 to 15 over the maze
+RESOURCES = {game.FIND_EXIT: (1, 1, 1), game.GATHER: (100, 5, 15)}
+
+if __name__ == '__main__':
+    with maze_pool.MazePool(DIMENSIONS, RESOURCES[MODE]) as POOL:
+        APP = game.App(MODE, POOL.resource_allocation, pool=POOL)
+        APP.on_execute()
@@ -0,0 +1,432 @@
+"""Benchmark maze generation, maze graphs, maze players and rendering
+
+Usage:
+    python -m maze_pro.benchmark run [--sizes 25,50,100] [--output FILE]
+    python -m maze_pro.benchmark compare BASELINE RESULTS [--tolerance 0.25]
+
+run measures every benchmark for each maze size and writes the results as
+JSON. It also times importing the core modules in a fresh interpreter and
+exits with a non zero status when that exceeds IMPORT_BUDGET or pulls in
+any of HEAVY_MODULES. compare reports how RESULTS moved relative to
+BASELINE and exits with a non zero status when any benchmark regressed by
+more than the tolerance. Timings only compare on the machine that made
+them, so there is no stored baseline: run the benchmarks before and after a
+change on the same machine and compare the two files. compare refuses
+documents whose SAME_MACHINE meta fields differ.
+Rendering is measured under SDL's dummy video driver, through the fixed
+size view of the game display.
+
+Each result records its value, unit and whether lower or higher is better:
+
+    {"meta": {...}, "results": {"generate.seconds[50x50]":
+        {"value": 0.12, "unit": "s", "better": "lower"}, ...}}
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'maze_pro', 'src'))
+import dfs
+import headless
+import maze
+import maze_graph
+import mining
+import random_mouse
+from construction_log import RECORD_NONE
+
+# Meta fields that must match for two results documents to be compared
+SAME_MACHINE = ('python', 'platform', 'machine', 'node')
+RESOURCES = (1, 1, 1)
+# Modules headless generation and agents need, the seconds a fresh
+# interpreter may spend importing them and the modules they must not import
+CORE_MODULES = ('maze', 'dfs', 'random_mouse')
+IMPORT_BUDGET = 0.3
+HEAVY_MODULES = ('matplotlib', 'pygame', 'scipy', 'tqdm')
+
+
+def timed(function, repeat: int = 5) -> float:
+    """Return the median wall time of repeat calls to function"""
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+def build(size: int, seed: int = 0, **kwargs) -> maze.MazeBuilder:
+    """Build a square maze of the given size without a progress bar"""
+
+    return maze.MazeBuilder((size, size), RESOURCES, seed, progress=False,
+                            **kwargs)
+
+def bench_imports(results: dict, repeat: int = 5):
+    """Time to import CORE_MODULES in a fresh interpreter, and the number of
+
+    HEAVY_MODULES imported along with them
+
+    """
+
+    script = ('import json, sys, time\n'
+              'sys.path.append({!r})\n'
+              'start = time.perf_counter()\n'
+              'import {}\n'
+              'print(json.dumps([time.perf_counter() - start, '
+              '[name for name in {!r} if name in sys.modules]]))').format(
+                  os.path.join(ROOT, 'maze_pro', 'src'),
+                  ', '.join(CORE_MODULES), HEAVY_MODULES)
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', script], check=True,
+                                stdout=subprocess.PIPE).stdout
+        seconds, heavy = json.loads(output)
+        times.append(seconds)
+    results['import.core_seconds'] = (statistics.median(times), 's', 'lower')
+    results['import.heavy_modules'] = (len(heavy), 'modules', 'lower')
+
+def check_imports(results: dict) -> list:
+    """Return the problems with the import time measured by bench_imports"""
+
+    problems = []
+    seconds = results['import.core_seconds']['value']
+    if seconds > IMPORT_BUDGET:
+        problems.append('Importing {} took {:.3f}s, over the {}s budget'.format(
+            ', '.join(CORE_MODULES), seconds, IMPORT_BUDGET))
+    if results['import.heavy_modules']['value']:
+        problems.append('Importing {} loaded one of {}'.format(
+            ', '.join(CORE_MODULES), ', '.join(HEAVY_MODULES)))
+    return problems
+
+def bench_generation(size: int, results: dict):
+    """MazeBuilder construction time and peak traced memory"""
+
+    label = '[{0}x{0}]'.format(size)
+    repeat = 5 if size <= 50 else 1
+    results['generate.seconds' + label] = (timed(lambda: build(size),
+                                                 repeat), 's', 'lower')
+
+    tracemalloc.start()
+    build(size)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    results['generate.peak_mb' + label] = (peak / 2**20, 'MB', 'lower')
+
+def bench_graph(size: int, results: dict):
+    """MazeGraph construction time and compression of the tile grid"""
+
+    label = '[{0}x{0}]'.format(size)
+    builder = build(size, record=RECORD_NONE)
+    results['graph.build_seconds' + label] = (
+        timed(lambda: maze_graph.MazeGraph(builder.maze)), 's', 'lower')
+    graph = maze_graph.MazeGraph(builder.maze)
+    results['graph.nodes_per_tile' + label] = (
+        len(graph) / max(1, int(builder.maze.terrain.sum())), 'ratio', 'lower')
+
+def bench_interface(size: int, results: dict, moves: int = 20000):
+    """PlayerInterface.move and current_visible_tiles throughput"""
+
+    label = '[{0}x{0}]'.format(size)
+    builder = build(size, record=RECORD_NONE)
+    interface = maze.PlayerInterface(builder.dim, RESOURCES, builder=builder)
+    start = interface.player_pos
+    step = next(tile for tile in maze.adjacent_tiles(start, builder.maze)
+                if not builder.is_wall(tile))
+
+    def move():
+        for _ in range(moves // 2):
+            interface.move(step)
+            interface.move(start)
+
+    def look():
+        for _ in range(moves):
+            interface.current_visible_tiles()
+
+    results['interface.move_per_second' + label] = (moves / timed(move, 3),
+                                                    'ops/s', 'higher')
+    results['interface.visible_per_second' + label] = (
+        moves / timed(look, 3), 'ops/s', 'higher')
+
+def bench_agents(size: int, results: dict, episodes: int = 5):
+    """DFS and RobertFrostRandomMouse throughput calling step() for every
+
+    step and taking all the steps with run(), and the peak memory traced
+    while an agent is created and steps through an episode
+
+    """
+
+    label = '[{0}x{0}]'.format(size)
+    agents = {'dfs': lambda interface: dfs.DFS(interface.dimensions, None,
+                                                 interface=interface),
+              'mouse': lambda interface:
+                       random_mouse.RobertFrostRandomMouse(interface, 0)}
+
+    for name, make_agent in agents.items():
+        steps = {False: 0, True: 0}
+        seconds = {False: 0, True: 0}
+        peak = 0
+        for seed in range(episodes):
+            builder = build(size, seed, record=RECORD_NONE)
+            for fast in (False, True):
+                interface = maze.PlayerInterface(builder.dim, RESOURCES,
+                                                 builder=builder)
+                stats = headless.run_episode(make_agent(interface), 50000,
+                                             fast)
+                steps[fast] += stats.steps
+                seconds[fast] += stats.seconds
+
+            # Traced separately, tracing slows the episode down
+            interface = maze.PlayerInterface(builder.dim, RESOURCES,
+                                             builder=builder)
+            tracemalloc.start()
+            headless.run_episode(make_agent(interface), 50000, fast=False)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        for fast, metric in ((False, '.steps_per_second'),
+                             (True, '.run_steps_per_second')):
+            results[name + metric + label] = (
+                steps[fast] / seconds[fast] if seconds[fast] else 0.0,
+                'steps/s', 'higher')
+        results[name + '.peak_kb' + label] = (peak / 2**10, 'KB', 'lower')
+
+def bench_mining(size: int, results: dict, amount: int = 1000):
+    """mining.Mines throughput with size sources shared by 4 * size miners,
+
+    and how much faster than real time the simulation runs
+
+    """
+
+    label = '[{0}x{0}]'.format(size)
+    resources = maze.Resources((size * amount, amount, amount),
+                               maze.make_rng(0))
+    sources = [maze.Tile(x, 0) for x in range(size)]
+    for source in sources:
+        resources.place(source)
+    scheduler = mining.Scheduler()
+    mines = mining.Mines(resources, scheduler)
+
+    async def miner(index):
+        source = sources[index % size]
+        while await mines.mine(source, 10, 5.0):
+            await scheduler.sleep(1.0)
+
+    for index in range(4 * size):
+        scheduler.spawn(miner(index))
+    start = time.perf_counter()
+    scheduler.run()
+    seconds = time.perf_counter() - start
+    if mines.delivered != size * amount:
+        raise ValueError('Miners delivered {} of {}'.format(mines.delivered,
+                                                            size * amount))
+
+    results['mining.steps_per_second' + label] = (scheduler.steps / seconds,
+                                                  'steps/s', 'higher')
+    results['mining.speedup' + label] = (scheduler.now / seconds, 'ratio',
+                                         'higher')
+
+def bench_resource_index(size: int, results: dict, queries: int = 2000):
+    """ResourceIndex nearest and radius queries with a tenth of the tiles
+
+    holding resource, half of which are then mined out
+
+    """
+
+    label = '[{0}x{0}]'.format(size)
+    rng = maze.make_rng(0)
+    tiles = [maze.Tile(rng.randrange(size), rng.randrange(size))
+             for _ in range(size * size // 10)]
+    index = maze.ResourceIndex((size, size), {tile: 1 for tile in tiles})
+    for tile in tiles[::2]:
+        index.update(tile, 0)
+    positions = [maze.Tile(rng.randrange(size), rng.randrange(size))
+                 for _ in range(queries)]
+
+    def nearest():
+        for position in positions:
+            index.nearest(position, 4)
+
+    def within():
+        for position in positions:
+            index.within(position, 5)
+
+    results['resources.nearest_per_second' + label] = (
+        queries / timed(nearest, 3), 'ops/s', 'higher')
+    results['resources.within_per_second' + label] = (
+        queries / timed(within, 3), 'ops/s', 'higher')
+
+def bench_rendering(size: int, results: dict, frames: int = 50):
+    """Loading the image atlas, GameMaze chunk rendering, full and dirty
+
+    rect frame cost and seeking through a construction animation
+
+    """
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    import pygame
+    import atlas
+    import game_enviornment as game
+
+    label = '[{0}x{0}]'.format(size)
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        display = pygame.display.set_mode((1056, 800))
+        images = atlas.atlas()
+        builder = build(size, record=RECORD_NONE)
+        interface = maze.PlayerInterface(builder.dim, RESOURCES,
+                                         builder=builder)
+        game_maze = game.GameMaze(builder.maze, images, 'find_exit',
+                                  resources=interface.resource_index)
+
+        def draw():
+            for _ in range(frames):
+                game_maze.draw(display, interface.current_visible_tiles(),
+                               'maze', interface.player_maze.terrain)
+
+        def draw_dirty():
+            for _ in range(frames):
+                rects = game_maze.update(interface.current_visible_tiles(),
+                                         interface.player_maze.terrain)
+                for rect in rects:
+                    game_maze.draw_area(display, rect, 'maze')
+
+        results['render.atlas_load_seconds' + label] = (
+            timed(atlas.load), 's', 'lower')
+        results['render.maze_chunk_seconds' + label] = (
+            timed(lambda: game_maze.draw_maze_chunk(0, 0)), 's', 'lower')
+        results['render.graph_chunk_seconds' + label] = (
+            timed(lambda: game_maze.draw_graph_chunk(0, 0)), 's', 'lower')
+        constructor = game.MazeConstructor(build(size).construction_log,
+                                           images, display, builder.dim)
+
+        def replay():
+            constructor.seek(0)
+            constructor.seek(None)
+
+        results['render.construction_seek_seconds' + label] = (
+            timed(replay, 3), 's', 'lower')
+        results['render.frame_seconds' + label] = (timed(draw, 3) / frames,
+                                                   's', 'lower')
+        results['render.dirty_frame_seconds' + label] = (
+            timed(draw_dirty, 3) / frames, 's', 'lower')
+    finally:
+        os.chdir(cwd)
+
+BENCHMARKS = [bench_generation, bench_graph, bench_interface, bench_agents,
+              bench_mining, bench_resource_index, bench_rendering]
+
+def run(sizes) -> dict:
+    """Run every benchmark for every size, returning the results document"""
+
+    results = {}
+    bench_imports(results)
+    for size in sizes:
+        for benchmark in BENCHMARKS:
+            benchmark(size, results)
+
+    return {'meta': {'python': platform.python_version(),
+                     'platform': platform.platform(),
+                     'machine': platform.machine(),
+                     'node': platform.node(),
+                     'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                     'sizes': list(sizes)},
+            'results': {name: {'value': value, 'unit': unit, 'better': better}
+                        for name, (value, unit, better)
+                        in sorted(results.items())}}
+
+def machine_differences(baseline: dict, current: dict) -> list:
+    """Return a description of every SAME_MACHINE meta field that differs
+    between two results documents
+    """
+
+    return ['{}: {} != {}'.format(field, baseline['meta'].get(field),
+                                  current['meta'].get(field))
+            for field in SAME_MACHINE
+            if baseline['meta'].get(field) != current['meta'].get(field)]
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list:
+    """Print the change of every benchmark present in both documents
+
+    Return:
+        The names of benchmarks that regressed by more than tolerance.
+    """
+
+    regressions = []
+    for name, result in sorted(current['results'].items()):
+        if name not in baseline['results']:
+            print('{:<45} {:>12.4g} {:<8} (new)'.format(
+                name, result['value'], result['unit']))
+            continue
+
+        before = baseline['results'][name]['value']
+        after = result['value']
+        delta = (after - before) / before if before else 0.0
+        change = delta if result['better'] == 'lower' else -delta
+
+        flag = ''
+        if change > tolerance:
+            flag = 'REGRESSION'
+            regressions.append(name)
+        elif change < -tolerance:
+            flag = 'improved'
+        print('{:<45} {:>12.4g} -> {:<12.4g} {:<8} {:>+7.1%} {}'.format(
+            name, before, after, result['unit'], delta, flag))
+
+    return regressions
+
+def main(argv=None):
+    """Parse arguments and run or compare benchmarks"""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Run the benchmarks')
+    run_parser.add_argument('--sizes', default='25,50,100',
+                            help='Comma separated square maze sizes')
+    run_parser.add_argument('--output', default='benchmark_results.json',
+                            help='File the results are written to')
+
+    compare_parser = commands.add_parser(
+        'compare', help='Flag regressions against a baseline')
+    compare_parser.add_argument(
+        'baseline', help='Results file from the same machine to compare to')
+    compare_parser.add_argument('results', help='Results file to check')
+    compare_parser.add_argument('--tolerance', type=float, default=0.25,
+                                help='Allowed relative slowdown')
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        document = run([int(size) for size in args.sizes.split(',')])
+        with open(args.output, 'w') as output:
+            json.dump(document, output, indent=4)
+        for name, result in document['results'].items():
+            print('{:<45} {:>12.4g} {}'.format(name, result['value'],
+                                               result['unit']))
+        problems = check_imports(document['results'])
+        for problem in problems:
+            print(problem)
+        return 1 if problems else 0
+
+    with open(args.baseline) as baseline, open(args.results) as results:
+        before, after = json.load(baseline), json.load(results)
+    differences = machine_differences(before, after)
+    if differences:
+        print('Results come from different machines, run both on one:')
+        for difference in differences:
+            print('    ' + difference)
+        return 2
+    regressions = compare(before, after, args.tolerance)
+    if regressions:
+        print(str(len(regressions)) + ' benchmark(s) regressed')
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
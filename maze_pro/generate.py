@@ -0,0 +1,115 @@
+"""Generate batches of mazes in parallel from the command line
+
+Usage:
+    python -m maze_pro.generate --count N --dims WxH --workers K [--seed S]
+
+Every maze is built from its own random stream spawned from the root seed
+with numpy.random.SeedSequence, so the same root seed reproduces the same
+mazes byte for byte no matter how many workers share the work or in which
+order they finish. Mazes are written in the binary format of maze_file and
+can be loaded again with maze_file.load_maze.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+from multiprocessing import Pool
+import numpy as np
+from tqdm import tqdm
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+import maze
+import maze_file
+from construction_log import RECORD_NONE
+from maze_pool import maze_seed
+
+
+def maze_seeds(seed, count: int):
+    """Return count independent integer seeds derived from the root seed"""
+
+    return [maze_seed(child)
+            for child in np.random.SeedSequence(seed).spawn(count)]
+
+def build_maze(task):
+    """Build and store a single maze, run inside a worker process
+
+    Args:
+        task: Tuple of (index, seed, dimensions, resources, output directory).
+
+    Return:
+        The index of the maze along with its metadata.
+    """
+
+    index, seed, dimensions, resources, output = task
+    builder = maze.MazeBuilder(dimensions, resources, random.Random(seed),
+                               progress=False, record=RECORD_NONE)
+    maze_file.save_maze(builder,
+                        os.path.join(output, 'maze_{:06d}.mzp'.format(index)))
+
+    return index, {'seed': seed,
+                   'player_start': [int(builder.player_start.x),
+                                    int(builder.player_start.y)],
+                   'resources': [[int(tile.x), int(tile.y), int(amount)]
+                                 for tile, amount in
+                                 builder.resources.locations.items()]}
+
+def parse_dims(text: str) -> (int, int):
+    """Parse dimensions of the form WxH"""
+
+    try:
+        width, height = (int(value) for value in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError('Dimensions must look like 50x50')
+    return width, height
+
+def parse_resources(text: str) -> (int, int, int):
+    """Parse a resource allocation of the form stockpile,min,max"""
+
+    try:
+        stockpile, low, high = (int(value) for value in text.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError('Resources must look like 1,1,1')
+    return stockpile, low, high
+
+def main(argv=None):
+    """Parse arguments and generate the requested mazes"""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=1,
+                        help='Number of mazes to generate')
+    parser.add_argument('--dims', type=parse_dims, default=(50, 50),
+                        help='Maze dimensions as WxH')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='Number of worker processes')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Root seed, random when omitted')
+    parser.add_argument('--resources', type=parse_resources, default=(1, 1, 1),
+                        help='Resource allocation as stockpile,min,max')
+    parser.add_argument('--output', default='mazes',
+                        help='Directory the mazes are written to')
+    args = parser.parse_args(argv)
+
+    seed = args.seed
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+
+    os.makedirs(args.output, exist_ok=True)
+    tasks = [(index, maze_seed, args.dims, args.resources, args.output)
+             for index, maze_seed in enumerate(maze_seeds(seed, args.count))]
+
+    mazes = [None] * args.count
+    with Pool(args.workers) as pool:
+        chunksize = max(1, args.count // (args.workers * 4))
+        for index, metadata in tqdm(pool.imap_unordered(build_maze, tasks,
+                                                        chunksize),
+                                    total=args.count):
+            mazes[index] = metadata
+
+    with open(os.path.join(args.output, 'index.json'), 'w') as index_file:
+        json.dump({'seed': seed, 'dims': list(args.dims),
+                   'resources': list(args.resources), 'mazes': mazes},
+                  index_file, indent=4)
+
+if __name__ == '__main__':
+    main()
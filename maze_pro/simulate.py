@@ -0,0 +1,98 @@
+"""Run maze players headless from the command line
+
+Usage:
+    python -m maze_pro.simulate --agent dfs --dims 50x50 --episodes 10
+
+Each episode builds a fresh maze (seeded from --seed), steps the agent until
+it reaches the exit or --max-steps, and prints the episode statistics. With
+--prefetch the mazes are built ahead of time by a background process while
+the agent runs, producing the same mazes.
+"""
+
+import argparse
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+import dfs
+import headless
+import maze
+import random_mouse
+from maze_pool import MazePool
+from construction_log import RECORD_NONE
+from maze_pro.generate import maze_seeds, parse_dims, parse_resources
+
+AGENTS = {
+    'dfs': lambda interface, seed: dfs.DFS(interface.dimensions, None,
+                                           interface=interface),
+    'mouse': random_mouse.RobertFrostRandomMouse,
+}
+
+
+def main(argv=None):
+    """Parse arguments and run the requested episodes"""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--agent', choices=sorted(AGENTS), default='dfs',
+                        help='Maze player to run')
+    parser.add_argument('--dims', type=parse_dims, default=(50, 50),
+                        help='Maze dimensions as WxH')
+    parser.add_argument('--resources', type=parse_resources, default=(1, 1, 1),
+                        help='Resource allocation as stockpile,min,max')
+    parser.add_argument('--episodes', type=int, default=1,
+                        help='Number of episodes to run')
+    parser.add_argument('--max-steps', type=int, default=100000,
+                        help='Step limit of each episode')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Root seed, random when omitted')
+    parser.add_argument('--prefetch', type=int, default=0,
+                        help='Mazes built ahead in a background process, '
+                             '0 to build each maze when its episode starts')
+    args = parser.parse_args(argv)
+
+    if args.seed is None:
+        args.seed = np.random.SeedSequence().entropy
+    pool = None
+    if args.prefetch:
+        pool = MazePool(args.dims, args.resources, args.prefetch, args.seed,
+                        RECORD_NONE)
+
+    try:
+        run(args, pool)
+    finally:
+        if pool is not None:
+            pool.close()
+
+def run(args, pool: MazePool = None):
+    """Run and report the episodes requested by args, taking the mazes
+
+    from pool when one is given
+
+    """
+
+    total_steps = total_seconds = 0
+    for episode, seed in enumerate(maze_seeds(args.seed, args.episodes)):
+        if pool is None:
+            builder = maze.MazeBuilder(args.dims, args.resources, seed,
+                                       progress=False, record=RECORD_NONE)
+        else:
+            builder = pool.get()
+        interface = maze.PlayerInterface(args.dims, args.resources,
+                                         builder=builder)
+        agent = AGENTS[args.agent](interface, seed)
+        stats = headless.run_episode(agent, args.max_steps)
+        total_steps += stats.steps
+        total_seconds += stats.seconds
+
+        print('episode {}: steps={} unique_tiles={} exit={} '
+              'us_per_step={:.2f}'.format(episode, stats.steps,
+                                          stats.unique_tiles,
+                                          stats.reached_exit,
+                                          stats.seconds_per_step * 1e6))
+
+    if total_seconds:
+        print('total: steps={} steps_per_second={:.0f}'.format(
+            total_steps, total_steps / total_seconds))
+
+if __name__ == '__main__':
+    main()
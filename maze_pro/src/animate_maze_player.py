@@ -1,13 +1,14 @@
 import numpy as np
-import matplotlib.pyplot as pyplot
-from matplotlib import animation
 
 def animated_step(player):
     """Self explanitory"""
 
+    import matplotlib.pyplot as pyplot
+    from matplotlib import animation
+
     def animated_maze():
         pos = player.interface.player_pos
-        animate_maze = np.copy(player.maze)
+        animate_maze = player.maze.astype(int)
         animate_maze[pos.x][pos.y] = -1
 
         return animate_maze
@@ -0,0 +1,221 @@
+"""Every image of the game packed into a single texture atlas
+
+Decoding dozens of small PNGs and converting each of them for the display
+made up most of the time spent loading assets. The images of the
+directories in SOURCES are packed once into one atlas image, cached as raw
+pixels with a table of the region of every image in the user cache
+directory (see cache_path), so starting the game reads a single image that
+needs no decoding and converts it once. The cached atlas is rebuilt
+whenever a source image changes, and images are cut out of the atlas
+surface by name only when they are first used, so every blit of a tile
+reads from the same source surface.
+
+Images are named by their file name without extension, prefixed by the key
+of their directory in SOURCES, e.g. 'wall' or 'link/up_1'.
+"""
+
+import json
+import os
+from typing import Dict, List
+import pygame
+
+# Directories of the images packed, by the prefix of their names
+SOURCES = {'': 'maze_pro/assets/img/enviornment',
+           'link/': 'maze_pro/assets/img/sprite_sheets/link'}
+# Name of the cached atlas in the user cache directory, see cache_path
+CACHE = 'atlas'
+WIDTH = 1024
+
+
+class Atlas():
+    """Images packed into one surface, looked up by name
+
+    Attributes:
+        surface: The pygame.Surface every image is packed into.
+        rects: Dictionary mapping the name of every image to its region of
+            surface.
+
+    Methods:
+        names: Return the names of the images starting with a prefix.
+        frames: Return the images starting with a prefix in name order.
+    """
+
+    def __init__(self, surface: pygame.Surface,
+                 rects: Dict[str, pygame.Rect]):
+        self.surface = surface
+        self.rects = rects
+        self.__images = {}
+
+    def __getitem__(self, name: str) -> pygame.Surface:
+        """Return the image called name, sharing its pixels with surface"""
+
+        image = self.__images.get(name)
+        if image is None:
+            if name not in self.rects:
+                raise KeyError(name)
+            image = self.surface.subsurface(self.rects[name])
+            self.__images[name] = image
+        return image
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.rects
+
+    def __len__(self):
+        return len(self.rects)
+
+    def names(self, prefix: str = '') -> List[str]:
+        """Return the sorted names of the images starting with prefix"""
+
+        return sorted(name for name in self.rects if name.startswith(prefix))
+
+    def frames(self, prefix: str) -> List[pygame.Surface]:
+        """Return the images whose names start with prefix, e.g. the frames
+
+        'link/up_1', 'link/up_2', 'link/up_3' of the prefix 'link/up'
+
+        """
+
+        return [self[name] for name in self.names(prefix)]
+
+
+def cache_path(name: str = CACHE) -> str:
+    """Return the path of a cached atlas in the user cache directory,
+
+    $XDG_CACHE_HOME/maze_pro or ~/.cache/maze_pro, without extension. The
+    atlas is kept in name + '.rgba', the pixels, and name + '.json', its size
+    and the region of every image.
+
+    """
+
+    root = (os.environ.get('XDG_CACHE_HOME')
+            or os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(root, 'maze_pro', name)
+
+def source_files(sources: Dict[str, str] = SOURCES) -> Dict[str, str]:
+    """Return the path of every .png file of sources by its image name"""
+
+    files = {}
+    for prefix, directory in sources.items():
+        for filename in os.listdir(directory):
+            if filename.endswith('.png'):
+                files[prefix + filename[:-4]] = os.path.join(directory,
+                                                             filename)
+    return files
+
+def pack(sizes: Dict[str, tuple], width: int = WIDTH) -> Dict[str, pygame.Rect]:
+    """Place rectangles of the given sizes in rows of at most width pixels
+
+    Rectangles are placed tallest first, left to right along shelves as high
+    as their first rectangle, a new shelf starting below when one is full.
+
+    Return:
+        The region of every rectangle by name.
+    """
+
+    rects = {}
+    left = top = shelf = 0
+    for name in sorted(sizes, key=lambda name: (-sizes[name][1],
+                                                 -sizes[name][0], name)):
+        size = sizes[name]
+        if size[0] > width:
+            raise ValueError('Image wider than the atlas: ' + name)
+        if left + size[0] > width:
+            left, top, shelf = 0, top + shelf, 0
+        rects[name] = pygame.Rect((left, top), size)
+        left += size[0]
+        shelf = max(shelf, size[1])
+    return rects
+
+def build(files: Dict[str, str], width: int = WIDTH) -> Atlas:
+    """Pack the images in files into a new atlas"""
+
+    images = {name: pygame.image.load(path) for name, path in files.items()}
+    rects = pack({name: image.get_size() for name, image in images.items()},
+                 width)
+    height = max([rect.bottom for rect in rects.values()] + [1])
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    surface.fill((0, 0, 0, 0))
+    for name, image in images.items():
+        # Taking the maximum with the cleared atlas copies pixels and alpha
+        # as they are, where alpha blending would change them
+        surface.blit(image, rects[name],
+                     special_flags=pygame.BLEND_RGBA_MAX)
+    return Atlas(surface, rects)
+
+def fingerprint(files: Dict[str, str]) -> Dict[str, list]:
+    """Return the size and modification time of every file, which change
+
+    whenever the atlas needs to be rebuilt
+
+    """
+
+    fingerprints = {}
+    for name, path in files.items():
+        stat = os.stat(path)
+        fingerprints[name] = [stat.st_size, stat.st_mtime_ns]
+    return fingerprints
+
+def save(atlas: Atlas, cache: str, fingerprints: Dict[str, list]):
+    """Write atlas to the cache, with the fingerprints of its sources"""
+
+    os.makedirs(os.path.dirname(os.path.abspath(cache)), exist_ok=True)
+    with open(cache + '.rgba', 'wb') as pixels:
+        pixels.write(pygame.image.tobytes(atlas.surface, 'RGBA'))
+    with open(cache + '.json', 'w') as table:
+        json.dump({'sources': fingerprints,
+                   'size': list(atlas.surface.get_size()),
+                   'rects': {name: list(rect)
+                             for name, rect in atlas.rects.items()}},
+                  table, indent=4, sort_keys=True)
+
+def load(sources: Dict[str, str] = SOURCES, cache: str = None) -> Atlas:
+    """Return the atlas of sources from the cache, packing and caching it
+
+    first if the cache is missing or older than any of the images
+
+    The cache is cache_path() unless another path (without extension) is
+    given. The pixels are converted for the display, which must be set up.
+
+    """
+
+    if cache is None:
+        cache = cache_path()
+    files = source_files(sources)
+    fingerprints = fingerprint(files)
+    try:
+        with open(cache + '.json') as table:
+            document = json.load(table)
+        if document['sources'] != fingerprints:
+            raise ValueError('Stale atlas cache')
+        with open(cache + '.rgba', 'rb') as pixels:
+            surface = pygame.image.frombuffer(pixels.read(),
+                                              tuple(document['size']), 'RGBA')
+        rects = {name: pygame.Rect(rect)
+                 for name, rect in document['rects'].items()}
+    except (OSError, ValueError, KeyError, pygame.error):
+        atlas = build(files)
+        try:
+            save(atlas, cache, fingerprints)
+        except (OSError, pygame.error):
+            # Without a writable cache the atlas is packed every time
+            pass
+        surface, rects = atlas.surface, atlas.rects
+
+    return Atlas(surface.convert_alpha(), rects)
+
+
+ATLAS = None
+
+def atlas() -> Atlas:
+    """Return the Atlas shared by the whole game, loaded on first use"""
+
+    global ATLAS
+    if ATLAS is None:
+        ATLAS = load()
+    return ATLAS
+
+def release():
+    """Drop the shared Atlas, whose surface must not outlive pygame.quit"""
+
+    global ATLAS
+    ATLAS = None
@@ -0,0 +1,272 @@
+"""Vectorized construction of many mazes at once
+
+The MazeBuilder moves individual Tile objects through Python loops while it
+builds a maze. When thousands of mazes are needed (e.g. training data) the
+per tile overhead dominates, so this module runs the same Wilson style loop
+erased random walk over a stacked (batch, x, y) terrain array, advancing the
+walkers of every maze in the batch with a handful of NumPy operations.
+"""
+
+from typing import List
+import numpy as np
+import maze as maze
+
+# Shifts applied to a walker for each direction, in the priority order used by
+# maze.adjacent_tiles (the last walkable neighbour in this order is preferred)
+OFFSETS = np.array([(0, 1), (0, -1), (1, 0), (-1, 0)], dtype=np.int64)
+# Most steps a walker takes in one round of NumPy operations
+STRIDE = 32
+
+
+class BatchMazeBuilder():
+    """Random construction of a batch of mazes using vectorized walkers
+
+    Every maze in the batch is built with the same rules as MazeBuilder: a
+    zone around the player start is cleared, resources are placed on random
+    available tiles and connected to the maze with a loop erased random walk,
+    then walks are started from random available tiles until none remain.
+    Every maze always has exactly one walker, and as soon as a walk reaches
+    the maze it is carved and the next walk of that maze begins, so no maze
+    waits on the others.
+
+    Loop erasure is implicit: each walker records the direction it last left
+    a tile in, so following those directions from the start of a walk yields
+    the loop erased path. Tiles are addressed by their flat index x * y_dim + y
+    into the (batch, x * y) views of the terrain.
+
+    Away from the maze and the boundary every step is a uniform choice of the
+    four directions, so walkers take up to STRIDE such steps in one round of
+    NumPy operations. Walk starts are found through the number of available
+    tiles in every column of each maze, kept up to date as paths are carved,
+    so neither starting nor carving a walk scans the whole maze.
+
+    Attributes:
+        count: The number of mazes in the batch.
+        dim: Dimensions of every maze in the batch (x, y).
+        terrain: A boolean array of shape (count, x, y), True is walkable.
+        resource_allocation: Data used to construct a Resource class for each
+            maze in the batch.
+        player_start: A list of starting Tiles, one per maze.
+        resources: A list of Resource class objects, one per maze, each
+            placing any further resource with a random stream seeded from
+            rng.
+        rng: The numpy.random.Generator driving construction.
+
+    Methods:
+        __build_mazes: Drive the vectorized construction of the batch.
+        __start_walks: Select the next walk start in each given maze, placing
+            resources while the stockpile lasts.
+        __carve: Clear the loop erased paths of finished walks.
+        mazes: Return the batch as a list of Maze dataclass objects.
+    """
+
+    def __init__(self, count: int, dimensions: (int, int),
+                 resource_allocation: (int, int, int), seed=None):
+
+        if dimensions[0] < 3 or dimensions[1] < 3:
+            raise ValueError('Dimensions ' + str(dimensions)
+                             + ' leave no room for a maze interior')
+
+        self.count = count
+        self.dim = dimensions
+        self.terrain = np.zeros((count,) + tuple(dimensions), dtype=bool)
+        self.resource_allocation = resource_allocation
+        self.player_start = []
+        self.resources = []
+        self.rng = np.random.default_rng(seed)
+
+        width, height = dimensions
+        self.__shift = OFFSETS[:, 0] * height + OFFSETS[:, 1]
+        self.__terrain = self.terrain.reshape(count, width * height)
+        self.__available = np.zeros_like(self.__terrain)
+        self.__exits = np.zeros(self.__terrain.shape, dtype=np.int8)
+        self.__near = np.zeros_like(self.__terrain)
+        self.__stockpile = np.full(count, resource_allocation[0])
+        self.__locations = [{} for _ in range(count)]
+
+        self.__build_mazes()
+
+        # Resource placed after construction draws from a stream of its own,
+        # seeded from rng rather than the global random module
+        for index, stream in enumerate(self.rng.integers(2 ** 63, size=count)):
+            resources = maze.Resources(resource_allocation,
+                                       maze.make_rng(int(stream)))
+            resources.locations = self.__locations[index]
+            resources.stockpile = int(self.__stockpile[index])
+            self.resources.append(resources)
+
+    def __build_mazes(self):
+        """Construct every maze in the batch
+
+        Clears the zone around each player start then advances one walker per
+        maze. Walkers that step onto walkable terrain are carved and replaced
+        by a walker from a new start until a maze has no available tiles.
+
+        """
+
+        width, height = self.dim
+        starts = np.column_stack((self.rng.integers(1, width - 1, self.count),
+                                  self.rng.integers(1, height - 1, self.count)))
+        self.player_start = [maze.Tile(int(x), int(y)) for x, y in starts]
+
+        # Clear the zone around the player start, matching maze.clear_zone
+        shift = np.arange(-3, 3)
+        zone_x = np.clip(starts[:, 0, None] + shift, 1, width - 2)
+        zone_y = np.clip(starts[:, 1, None] + shift, 1, height - 2)
+        batch = np.arange(self.count)[:, None, None]
+        self.terrain[batch, zone_x[:, :, None], zone_y[:, None, :]] = True
+
+        available = self.__available.reshape(self.terrain.shape)
+        available[:, 1:-1, 1:-1] = ~self.terrain[:, 1:-1, 1:-1]
+        self.__counts = available.sum(axis=2, dtype=np.int64)
+
+        # Walk direction lookup for every tile: the number of neighbours
+        # inside the maze boundary and the directions leading to them
+        grid_x, grid_y = np.indices(self.dim).reshape(2, -1)
+        around_x = grid_x[:, None] + OFFSETS[:, 0]
+        around_y = grid_y[:, None] + OFFSETS[:, 1]
+        valid = ((around_x >= 1) & (around_x <= width - 2)
+                 & (around_y >= 1) & (around_y <= height - 2))
+        choices = valid.sum(axis=1)
+        directions = np.argsort(~valid, axis=1, kind='stable')
+        # Tiles a walker leaves in any of the four directions, unless they
+        # are next to walkable terrain
+        roomy = choices == 4
+
+        near = self.__near.reshape(self.terrain.shape)
+        near[:, 1:-1, 1:-1] = (self.terrain[:, 2:, 1:-1]
+                               | self.terrain[:, :-2, 1:-1]
+                               | self.terrain[:, 1:-1, 2:]
+                               | self.terrain[:, 1:-1, :-2])
+
+        walkers, starts = self.__start_walks(np.arange(self.count))
+        pos = starts.copy()
+        size = width * height
+        exits = self.__exits.reshape(-1)
+
+        while walkers.size:
+            # Take up to STRIDE uniform steps at once, for as long as the
+            # walker stays on roomy tiles away from walkable terrain
+            draws = self.rng.random((walkers.size, STRIDE))
+            moves = (draws * 4).astype(np.int64)
+            path = np.empty((walkers.size, STRIDE + 1), dtype=np.int64)
+            path[:, 0] = pos
+            np.cumsum(self.__shift[moves], axis=1, out=path[:, 1:])
+            path[:, 1:] += pos[:, None]
+            left = np.clip(path[:, :-1], 0, size - 1)
+            free = roomy[left] & ~self.__near[walkers[:, None], left]
+            run = np.where(free.all(axis=1), STRIDE, np.argmin(free, axis=1))
+
+            # Later visits of a tile overwrite its exit, as one step at a
+            # time would
+            taken = np.arange(STRIDE) < run[:, None]
+            tiles = (walkers[:, None] * size + path[:, :-1])[taken][::-1]
+            tiles, last = np.unique(tiles, return_index=True)
+            exits[tiles] = moves[taken][::-1][last]
+            pos = path[np.arange(walkers.size), run]
+
+            # The walkers stopped short take their next step on their own:
+            # uniform among neighbours inside the maze boundary, unless a
+            # neighbour is walkable in which case the last one found wins
+            stopped = np.flatnonzero(run < STRIDE)
+            if not stopped.size:
+                continue
+            walking = walkers[stopped]
+            here = pos[stopped]
+            around = here[:, None] + self.__shift
+            walkable = self.__terrain[walking[:, None], around]
+            pick = (draws[stopped, run[stopped]]
+                    * choices[here]).astype(np.int64)
+            direction = directions[here, pick]
+            reached = walkable.any(axis=1)
+            direction[reached] = 3 - np.argmax(walkable[reached, ::-1], axis=1)
+
+            self.__exits[walking, here] = direction
+            pos[stopped] = around[np.arange(stopped.size), direction]
+
+            if reached.any():
+                done = stopped[reached]
+                self.__carve(walkers[done], starts[done])
+                fresh, fresh_starts = self.__start_walks(walkers[done])
+                going = np.ones(walkers.size, dtype=bool)
+                going[done] = False
+                walkers = np.concatenate((walkers[going], fresh))
+                starts = np.concatenate((starts[going], fresh_starts))
+                pos = np.concatenate((pos[going], fresh_starts))
+
+    def __start_walks(self, batch: np.ndarray) -> (np.ndarray, np.ndarray):
+        """Choose a uniformly random available tile in each maze of batch
+
+        Mazes without available tiles are complete and are dropped. While a
+        maze has stockpile left a resource is placed on its chosen tile.
+
+        Return:
+            The mazes that start a new walk, and the flat index of each start.
+        """
+
+        # The column holding the pick comes from the counts, then the tile
+        # from the column, so no walk scans the whole maze
+        running = np.cumsum(self.__counts[batch], axis=1)
+        remaining = running[:, -1] > 0
+        batch, running = batch[remaining], running[remaining]
+        pick = (self.rng.random(batch.size) * running[:, -1]).astype(np.int64)
+        column = np.argmax(running > pick[:, None], axis=1)
+        pick -= running[np.arange(batch.size), column] - self.__counts[
+            batch, column]
+        height = self.dim[1]
+        cells = self.__available.reshape(self.terrain.shape)[batch, column]
+        row = np.argmax(np.cumsum(cells, axis=1) > pick[:, None], axis=1)
+        starts = column * height + row
+
+        placing = self.__stockpile[batch] > 0
+        if placing.any():
+            low, high = self.resource_allocation[1], self.resource_allocation[2]
+            place = batch[placing]
+            amounts = np.minimum(self.rng.integers(low, high + 1, place.size),
+                                 self.__stockpile[place])
+            self.__stockpile[place] -= amounts
+            for index, start, amount in zip(place, starts[placing], amounts):
+                tile = maze.Tile(*(int(a) for a in divmod(start, self.dim[1])))
+                self.__locations[index][tile] = int(amount)
+
+        return batch, starts
+
+    def __carve(self, batch: np.ndarray, starts: np.ndarray):
+        """Follow the recorded exits from each start, clearing every loop
+
+        erased path and marking all tiles adjacent to it as unavailable
+
+        """
+
+        # Follow every path to the walkable tile it ends on, then clear the
+        # paths and mark the tiles around them all at once
+        size = self.dim[0] * self.dim[1]
+        terrain = self.__terrain.reshape(-1)
+        exits = self.__exits.reshape(-1)
+        pos = batch * size + starts
+        paths = []
+        ends = []
+        while pos.size:
+            ending = terrain[pos]
+            ends.append(pos[ending])
+            pos = pos[~ending]
+            paths.append(pos)
+            pos = pos + self.__shift[exits[pos]]
+        path = np.concatenate(paths)
+        terrain[path] = True
+        self.__near.reshape(-1)[(path[:, None] + self.__shift).ravel()] = True
+
+        around = np.unique((np.concatenate(
+            [path] + ends)[:, None] + self.__shift).ravel())
+        available = self.__available.reshape(-1)
+        covered = around[available[around]]
+        available[covered] = False
+        self.__counts -= np.bincount(covered // self.dim[1],
+                                     minlength=self.__counts.size).reshape(
+                                         self.__counts.shape)
+
+    def mazes(self) -> List[maze.Maze]:
+        """Return each maze in the batch as a Maze sharing the terrain array"""
+
+        return [maze.Maze(self.terrain[index], self.dim)
+                for index in range(self.count)]
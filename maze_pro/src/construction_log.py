@@ -0,0 +1,343 @@
+"""Compact recording of the steps taken while constructing a maze
+
+A construction log is a sequence of events, each an opcode (seek, reset or
+clear) applied to a run of tiles. Coordinates are packed into typed arrays
+rather than lists of tuples, and seek events only store the tiles a walker
+added since the previous seek: the walker's path is the previous seek path
+truncated to keep tiles and extended by the new tiles. This keeps the log
+linear in the number of walk steps rather than in steps times path length.
+
+Logs can be written to (and streamed to) a binary file. On disk each event
+is stored as varints, and with the delta encoding each coordinate is stored
+as the zigzag encoded difference from the previous one, which takes a single
+byte for the unit steps a walker makes.
+"""
+
+import json
+from array import array
+from typing import Iterator, List, Tuple
+import numpy as np
+
+SEEK, RESET, CLEAR = 0, 1, 2
+COLORS = ('seek', 'reset', 'clear')
+
+RECORD_NONE = 'none'
+RECORD_STEPS = 'steps'
+
+ENCODING_RAW = 'raw'
+ENCODING_DELTA = 'delta'
+ENCODINGS = (ENCODING_RAW, ENCODING_DELTA)
+
+MAGIC = b'MZCL'
+VERSION = 1
+
+
+class ConstructionLog():
+    """Array backed log of maze construction events
+
+    Attributes:
+        level: RECORD_STEPS to record every event, RECORD_NONE to discard
+            everything (headless generation).
+        color_map: Dictionary mapping each step type to a color or image name.
+        speed: Playback speed hint for animations.
+        opcodes: Opcode of every event.
+        keeps: Number of tiles a seek event keeps from the previous seek path.
+        ends: End offset of every event's coordinates in coords.
+        coords: Interleaved x, y coordinates of all events.
+        stream: Binary file events are streamed to instead of being kept in
+            memory, or None.
+        encoding: Encoding used for streamed events.
+
+    Methods:
+        recording: Return True if events are being recorded.
+        seek: Record a walker extending its path.
+        reset: Record tiles a walker erased from its path.
+        clear: Record tiles cleared in the maze.
+        write: Write the log to a binary file.
+        load: Read a log written by write (or streamed) from a binary file.
+        as_json: Return the log in the legacy construction_json format.
+    """
+
+    def __init__(self, level: str = RECORD_STEPS, dimensions=None,
+                 stream=None, encoding: str = ENCODING_DELTA):
+        if level not in (RECORD_NONE, RECORD_STEPS):
+            raise ValueError('Unknown recording level: ' + str(level))
+        if encoding not in ENCODINGS:
+            raise ValueError('Unknown encoding: ' + str(encoding))
+
+        self.level = level
+        self.color_map = {'seek': (100, 100, 100),
+                          'reset': 'wall',
+                          'clear': 'walkable'}
+        self.speed = 1
+        self.opcodes = array('B')
+        self.keeps = array('I')
+        self.ends = array('Q')
+        small = dimensions is not None and max(dimensions) <= 0xffff
+        self.coords = array('H' if small else 'I')
+        self.stream = stream
+        self.encoding = encoding
+        self.__count = 0
+        self.__last = (0, 0)
+
+        if self.stream is not None and self.recording():
+            write_header(self.stream, self.color_map, self.speed, encoding)
+
+    def __len__(self):
+        return self.__count
+
+    def __iter__(self) -> Iterator[Tuple[str, List[Tuple[int, int]]]]:
+        """Yield (color, tiles) for each event, seek events yielding the
+
+        walker's full path as it was when the event was recorded
+
+        """
+
+        if self.stream is not None:
+            raise ValueError('A streamed log must be replayed with read_events')
+
+        walker = []
+        start = 0
+        for opcode, keep, end in zip(self.opcodes, self.keeps, self.ends):
+            values = self.coords[start:end]
+            tiles = list(zip(values[0::2], values[1::2]))
+            start = end
+            if opcode == SEEK:
+                del walker[keep:]
+                walker.extend(tiles)
+                tiles = list(walker)
+            yield COLORS[opcode], tiles
+
+    def recording(self) -> bool:
+        """Return True if events are recorded at the current level"""
+
+        return self.level != RECORD_NONE
+
+    def seek(self, tiles, keep: int = 0):
+        """Record the walker path: the last seek path truncated to keep
+
+        tiles then extended by tiles
+
+        """
+
+        self.__record(SEEK, tiles, keep)
+
+    def reset(self, tiles):
+        """Record tiles erased from the walker path"""
+
+        self.__record(RESET, tiles)
+
+    def clear(self, tiles):
+        """Record tiles cleared in the maze"""
+
+        self.__record(CLEAR, tiles)
+
+    def __record(self, opcode: int, tiles, keep: int = 0):
+        if not self.recording():
+            return
+
+        self.__count += 1
+        if self.stream is not None:
+            coords = np.array([(tile.x, tile.y) for tile in tiles],
+                              dtype=np.int64).reshape(-1, 2)
+            self.__last = write_event(self.stream, opcode, keep, coords,
+                                      self.encoding, self.__last)
+            return
+
+        for tile in tiles:
+            self.coords.append(tile.x)
+            self.coords.append(tile.y)
+        self.opcodes.append(opcode)
+        self.keeps.append(keep)
+        self.ends.append(len(self.coords))
+
+    def write(self, file, encoding: str = ENCODING_DELTA):
+        """Write every event to the binary file object file"""
+
+        if self.stream is not None:
+            raise ValueError('Events of a streamed log are already written')
+
+        write_header(file, self.color_map, self.speed, encoding)
+        coords = np.frombuffer(self.coords, dtype=self.coords.typecode)
+        coords = coords.astype(np.int64).reshape(-1, 2)
+        last = (0, 0)
+        start = 0
+        for opcode, keep, end in zip(self.opcodes, self.keeps, self.ends):
+            last = write_event(file, opcode, keep, coords[start // 2:end // 2],
+                               encoding, last)
+            start = end
+
+    @classmethod
+    def load(cls, file) -> 'ConstructionLog':
+        """Read a log from the binary file object file into memory"""
+
+        header = read_header(file)
+        log = cls(RECORD_STEPS)
+        log.color_map, log.speed = header['color_map'], header['speed']
+        for opcode, keep, coords in read_raw_events(file, header['encoding']):
+            log.coords.extend(coords.ravel().tolist())
+            log.opcodes.append(opcode)
+            log.keeps.append(keep)
+            log.ends.append(len(log.coords))
+            log.__count += 1
+
+        return log
+
+    def as_json(self) -> dict:
+        """Return the log in the legacy construction_json dict format"""
+
+        return {'color_map': dict(self.color_map),
+                'speed': self.speed,
+                'steps': [{color: tiles} for color, tiles in self]}
+
+
+def read_events(file) -> Iterator[Tuple[str, List[Tuple[int, int]]]]:
+    """Lazily replay a log from a binary file, yielding (color, tiles) like
+
+    iterating over a ConstructionLog
+
+    """
+
+    header = read_header(file)
+    walker = []
+    for opcode, keep, coords in read_raw_events(file, header['encoding']):
+        tiles = [tuple(tile) for tile in coords.tolist()]
+        if opcode == SEEK:
+            del walker[keep:]
+            walker.extend(tiles)
+            tiles = list(walker)
+        yield COLORS[opcode], tiles
+
+def write_header(file, color_map: dict, speed, encoding: str):
+    """Write the file magic, version, encoding and playback settings"""
+
+    settings = json.dumps({'color_map': color_map, 'speed': speed}).encode()
+    file.write(MAGIC + bytes((VERSION, ENCODINGS.index(encoding))))
+    file.write(encode_varints(np.array([len(settings)])))
+    file.write(settings)
+
+def read_header(file) -> dict:
+    """Read and validate the header written by write_header"""
+
+    preamble = file.read(len(MAGIC) + 2)
+    if preamble[:len(MAGIC)] != MAGIC:
+        raise ValueError('Not a construction log file')
+    if preamble[len(MAGIC)] != VERSION:
+        raise ValueError('Unsupported construction log version: '
+                         + str(preamble[len(MAGIC)]))
+
+    settings = json.loads(file.read(read_varint(file)).decode())
+    color_map = {color: tuple(value) if isinstance(value, list) else value
+                 for color, value in settings['color_map'].items()}
+
+    return {'color_map': color_map, 'speed': settings['speed'],
+            'encoding': ENCODINGS[preamble[len(MAGIC) + 1]]}
+
+def write_event(file, opcode: int, keep: int, coords: np.ndarray,
+                encoding: str, last: (int, int)) -> (int, int):
+    """Write a single event, returning the last coordinate written
+
+    Each event is the opcode byte followed by varints for keep, the number
+    of tiles and the payload size, then the payload of coordinates.
+
+    """
+
+    if encoding == ENCODING_DELTA:
+        deltas = np.diff(coords, axis=0, prepend=np.array([last]))
+        payload = encode_varints(zigzag(deltas.ravel()))
+    else:
+        payload = coords.astype('<u4').tobytes()
+
+    file.write(bytes((opcode,)))
+    file.write(encode_varints(np.array([keep, len(coords), len(payload)])))
+    file.write(payload)
+
+    if len(coords):
+        last = (int(coords[-1, 0]), int(coords[-1, 1]))
+    return last
+
+def read_raw_events(file, encoding: str) -> Iterator[Tuple[int, int,
+                                                           np.ndarray]]:
+    """Yield (opcode, keep, coords) for every event remaining in file"""
+
+    last = np.zeros(2, dtype=np.int64)
+    while True:
+        opcode = file.read(1)
+        if not opcode:
+            return
+        keep, count, size = (read_varint(file) for _ in range(3))
+        payload = file.read(size)
+
+        if encoding == ENCODING_DELTA:
+            deltas = unzigzag(decode_varints(payload)).reshape(count, 2)
+            deltas[:1] += last
+            coords = np.cumsum(deltas, axis=0)
+        else:
+            coords = np.frombuffer(payload, dtype='<u4').astype(np.int64)
+            coords = coords.reshape(count, 2)
+        if count:
+            last = coords[-1]
+
+        yield opcode[0], keep, coords
+
+def zigzag(values: np.ndarray) -> np.ndarray:
+    """Map signed integers onto unsigned ones, small magnitudes first"""
+
+    values = values.astype(np.int64)
+    return ((values << 1) ^ (values >> 63)).astype(np.uint64)
+
+def unzigzag(values: np.ndarray) -> np.ndarray:
+    """Invert zigzag"""
+
+    values = values.astype(np.uint64)
+    return ((values >> np.uint64(1)).astype(np.int64)
+            ^ -(values & np.uint64(1)).astype(np.int64))
+
+def encode_varints(values: np.ndarray) -> bytes:
+    """Encode unsigned integers as LEB128 varints"""
+
+    values = np.asarray(values, dtype=np.uint64).ravel()
+    if not values.size:
+        return b''
+
+    lengths = np.ones(values.size, dtype=np.int64)
+    rest = values >> np.uint64(7)
+    while rest.any():
+        lengths += rest > 0
+        rest >>= np.uint64(7)
+
+    groups = np.arange(lengths.max(), dtype=np.uint64)
+    encoded = (values[:, None] >> (np.uint64(7) * groups)) & np.uint64(0x7f)
+    more = groups[None, :] < (lengths[:, None] - 1).astype(np.uint64)
+    encoded = (encoded | (more.astype(np.uint64) << np.uint64(7)))
+    used = groups[None, :] < lengths[:, None].astype(np.uint64)
+
+    return encoded.astype(np.uint8)[used].tobytes()
+
+def decode_varints(data: bytes) -> np.ndarray:
+    """Decode a buffer of LEB128 varints"""
+
+    data = np.frombuffer(data, dtype=np.uint8)
+    if not data.size:
+        return np.zeros(0, dtype=np.uint64)
+
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    groups = np.arange(data.size) - np.repeat(starts, ends - starts + 1)
+    values = ((data & 0x7f).astype(np.uint64)
+              << (np.uint64(7) * groups.astype(np.uint64)))
+
+    return np.add.reduceat(values, starts)
+
+def read_varint(file) -> int:
+    """Read a single varint from a binary file object"""
+
+    value = shift = 0
+    while True:
+        byte = file.read(1)
+        if not byte:
+            raise EOFError('Truncated construction log')
+        value |= (byte[0] & 0x7f) << shift
+        shift += 7
+        if byte[0] < 0x80:
+            return value
@@ -1,25 +1,32 @@
 import random
+from array import array
 from typing import List, Dict
 import numpy as np
 import maze as maze
 
+# Visit counts stop growing at the largest value of their uint16 grid
+MAX_VISITS = np.iinfo(np.uint16).max
+
 class DFS():
     """A maze player that traverses the environment using DFS
     
     Attributes:
-        interface: a PlayerInterface object
-        visited: A dictionary of the form Tile:Int where Tile is a location in
-            the maze and int is the number of times the player has been
-            to the tile.
-        path: A stack that assists DFS, contains a sequence of tiles from the
-            start position to the current position with all backtracked
-            tiles popped from the stack.
+        interface: a PlayerInterface object, created from dimensions,
+            resources and seed unless one is provided.
+        visited: uint16 array (x, y) of the number of times the player has
+            been to every tile, saturating at MAX_VISITS. Tiles the player
+            has never been to hold 0.
+        path: A stack that assists DFS, an array('I') of the flat indices
+            (x * height + y) of a sequence of tiles from the start position
+            to the current position with all backtracked tiles popped from
+            the stack.
         direction: A dictionary mapping coordinate shifts in the matrix
             representation of the maze to strings representing direction.
 
     Methods:
         step: Preform a single move to an adjacent tile, returning the tile and
             direction of the move.
+        run: Take up to a number of steps at once, stopping on the exit.
         maze_dfs: Preform the logic of DFS. Given current tile and the visited
             attribute select an unvisited tile or invoke backtrack.
         backtrack: Pop the path stack returning this tile and its direction.
@@ -27,12 +34,16 @@ class DFS():
             apart, return the direction from source to target.
         walkable_tiles: Return the set of walkable tile from the player position.
         is_walkable: Return true if given tile is not a wall.
+        path_tiles: Return the tiles of the path stack.
     """
 
-    def __init__(self, dimensions, resources):
-        self.interface = maze.PlayerInterface(dimensions, resources)
-        self.visited = {}
-        self.path = []
+    def __init__(self, dimensions, resources, seed=None, interface=None):
+        if interface is None:
+            interface = maze.PlayerInterface(dimensions, resources, seed)
+        self.interface = interface
+        self.visited = np.zeros(interface.player_maze.terrain.shape,
+                                dtype=np.uint16)
+        self.path = array('I')
         self.direction = {'up': (0, -1), 'down': (0, 1), 
                           'left': (-1, 0), 'right': (1, 0)}
 
@@ -42,37 +53,81 @@ class DFS():
         possible_tiles = self.walkable_tiles()
         direction, dest_tile = self.maze_dfs(possible_tiles)
 
-        self.interface.move(dest_tile)
-        self.visited[dest_tile] = self.visited[dest_tile] + 1
-        self.path.append(dest_tile)
+        self.interface.move_to(dest_tile)
+        if self.visited[dest_tile.x, dest_tile.y] < MAX_VISITS:
+            self.visited[dest_tile.x, dest_tile.y] += 1
+        self.path.append(dest_tile.x * self.visited.shape[1] + dest_tile.y)
         return direction, dest_tile
 
+    def run(self, max_steps: int) -> np.ndarray:
+        """Step until the player stands on the exit (a resource tile) or
+
+        max_steps steps were taken, moving exactly as calls to step would
+
+        The steps are taken on flat copies of the padded tile types, visit
+        counts and path stack with no Tile, dictionary or NumPy work per
+        step, then handed to the interface with a single
+        PlayerInterface.walk. Tiles next to the player are always in view,
+        so the tile types are the knowledge step would read.
+
+        Return:
+            int64 array (n, 2) of the (x, y) of the tiles stepped to.
+        """
+
+        interface = self.interface
+        grid = interface.tile_type_grid()
+        columns = grid.shape[1]
+        height = columns - 2
+        types = grid.tobytes()
+        visited = array('H', np.pad(self.visited, 1).tobytes())
+        path = [(index // height + 1) * columns + index % height + 1
+                for index in self.path]
+        pos = interface.player_pos
+        position = (pos.x + 1) * columns + pos.y + 1
+        # up, left, right and down, the order maze_dfs tries them in
+        offsets = (-1, -columns, columns, 1)
+        wall, exit_tile = maze.WALL, maze.RESOURCE
+
+        trace = []
+        while len(trace) < max_steps and types[position] != exit_tile:
+            for offset in offsets:
+                dest = position + offset
+                if types[dest] != wall and not visited[dest]:
+                    break
+            else:
+                path.pop()
+                dest = path.pop()
+            if visited[dest] < MAX_VISITS:
+                visited[dest] += 1
+            path.append(dest)
+            trace.append(dest)
+            position = dest
+
+        tiles = np.column_stack(divmod(np.array(trace, dtype=np.int64),
+                                       columns)) - 1
+        interface.walk(tiles)
+        self.visited[...] = np.frombuffer(visited, dtype=np.uint16).reshape(
+            grid.shape)[1:-1, 1:-1]
+        self.path = array('I', [(index // columns - 1) * height
+                                + index % columns - 1 for index in path])
+        return tiles
+
     def maze_dfs(self, tiles: Dict[str, maze.Tile]) -> maze.Tile:
         """Select direction to travel according to DFS protocol"""
 
-        dest = None
-        direct = None
-        if 'up' in tiles and tiles['up'] not in self.visited:
-            dest, direct = tiles['up'], 'up'
-        elif 'left' in tiles and tiles['left'] not in self.visited:
-            dest, direct = tiles['left'], 'left'
-        elif 'right' in tiles and tiles['right'] not in self.visited:
-            dest, direct = tiles['right'], 'right'
-        elif 'down' in tiles and tiles['down'] not in self.visited:
-            dest, direct = tiles['down'], 'down'
-
-        if dest:
-            self.visited[dest] = 0
-        else:
-            direct, dest = self.backtrack()
+        for direct in ('up', 'left', 'right', 'down'):
+            dest = tiles.get(direct)
+            if dest is not None and not self.visited[dest.x, dest.y]:
+                return direct, dest
 
-        return direct, dest
+        return self.backtrack()
 
     def backtrack(self) -> maze.Tile:
         """Retrace path back to a tile with unvisited neighbors"""
 
         self.path.pop()
-        destination = self.path.pop()
+        destination = maze.Tile(*divmod(self.path.pop(),
+                                        self.visited.shape[1]))
         direction = self.get_direction(destination)
 
         return direction, destination
@@ -106,6 +161,9 @@ class DFS():
     def is_walkable(self, tile: maze.Tile) -> bool:
         """Return True if the given tile is not a wall"""
 
+        width, height = self.interface.player_maze.terrain.shape
+        if not (0 <= tile.x < width and 0 <= tile.y < height):
+            return False
         tile_value = self.interface.player_maze.terrain[tile.x][tile.y]
         if tile_value == 3:
             return True
@@ -115,3 +173,9 @@ class DFS():
             return False
         if tile_value == 0:
             raise ValueError('Tile: ' + str(tile) + ' is undiscovered')
+
+    def path_tiles(self) -> List[maze.Tile]:
+        """Return the tiles of the path stack, oldest first"""
+
+        return [maze.Tile(*divmod(index, self.visited.shape[1]))
+                for index in self.path]
@@ -1,427 +1,684 @@
 """Run a demo game"""
 
-import random
 import sys
 import os
+import queue
 import time
 from typing import List, Dict
 import numpy
 import pygame.locals
 import pygame
 sys.path.append('..')
+import atlas
 import dfs as dfs
+import hud
 import maze
-pygame.font.init()
-pygame.init()
-pygame.mixer.quit()
+import maze_graph
+import maze_pool
+import mining
+import solver
+import viewport
+
+# Regions of the display showing the maze and the user interface panel
+VIEW = pygame.Rect(0, 0, 800, 800)
+PANEL = pygame.Rect(800, 0, 256, 800)
+# Background behind the construction statistics
+STATISTICS_AREA = pygame.Rect(816, 300, 224, 80)
+# Region of the minimap
+MINI_MAP = pygame.Rect(828, 572, 200, 200)
+# Default construction playback rate and time each frame may spend on it
+STEPS_PER_SECOND = 500
+FRAME_BUDGET = 0.01
+# Player steps per second at normal speed, and the speeds the simulation can
+# be fast forwarded to, None stepping as fast as the frame budget allows
+TICKS_PER_SECOND = 2.5
+SPEEDS = (1, 10, 1000, None)
+# Frame rate the game is drawn at, whatever the speed of the simulation
+FPS = 60
+# Game modes, reaching the exit (the single resource of the maze) or
+# exploring while miners gather every resource found
+FIND_EXIT = 'find_exit'
+GATHER = 'gather'
+# Miners sent to every resource found in GATHER mode, the amount each of
+# them carries and the amount mined per simulated second
+MINERS_PER_SOURCE = 2
+MINER_CAPACITY = 5
+MINING_RATE = 1.0
 
 class Sprite():
     """An animated character that is displayed traversing the maze
 
+    The ai steps on the fixed timestep of the simulation, one tile per tick,
+    while the sprite is drawn at every frame part of the way between the
+    tile it left and the tile it steps to.
+
     Attributes:
         img_assets: A dictionary mapping image labels to pygame.Surfaces.
         state: The current image being used to render the sprite.
         direction: The direction the spite is currently traveling.
-        ai: A class implementing a step() function that returns next destination.
+        ai: A class implementing a step() function that returns next destination,
+            exploring the maze of builder when one is given, or else a maze
+            built from seed (see maze.make_rng).
         move_counter: Selects the correct image in animations.
         pos: The sprites position (in pixels).
-        dest: The destination returned by ai.step().
-        graph_surf: Surface displaying sprites movement by coloring a graph.
-        last_drawn: Last pos. Used to differentiate where the sprite is vs where 
-            it has been in animation between a source and destination tile.
+        previous: The tile the sprite left on its latest step.
+        steps: Number of steps taken by the ai.
+        trail: viewport.Trail displaying sprites movement by coloring the
+            graph of the maze.
+        graph: The maze_graph.MazeGraph of the maze the sprite explores.
+        last_drawn: Center of the last node reached. Used to differentiate
+            where the sprite is vs where it has been.
+        stop_on_resource: Stop on the first resource tile reached, the exit
+            of FIND_EXIT, rather than walking over resource tiles.
 
     Methods:
-        move: Animate movement of sprite according to destination returned by
-            ai.step()
-        update_graph: Determines whether to draw a node or edge and calls the
-            appropriate function.
-        update_node: Colors the node at the sprite position.
-        update_edge: Colors the edge at the sprite position.
+        step: Advance the simulation by a tick, taking the step returned by
+            ai.step() unless the sprite is on the exit.
+        animate: Place the sprite between the tiles of its latest step.
+        update_node: Colors the node at a tile.
+        update_edge: Colors the edge between two tiles.
         is_node: Returns True if the current pos is on a node.
         color_trail: Restores the sprites previous position to original color,
             differentiating where the sprite is v. where it has been.
-        reached_dest: Determine if the sprites animation sequence has brought it
-            to the destination tile.
         win_animation: Preform an animation sequence when the sprite has reached
             the maze exit.
     """
 
-    def __init__(self, img_assets: List[pygame.Surface], resources):
+    def __init__(self, img_assets: List[pygame.Surface], resources,
+                 dimensions: (int, int) = (50, 50),
+                 builder: maze.MazeBuilder = None, seed=None,
+                 stop_on_resource: bool = True):
 
         self.img_assets = img_assets
+        self.stop_on_resource = stop_on_resource
         self.state = img_assets['up'][0]
         self.direction = 'up'
-        self.ai = dfs.DFS((50, 50), resources)
+        if builder is None:
+            # The game shows no progress bar on the terminal
+            builder = maze.MazeBuilder(dimensions, resources, seed,
+                                       progress=False)
+        interface = maze.PlayerInterface(builder.dim, resources,
+                                         builder=builder)
+        self.ai = dfs.DFS(dimensions, resources, interface=interface)
         self.move_counter = 0
         self.pos = [self.ai.interface.player_pos.x * 16,
                     self.ai.interface.player_pos.y * 16]
-        self.dest = self.ai.interface.player_pos
-        self.graph_surf = pygame.Surface((800, 800), pygame.SRCALPHA)
-        self.graph_surf.fill((0, 0, 0, 0))
-        self.last_drawn = self.pos[0] + 8, self.pos[1] + 8
+        self.previous = self.ai.interface.player_pos
+        self.steps = 0
+        self.trail = viewport.Trail(self.ai.interface.dimensions)
+        self.graph = maze_graph.MazeGraph(self.ai.interface.get_maze().maze)
+        self.last_drawn = self.ai.interface.player_pos
+        self.__stretch = []
 
-    def move(self, display_surf: pygame.display):
-        """Shift the sprite 2 pixels in the provided direction
+    def step(self) -> bool:
+        """Advance the simulation by one tick, moving the ai a tile
 
-        Return False if the current position is not a winning tile,
-        True if the current position is a winning tile. When the player
-        is on a winning tile, run an alternate animation
+        Return False if the ai stepped, True without stepping if the current
+        position is a winning tile.
 
         """
 
+        position = self.ai.interface.player_pos
+        if self.is_node(position):
+            self.update_node(position)
+        self.previous = position
         # If current position is a maze exit
-        self.update_graph()
-        if self.ai.interface.tile_type(self.ai.interface.player_pos) == 3:
-            if(self.reached_dest()):
-                self.win_animation(display_surf)
-                return True
-
-        if self.reached_dest():
-            self.direction, self.dest = self.ai.step()
-
-        if self.move_counter == 2:
-            self.move_counter = 0
-        else:
-            self.move_counter += 1
-
-        self.state = self.img_assets[self.direction][self.move_counter]
-
-        if self.direction == 'up':
-            self.pos[1] = self.pos[1] - 2
-        elif self.direction == 'down':
-            self.pos[1] = self.pos[1] + 2
-        elif self.direction == 'left':
-            self.pos[0] = self.pos[0] - 2
-        elif self.direction == 'right':
-            self.pos[0] = self.pos[0] + 2
-        else:
-            raise ValueError("Invalid direction " + self.direction)
+        if (self.stop_on_resource
+                and self.ai.interface.tile_type(position) == 3):
+            return True
 
+        self.direction, dest = self.ai.step()
+        self.steps += 1
+        self.update_edge(position, dest)
         return False
 
-    def update_graph(self):
-        """Update graph surface overlay"""
-        if self.reached_dest() and self.is_node(self.ai.interface.player_pos):
-            self.update_node()
-        else:
-            self.update_edge()
-
-    def update_node(self):
-        x_pos = self.pos[0] + 8
-        y_pos = self.pos[1] + 8
-        pygame.draw.circle(self.graph_surf, (100, 150, 200), (x_pos, y_pos), 6)
-        self.color_trail()
-        self.last_drawn = x_pos, y_pos
-
-    def update_edge(self):
-        start = [a + 8 for a in self.pos]
-        if self.direction is 'left':
-            end = [start[0] - 2, start[1]]
-        elif self.direction is 'right':
-            end = [start[0] + 2, start[1]]
-        elif self.direction is 'down':
-            end = [start[0], start[1] + 2]
-        elif self.direction is 'up':
-            end = [start[0], start[1] - 2]
-
-        pygame.draw.line(self.graph_surf, (100, 150, 200), start, end, 1)
+    def animate(self, alpha: float):
+        """Place the sprite alpha (0 to 1) of the way from the tile it left
 
-    def is_node(self, pos):
+        to its current tile, advancing the walking animation while it moves
 
-        def is_walkable(position):
-            if self.ai.interface.player_maze.terrain[position] != 1:
-                return True
-            else:
-                return False
+        """
 
-        tiles = {'up':(pos.x, pos.y - 1),
-                          'down':(pos.x, pos.y + 1),
-                          'left':(pos.x - 1, pos.y),
-                          'right':(pos.x + 1, pos.y)}
+        current = self.ai.interface.player_pos
+        pos = [int(round((self.previous.x + (current.x - self.previous.x)
+                          * alpha) * 16)),
+               int(round((self.previous.y + (current.y - self.previous.y)
+                          * alpha) * 16))]
+        if pos != self.pos:
+            self.move_counter = (self.move_counter + 1) % 3
+        self.pos = pos
+        self.state = self.img_assets[self.direction][self.move_counter]
 
-        walkable = {direct : is_walkable(tiles[direct]) for direct in tiles.keys()}
-        num_true = sum(1 for condition in walkable.values() if condition)
+    def update_node(self, tile: maze.Tile):
+        self.trail.node(tile, viewport.TRAIL_NEW)
+        self.color_trail(tile)
+        self.last_drawn = tile
 
-        if num_true is 1:
-            return True
-        elif (walkable['up'] or walkable['down']) and (walkable['left'] or walkable['right']):
-            return True
+    def update_edge(self, start: maze.Tile, end: maze.Tile):
+        self.trail.edge(start, end, viewport.TRAIL_NEW)
+        self.__stretch.append((start, end))
 
-        return False
+    def is_node(self, pos):
+        """Return True if pos is a dead end or junction of the maze"""
 
-    def color_trail(self):
-        if self.last_drawn is None:
-            pass
+        return self.graph.is_node(pos)
 
-        pygame.draw.circle(self.graph_surf, (100, 200, 150), self.last_drawn, 6)
-        pygame.draw.line(self.graph_surf,
-                         (100, 200, 150),
-                         (self.last_drawn[0], self.last_drawn[1]),
-                         (self.pos[0] + 8, self.pos[1] + 8),
-                         1)
+    def color_trail(self, tile: maze.Tile):
+        """Recolor the stretch of the trail walked from the previous node
 
-    def reached_dest(self) -> bool:
-        """Determine if the sprite has shifted completely to the destination"""
+        to tile as somewhere the player has been before
 
-        if self.pos[0] != self.ai.interface.player_pos.x * 16:
-            return False
-        if self.pos[1] != self.ai.interface.player_pos.y * 16:
-            return False
-        return True
+        """
+
+        self.trail.node(self.last_drawn, viewport.TRAIL_OLD)
+        for start, end in self.__stretch:
+            self.trail.edge(start, end, viewport.TRAIL_OLD)
+        self.__stretch = []
 
-    def win_animation(self, display_surf):
+    def win_animation(self, display_surf, camera: viewport.Camera = None):
         """Preform a _victory dance_ style win animation"""
 
+        position = self.pos if camera is None else camera.screen_position(
+            self.pos)
         direct = ['down', 'right', 'up', 'left', 'down']
         self.move_counter = 0
         for direction in direct:
             pygame.event.pump()
             for i in range(3):
                 self.state = self.img_assets[direction][i]
-                display_surf.blit(self.state, (self.pos[0], self.pos[1]))
+                display_surf.blit(self.state, position)
                 pygame.display.flip()
 
 
 class GameMaze:
     """Manage drawing of maze on screen
 
+    The maze is drawn from chunks of tiles rendered on demand by
+    viewport.ChunkCaches, through a camera following the player, so mazes of
+    any size can be shown in the fixed size view of the display.
+
     Attributes:
         maze: A Maze class object.
         mini_map: A 1/4 scale black and white surface updated with discovered
             tiles where black is unknown or wall, white is known walkable.
         images: A dictionary mapping a string label to an image asset.
+        resource: Dictionary of a boolean array marking the resource tiles
+            the player has found ('found'), their number ('count') and the
+            amount of resource collected.
+        resources: The maze.ResourceIndex of the resources of the maze, used
+            to draw the found tiles still holding resource, None to draw
+            every found tile.
+        lit: Boolean array of the found tiles drawn with a resource image
+            as of the latest update, compared every frame to redraw the
+            tiles that were found or mined out.
         start_time: The time the object is created.
-        count: A counter used to calculate game statistics.
-        maze_surf: A pygame.Surface of the main maze.
-        graph_surf: A pygame.Surface translating the main maze to a graph.
+        count: Number of frames drawn.
+        traversed: Number of tiles traversed by the player, kept up to date
+            by whoever moves the player.
+        graph: The maze_graph.MazeGraph drawn in graph mode.
+        trail: The viewport.Trail of the player drawn over the graph.
+        camera: The viewport.Camera choosing the part of the maze shown.
+        maze_chunks: viewport.ChunkCache of the maze drawn with tile images.
+        graph_chunks: viewport.ChunkCache of the maze drawn as a graph.
+        fog_chunks: viewport.ChunkCache of the fog over undiscovered tiles.
+        panel_surf: A pygame.Surface of the user interface panel, including
+            the minimap.
         mode: A string representing the game mode.
+        mini_palette: uint8 array (4, 3) of the mini map colour of every tile
+            type (unknown, wall, walkable, resource).
+        mapped: Tile types drawn on the mini map, compared with the players
+            knowledge to find the tiles that need redrawing.
+        stats: List of hud.Labels displaying the statistics.
+        fog_mask: Boolean array with a value for every tile under the fog,
+            True until the tile has been discovered.
 
     Methods:
-        draw_maze: Construct the maze surface from information in the maze object.
-        draw_graph: Construct the surface representing the maze as a graph.
-        draw_graph_edges: Draw edges to walkable tiles from a given tile
-            position, and return a boolean signaling if a node must also be drawn.
+        draw_maze_chunk: Construct the surface of a chunk of the maze from
+            information in the maze object.
+        draw_graph_chunk: Construct the surface of a chunk of the maze drawn
+            as a graph.
+        draw_fog_chunk: Construct the surface of the fog over a chunk.
+        draw_panel: Construct the surface of the user interface panel.
         draw: Render the appropriate surface and additional UI assets. Draws
             the entire game screen including statistics, maze, and mini_map.
+        update: Advance the game state by a frame and return the regions of
+            the display that changed.
+        draw_area: Draw the part of the current frame inside a region.
+        reveal: Clear the fog from discovered tiles.
+        update_trail: Redraw the changed tiles of the trail onto the graph.
         draw_ui: Add the UI region to the paramaterized surface.
-        update_mini_map: Updates mini_map surface with visible tile information.
+        update_mini_map: Redraw the changed part of the minimap from the
+            players knowledge of the maze.
         _draw_mini_map: Initialize surface with mini_map blacked out.
-        update_stats: Calculate game statistics and render on screen.
+        update_stats: Calculate game statistics and render their labels.
         win_animation: Preform an animated sequence when player achieves a
             win condition.
     """
 
     def __init__(self, maze: maze.Maze,
-                 img_assets: List[pygame.image.load], mode):
+                 img_assets: List[pygame.image.load], mode,
+                 graph: maze_graph.MazeGraph = None,
+                 trail: viewport.Trail = None,
+                 camera: viewport.Camera = None,
+                 resources: maze.ResourceIndex = None):
         self.maze = maze
+        self.resources = resources
+        if graph is None:
+            graph = maze_graph.MazeGraph(maze)
+        self.graph = graph
+        if trail is None:
+            trail = viewport.Trail(maze.dim)
+        self.trail = trail
+        world = (maze.dim[0] * 16, maze.dim[1] * 16)
+        if camera is None:
+            camera = viewport.Camera(VIEW, world)
+        self.camera = camera
         self.mini_map = pygame.Surface((200, 200))
-        self.resource = {'tiles': [], 'collected': 0, 'available': 0}
+        self.resource = {'found': numpy.zeros(maze.dim, dtype=bool),
+                         'count': 0, 'collected': 0, 'available': 0}
+        self.lit = numpy.zeros(maze.dim, dtype=bool)
         self.images = img_assets
         self.start_time = time.time()
         self.count = 0
-        self.maze_surf = self.draw_maze()
-        self.graph_surf = self.draw_graph()
+        self.traversed = 0
+        self.maze_chunks = viewport.ChunkCache(self.draw_maze_chunk, world)
+        self.graph_chunks = viewport.ChunkCache(self.draw_graph_chunk, world)
+        self.fog_chunks = viewport.ChunkCache(self.draw_fog_chunk, world)
+        self.panel_surf = self.draw_panel()
         self.mini_map.fill((0,0,0))
         self.mode = mode
-
-    def draw_maze(self):
+        self.mini_palette = numpy.array(
+            [(0, 0, 0), (0, 0, 0), self.images['mini_walkable'].get_at((0, 0))[:3],
+             (150, 255, 255)], dtype=numpy.uint8)
+        self.mapped = numpy.zeros(maze.dim, dtype=numpy.uint8)
+        # The tile shown by every column and row of minimap pixels
+        self.__mini_columns = (numpy.arange(MINI_MAP.width) * maze.dim[0]
+                               // MINI_MAP.width)
+        self.__mini_rows = (numpy.arange(MINI_MAP.height) * maze.dim[1]
+                            // MINI_MAP.height)
+        self.stats = [hud.Label(hud.text_cache(), template, (830, 50 + index * 50))
+                      for index, template in enumerate(
+                          ['Tiles Traversed: {}', 'Resources Found: {}',
+                           'Resources Collected: {}', 'Time Played: {}'])]
+        self.fog_mask = numpy.ones(maze.dim, dtype=bool)
+        self.__fog_color = pygame.surfarray.array3d(self.images['fog'])
+        self.__fog_alpha = pygame.surfarray.array_alpha(self.images['fog'])
+
+    def draw_maze_chunk(self, chunk_x: int, chunk_y: int) -> pygame.Surface:
         """Construct a pygame.Surface and load appropriate images to represent
 
-        the maze using the maze_terrain object."""
-        
-        surf = pygame.Surface((1056, 800))
-        for index, maze_tile in numpy.ndenumerate(self.maze.terrain):
-            if not maze_tile:
-                surf.blit(self.images['wall'], (index[0] * 16,
-                                                index[1] * 16))
-            else:
-                surf.blit(self.images['walkable'], (index[0] * 16,
-                                                            index[1] * 16))
-        self.draw_ui(surf)
-        self._draw_mini_map(surf)
+        a chunk of the maze using the maze_terrain object."""
+
+        rect = self.maze_chunks.chunk_rect((chunk_x, chunk_y))
+        surf = pygame.Surface(rect.size)
+        terrain = self.maze.terrain[rect.left // 16:rect.right // 16,
+                                    rect.top // 16:rect.bottom // 16]
+        blit_tiles(surf, terrain.astype(numpy.intp),
+                   [self.images['wall'], self.images['walkable']])
 
         return surf
 
-    def draw_graph(self):
-        """Construct a pygame.Surface and draw a graph representing the maze
+    def draw_graph_chunk(self, chunk_x: int, chunk_y: int) -> pygame.Surface:
+        """Construct a pygame.Surface and draw the graph representing a chunk
 
-        using the maze_terrain object"""
+        of the maze using the precomputed junction graph of the maze, with
+        the trail of the player on top"""
 
-        surf = pygame.Surface((1056, 800))
+        rect = self.graph_chunks.chunk_rect((chunk_x, chunk_y))
+        surf = pygame.Surface(rect.size)
         surf.fill((0, 0, 0))
-        for index, maze_tile in numpy.ndenumerate(self.maze.terrain):
-            if maze_tile:
-                x_pos = index[0] * 16 + 8
-                y_pos = index[1] * 16 + 8
-                surf, need_node = self.draw_graph_edges(surf, index)
-                if need_node:
-                    pygame.draw.circle(
-                            surf, (255, 255, 255), (x_pos, y_pos), 6)
-
-        self.draw_ui(surf)
-        self._draw_mini_map(surf)
+
+        # Edges running through the chunk, or ending a tile outside of it
+        low = numpy.array((rect.left // 16 - 1, rect.top // 16 - 1))
+        high = numpy.array((rect.right // 16, rect.bottom // 16))
+        bounds = self.graph.edge_bounds()
+        near = ((bounds[:, :2] <= high) & (bounds[:, 2:] >= low)).all(axis=1)
+        for edge in numpy.flatnonzero(near).tolist():
+            points = self.graph.edge_positions(edge) * 16 + 8 - rect.topleft
+            pygame.draw.lines(surf, (255, 255, 255), False, points.tolist(), 1)
+
+        nodes = self.graph.nodes
+        inside = ((nodes > low) & (nodes < high)).all(axis=1)
+        for x_pos, y_pos in (nodes[inside] * 16 + 8 - rect.topleft).tolist():
+            pygame.draw.circle(surf, (255, 255, 255), (x_pos, y_pos), 6)
+
+        self.trail.draw(surf, rect, rect.topleft)
 
         return surf
 
-    def draw_graph_edges(self, surf, node):
-        """Use maze_terrain object to draw all edges from the provided node
+    def draw_fog_chunk(self, chunk_x: int, chunk_y: int) -> pygame.Surface:
+        """Construct the fog over a chunk of the maze, the fog image tiled
+
+        across the maze with discovered tiles cleared"""
+
+        rect = self.fog_chunks.chunk_rect((chunk_x, chunk_y))
+        surf = pygame.Surface(rect.size, pygame.SRCALPHA)
+        self.__shade(surf, rect, rect)
+
+        return surf
+
+    def __shade(self, surf: pygame.Surface, chunk: pygame.Rect,
+                area: pygame.Rect):
+        """Write the fog inside area, a tile aligned region of the world,
+
+        onto surf, the fog surface of the chunk covering the region chunk
 
-        Args:
-            surf: a pygame.Surface
-            node: an index into the maze_terrain 
-        Return:
-            Return the input surface with appropriate edges, and a boolean
-            value informing whether or not the node needs to be drawn.
         """
 
-        x_pos = node[0] * 16 + 8
-        y_pos = node[1] * 16 + 8
-        edges = {direct : False for direct in ['up', 'down', 'left', 'right']}
-        if self.maze.terrain[node[0] + 1][node[1]]:
-            edges['down'] = True
-            pygame.draw.line(
-                surf, (255, 255, 255), (x_pos, y_pos), (x_pos + 8, y_pos), 1)
-        if self.maze.terrain[node[0] - 1][node[1]]:
-            edges['up'] = True
-            pygame.draw.line(
-                surf, (255, 255, 255), (x_pos, y_pos), (x_pos - 8, y_pos), 1)
-        if self.maze.terrain[node[0]][node[1] + 1]:
-            edges['left'] = True
-            pygame.draw.line(
-                surf, (255, 255, 255), (x_pos, y_pos), (x_pos, y_pos + 8), 1)
-        if self.maze.terrain[node[0]][node[1] - 1]:
-            edges['right'] = True
-            pygame.draw.line(
-                surf, (255, 255, 255), (x_pos, y_pos), (x_pos, y_pos - 8), 1)
-
-        num_true = sum(1 for condition in edges.values() if condition)
-        need_node = False
-        if num_true is 1:
-            need_node = True
-        elif (edges['up'] or edges['down']) and (edges['left'] or edges['right']):
-            need_node = True
-
-        return surf, need_node
+        columns = numpy.arange(area.left, area.right) % self.__fog_alpha.shape[0]
+        rows = numpy.arange(area.top, area.bottom) % self.__fog_alpha.shape[1]
+        texture = numpy.ix_(columns, rows)
+        mask = self.fog_mask[area.left // 16:area.right // 16,
+                             area.top // 16:area.bottom // 16]
+        mask = mask.repeat(16, axis=0).repeat(16, axis=1)
+        box = (slice(area.left - chunk.left, area.right - chunk.left),
+               slice(area.top - chunk.top, area.bottom - chunk.top))
+
+        color = pygame.surfarray.pixels3d(surf)
+        color[box] = self.__fog_color[texture]
+        del color
+        alpha = pygame.surfarray.pixels_alpha(surf)
+        alpha[box] = self.__fog_alpha[texture] * mask
+        del alpha
+
+    def draw_panel(self) -> pygame.Surface:
+        """Construct a pygame.Surface of the user interface panel"""
+
+        surf = pygame.Surface(PANEL.size)
+        self.draw_ui(surf, (0, 0))
+        self._draw_mini_map(surf)
+
+        return surf
 
     def draw(self, display_surf: pygame.display,
              visible_tiles: Dict[maze.Tile, int],
-             pos: maze.Tile,
-             mode: str):
+             mode: str,
+             knowledge: numpy.ndarray,
+             explored: pygame.Rect = None):
         """Iterate over the maze.terrain and load appropriate tile images.
 
         Args:
             display_surf: The main display for game.
             visible_tiles: Set of tiles currently visible to the sprite.
-            pos: The sprites current tile position.
             mode: String representing the mode of the game, maze or graph.
+            knowledge: The tile types discovered by the player.
+            explored: Region of tiles the player walked through since the
+                previous frame, see update.
         """
 
-        # Draw maze
-        self.update_mini_map(visible_tiles)
-        if mode is "maze":
-            display_surf.blit(self.maze_surf, (0, 0))
-        elif mode is "graph":
-            display_surf.blit(self.graph_surf, (0, 0))
-        else:
-            raise ValueError("Invalid game mode: " + mode)
+        self.update(visible_tiles, knowledge, explored)
+        self.draw_area(display_surf, display_surf.get_rect(), mode)
 
-        self.update_stats(display_surf)
+    def update(self, visible_tiles: Dict[maze.Tile, int],
+               knowledge: numpy.ndarray,
+               explored: pygame.Rect = None) -> List[pygame.Rect]:
+        """Advance the game state drawn by draw_area by one frame
 
-        # Create shaded region + sprites vision circle
-        display_fog = self.images['fog'].copy()
-        pygame.draw.circle(display_fog, (0, 0, 0, 0), (pos[0] + 8, pos[1] + 8),
-                           random.randint(32, 34), 0)
-        
-        if mode is "maze":
-            display_surf.blit(display_fog, (0, 0))
+        Args:
+            visible_tiles: Set of tiles currently visible to the sprite.
+            knowledge: The tile types discovered by the player, e.g. the
+                terrain of PlayerInterface.player_maze.
+            explored: Region of tiles (x, y, width, height) the player
+                walked through since the previous frame, when it may have
+                taken more than one step.
 
-        # Illuminate found resource tiles
-        for tile, tile_type in visible_tiles.items():
-            if tile_type == 3 and tile not in self.resource['tiles']:
-                pygame.draw.circle(self.images['fog'], (0, 0, 0, 0),
-                                   (tile.x * 16 + 8, tile.y * 16 + 8),
-                                   12, 0)
-                self.resource['tiles'].append(tile)
-
-        # Draw found resource tiles
-        for tile in self.resource['tiles']:
-            if self.mode is "find_exit":
-                display_surf.blit(self.images['door'], (tile.x * 16, tile.y * 16))
+        Return:
+            The regions of the display that differ from the previous frame.
+        """
+
+        # The first frame compares the whole maze, later frames only the
+        # tiles around where the player has been
+        low = numpy.zeros(2, dtype=numpy.int64)
+        high = numpy.array(self.mapped.shape)
+        if self.count:
+            positions = [(tile.x, tile.y) for tile in visible_tiles]
+            if explored is not None:
+                positions.extend([explored.topleft, (explored.right - 1,
+                                                     explored.bottom - 1)])
+            positions = numpy.array(positions,
+                                    dtype=numpy.int64).reshape(-1, 2)
+            if positions.size:
+                # The player may have moved a tile since knowledge changed
+                low = numpy.maximum(positions.min(axis=0) - 2, low)
+                high = numpy.minimum(positions.max(axis=0) + 3, high)
             else:
-                display_surf.blit(self.images['mineral'], (tile.x * 16, tile.y * 16))
+                high = low
+        window = (slice(low[0], high[0]), slice(low[1], high[1]))
+
+        known = knowledge[window]
+        dirty = self.reveal(maze.Tile(x, y) for x, y in (numpy.argwhere(
+            self.fog_mask[window] & (known != maze.UNKNOWN)) + low).tolist())
+        dirty.extend(self.update_mini_map(knowledge, window))
+        dirty.extend(self.update_stats())
+        dirty.extend(self.update_trail())
+
+        # Illuminate found resource tiles
+        found = self.resource['found']
+        discovered = (known == maze.RESOURCE) & ~found[window]
+        found[window] |= discovered
+        self.resource['count'] += int(numpy.count_nonzero(discovered))
+
+        # Miners empty tiles anywhere in the maze, so the whole maze is
+        # compared with the tiles lit in the previous frame
+        lit = found.copy()
+        if self.resources is not None:
+            lit &= self.resources.amounts > 0
+        for x_pos, y_pos in numpy.argwhere(lit != self.lit).tolist():
+            dirty.append(self.camera.to_screen(
+                (x_pos * 16, y_pos * 16, 16, 16)))
+        self.lit = lit
+
+        return [rect for rect in dirty if rect]
+
+    def reveal(self, tiles) -> List[pygame.Rect]:
+        """Clear the fog from any of tiles that are still under it
+
+        The mask is updated with NumPy and only the alpha of the bounding
+        box of the newly discovered tiles is rewritten in the fog chunks
+        that are cached, through pygame.surfarray.
+
+        Return:
+            The region of the display that changed, if any.
+        """
+
+        positions = numpy.array([(tile.x, tile.y) for tile in tiles],
+                             dtype=numpy.int64).reshape(-1, 2)
+        inside = ((positions >= 0)
+                  & (positions < self.fog_mask.shape)).all(axis=1)
+        positions = positions[inside]
+        positions = positions[self.fog_mask[positions[:, 0],
+                                            positions[:, 1]]]
+        if not positions.size:
+            return []
+
+        self.fog_mask[positions[:, 0], positions[:, 1]] = False
+        low_x, low_y = positions.min(axis=0)
+        high_x, high_y = positions.max(axis=0) + 1
+        area = pygame.Rect(low_x * 16, low_y * 16, (high_x - low_x) * 16,
+                           (high_y - low_y) * 16)
+        for chunk in self.fog_chunks.chunks(area):
+            surf = self.fog_chunks.cached(chunk)
+            if surf is not None:
+                rect = self.fog_chunks.chunk_rect(chunk)
+                self.__shade(surf, rect, area.clip(rect))
+
+        return [self.camera.to_screen(area)]
+
+    def update_trail(self) -> List[pygame.Rect]:
+        """Redraw the trail over the tiles it changed on since the previous
+
+        frame onto the graph chunks that are cached
+
+        Return:
+            The region of the display covering the changed tiles, if any.
+        """
 
-    def draw_ui(self, surf: pygame.display):
+        pending = self.trail.take_pending()
+        if not pending:
+            return []
+
+        # Fast forwarding changes many tiles a frame, drawn once per chunk
+        changed = {}
+        for rect in pending:
+            for chunk in self.graph_chunks.chunks(rect):
+                clipped = rect.clip(self.graph_chunks.chunk_rect(chunk))
+                changed[chunk] = changed[chunk].union(
+                    clipped) if chunk in changed else clipped
+        for chunk, area in changed.items():
+            surf = self.graph_chunks.cached(chunk)
+            if surf is not None:
+                self.trail.draw(surf, area,
+                                self.graph_chunks.chunk_rect(chunk).topleft)
+
+        area = pending[0].unionall(pending[1:])
+        return [self.camera.to_screen(area)]
+
+    def draw_area(self, display_surf: pygame.display, area: pygame.Rect,
+                  mode: str):
+        """Draw the part of the current frame inside area onto display_surf
+
+        Args:
+            display_surf: The main display for game.
+            area: The region of the display to draw.
+            mode: String representing the mode of the game, maze or graph.
+        """
+
+        if mode == "maze":
+            chunks = self.maze_chunks
+        elif mode == "graph":
+            chunks = self.graph_chunks
+        else:
+            raise ValueError("Invalid game mode: " + mode)
+
+        view = area.clip(self.camera.view)
+        if view:
+            # Mazes smaller than the view leave part of it empty
+            if (self.camera.world[0] < view.right
+                    or self.camera.world[1] < view.bottom):
+                display_surf.fill((0, 0, 0), view)
+            chunks.draw(display_surf, self.camera, view)
+
+            # Shade undiscovered tiles
+            if mode == "maze":
+                self.fog_chunks.draw(display_surf, self.camera, view)
+
+            # Draw found resource tiles
+            display_surf.set_clip(view)
+            image = self.images['door' if self.mode == "find_exit" else 'mineral']
+            shown = self.camera.world_rect(view)
+            low = (shown.left // 16, shown.top // 16)
+            window = (slice(low[0], shown.right // 16 + 1),
+                      slice(low[1], shown.bottom // 16 + 1))
+            for x_pos, y_pos in (numpy.argwhere(self.lit[window])
+                                 + low).tolist():
+                display_surf.blit(image, self.camera.screen_position(
+                    (x_pos * 16, y_pos * 16)))
+            display_surf.set_clip(None)
+
+        panel = area.clip(PANEL)
+        if panel:
+            display_surf.blit(self.panel_surf, panel,
+                              panel.move(-PANEL.x, -PANEL.y))
+            display_surf.set_clip(panel)
+            for label in self.stats:
+                label.draw(display_surf)
+            display_surf.set_clip(None)
+
+    def draw_ui(self, surf: pygame.display,
+                position: (int, int) = PANEL.topleft):
         """Draw the user interface on the games main display
     
         Args:
             surf: The main game display surface.
+            position: Top left corner of the user interface on surf.
 
         Return:
             After drawing the user interface, return the surf with this addition.
         """
 
-        for x in range(800, 1056, 16):
-            for y in range(0, 800, 16):
-                if x == 800 or y == 0 or y == 784 or x == 1040:
-                    surf.blit(self.images['wall'], (x, y))
-                else:
-                    surf.blit(self.images['walkable'], (x, y))
+        # Walkable tiles framed by walls
+        tiles = numpy.ones((PANEL.width // 16, PANEL.height // 16),
+                           dtype=numpy.intp)
+        tiles[[0, -1], :] = tiles[:, [0, -1]] = 0
+        blit_tiles(surf, tiles, [self.images['wall'], self.images['walkable']],
+                   position)
 
         return surf
 
-    def update_mini_map(self, visible_tiles):
-        """Add any newly discovered tiles to the minimap on maze_surf
+    def update_mini_map(self, knowledge: numpy.ndarray,
+                        window: tuple = None) -> List[pygame.Rect]:
+        """Redraw the tiles of the minimap on panel_surf whose type changed
+
+        The minimap always shows the whole maze, every pixel the tile it
+        falls on. The pixels of the changed tiles are looked up in
+        mini_palette as a block and drawn with a single blit.
 
         Args:
-            visible_tiles: The tiles currently visible to the player.
+            knowledge: The tile types discovered by the player.
+            window: Pair of slices (x, y) of the tiles where knowledge may
+                have changed. All of knowledge is compared when None.
+
+        Return:
+            The regions of the display that changed.
         """
-        for tile, tile_type in visible_tiles.items():
-            if tile_type == 2:
-                self.maze_surf.blit(
-                        self.images['mini_walkable'], (tile.x * 4 + 828, tile.y * 4 + 572))
-            elif tile_type == 3:
-                temp = pygame.Surface((4, 4))
-                temp.fill((150, 255, 255))
-                self.maze_surf.blit(
-                        temp, (tile.x * 4 + 828, tile.y * 4 + 572))
-
-    def _draw_mini_map(self, display_surf: pygame.display):
+
+        if window is None:
+            window = (slice(0, self.mapped.shape[0]),
+                      slice(0, self.mapped.shape[1]))
+        low = (window[0].start, window[1].start)
+        known = knowledge[window]
+        changed = numpy.nonzero(known != self.mapped[window])
+        if not changed[0].size:
+            return []
+
+        low_x, high_x = low[0] + changed[0].min(), low[0] + changed[0].max() + 1
+        low_y, high_y = low[1] + changed[1].min(), low[1] + changed[1].max() + 1
+        self.mapped[low_x:high_x, low_y:high_y] = knowledge[low_x:high_x,
+                                                            low_y:high_y]
+
+        left, right = numpy.searchsorted(self.__mini_columns, (low_x, high_x))
+        top, bottom = numpy.searchsorted(self.__mini_rows, (low_y, high_y))
+        if left == right or top == bottom:
+            return []
+        block = self.mapped[numpy.ix_(self.__mini_columns[left:right],
+                                      self.__mini_rows[top:bottom])]
+        area = pygame.Rect(MINI_MAP.x + left, MINI_MAP.y + top,
+                           right - left, bottom - top)
+        pygame.surfarray.blit_array(
+            self.panel_surf.subsurface(area.move(-PANEL.x, -PANEL.y)),
+            self.mini_palette[block])
+        return [area]
+
+    def _draw_mini_map(self, surf: pygame.Surface):
         """Initialize the minimap in appropriate location
         
         Args:
-            display_surf: The main game display
+            surf: The user interface panel
         """
 
-        for y in range(572, 772, 4):
-            for x in range(828, 1028, 4):
-                display_surf.fill((0, 0, 0), (x, y, 4, 4))
+        surf.fill((0, 0, 0), MINI_MAP.move(-PANEL.x, -PANEL.y))
 
-    def update_stats(self, display_surf: pygame.display):
-        """Update the game statistics displayed on screen
+    def update_stats(self) -> List[pygame.Rect]:
+        """Update the game statistics displayed on screen, rendering only
 
-        Args:
-            display_surf: The main game display
+        the labels whose value changed
+
+        Return:
+            The regions of the display covered by labels that changed.
         """
 
         self.count += 1
         display_time = time.time()
-        myfont = pygame.font.Font('maze_pro/assets/fonts/breathe_fire.otf', 20)
-        tiles_traversed = myfont.render(
-            'Tiles Traversed: ' + str(self.count // 8), True, (0, 0, 0))
-        resources_found = myfont.render(
-            'Resources Found: ' + str(len(self.resource['tiles'])),
-            True, (0, 0, 0))
-        resources_collected = myfont.render(
-            'Resources Collected: ' + str(self.resource['collected']),
-            True, (0, 0, 0))
-        game_clock = myfont.render(
-            'Time Played: ' + str((int(display_time - self.start_time))),
-            True, (0, 0, 0))
-
-        display_surf.blit(tiles_traversed, (830, 50))
-        display_surf.blit(resources_found, (830, 100))
-        display_surf.blit(resources_collected, (830, 150))
-        display_surf.blit(game_clock, (830, 200))
+        values = [self.traversed,
+                  self.resource['count'],
+                  self.resource['collected'],
+                  int(display_time - self.start_time)]
+
+        dirty = []
+        for label, value in zip(self.stats, values):
+            dirty.extend(label.update(value))
+
+        return dirty
 
     def win_animation(self, display_surf: pygame.display, player: Sprite):
         """Preform a win animation sequence.
@@ -432,12 +689,11 @@ class GameMaze:
         """
 
         pygame.event.pump()
-        display_surf.blit(self.images['door'], (player.pos[0],
-                                                player.pos[1]))
-
-        myfont = pygame.font.Font('maze_pro/assets/fonts/breathe_fire.otf', 50)
+        if self.mode == FIND_EXIT:
+            display_surf.blit(self.images['door'],
+                              self.camera.screen_position(player.pos))
 
-        congrats = myfont.render("Congratulations!", True, (0, 0, 0))
+        congrats = hud.text_cache().render("Congratulations!", 50)
         display_surf.fill((100, 255, 50), (200, 380, 400, 80))
         display_surf.blit(congrats, (250, 400))
         pygame.display.flip()
@@ -449,99 +705,175 @@ class GameMaze:
                 break
 
 
-    class MazeConstructor:
-        """Preform maze construction animation.
-
-        Attributes:
-            color_map: A dictionary mapping types of actions preformed by a
-                construction algorithm to desired RBG colors defined by the maze
-                construction algorithm.
-            steps: Collection of steps preformed by the maze construction algorithm.
-            images: Set of images required to draw the game, e.g. walls and grass.
-            animate_flags: Dictionary mapping options a user can select to flags
-                signaling whether or not they have been selected.
-            display_surf: The main game display.
-            clock: A pygame.time.Clock() used to normalize the animation FPS.
-            statistics: Dictionary mapping statistics to display on screen along
-                with their current values. 
-
-        Methods:
-            restore_walls: Fill in tiles with wall tiles that were in a temporary 
-                state. When an algorithm explores and fails in a path.
-            color_tile: Given a tile and a color set the tile to the appropriate
-                color. Note that color can be a literal RBG tuple or reference
-                an img.
-            read_keys: Check for user input and set animate_flags accordingly.
-            animation_loop: The main loop animating the contraction of the maze.
-            animate_step: Animate a single step from the collection steps.
-            display_controls: Render the available controls on screen.
-            update_statistics: Update real time progress of the maze construction.
-        """
+class MazeConstructor:
+    """Preform maze construction animation.
+
+    Playback applies as many construction steps per frame as the playback
+    rate asks for, without spending more than a time budget on a frame, and
+    pushes only the tiles that changed to the screen. The state of every
+    tile is kept in an array, so playback can also jump to any step index
+    and redraw the view once instead of animating every step in between.
+
+    Attributes:
+        color_map: A dictionary mapping types of actions preformed by a
+            construction algorithm to desired RBG colors defined by the maze
+            construction algorithm.
+        steps: Iterable of (color, tiles) steps preformed by the maze
+            construction algorithm, e.g. a ConstructionLog. Seeking backwards
+            iterates over it again from the start.
+        images: Set of images required to draw the game, e.g. walls and grass.
+        display_surf: The main game display.
+        clock: A pygame.time.Clock() used to normalize the animation FPS.
+        rate: Playback rate in steps per second, None to apply as many steps
+            as fit in the frame budget.
+        frame_budget: Seconds each frame may spend applying steps.
+        fps: Frames per second the animation is drawn at.
+        index: Number of steps applied so far.
+        finished: True once every step has been applied.
+        paused: True while playback is paused.
+        tiles: uint8 array (x, y) of the step type drawn on every tile, 0
+            for walls not touched yet and 1 + the position of the step type
+            in color_map otherwise.
+        temporary: Set of (x, y) tiles on the path of the walker, drawn in
+            the color of seek steps until they are reset or cleared.
+        statistics: Dictionary mapping statistics to display on screen along
+            with their current values. 
+        labels: hud.Labels displaying the statistics.
+
+    Methods:
+        restore_walls: Fill in tiles with wall tiles that were in a temporary 
+            state. When an algorithm explores and fails in a path.
+        color_tile: Given a tile and a color set the tile to the appropriate
+            color. Note that color can be a literal RBG tuple or reference
+            an img.
+        read_keys: Check for user input and change playback accordingly.
+        animation_loop: The main loop animating the contraction of the maze.
+        play_frame: Apply the steps due in a frame.
+        seek: Jump to a step index, redrawing the view once.
+        skip_step: Apply the next step right away.
+        skip_until_clear: Jump past the next clear step.
+        draw_view: Redraw every tile in the view from the tile states.
+        display_controls: Render the available controls on screen.
+        update_statistics: Redraw the statistics whose value changed.
+        draw_statistics: Redraw the statistics inside a region of the display.
+    """
 
-    def __init__(self, construction_data, img_assets, display_surf):
-        self.color_map = construction_data['color_map']
-        self.steps = construction_data['steps']
+    def __init__(self, construction_data, img_assets, display_surf,
+                 dimensions: (int, int) = (VIEW.width // 16,
+                                           VIEW.height // 16),
+                 rate: float = STEPS_PER_SECOND,
+                 frame_budget: float = FRAME_BUDGET, fps: int = 60):
+        self.color_map = construction_data.color_map
+        self.steps = construction_data
         self.images = img_assets
-        self.animate_flags = {'draw_path': True,
-                              'draw_next_clear': False,
-                              'skip_animation': False}
         self.display_surf = display_surf
         self.clock = pygame.time.Clock()
+        self.rate = rate
+        self.frame_budget = frame_budget
+        self.fps = fps
+        self.paused = False
         self.statistics = {'cleared_tiles' : 0, 'visited_tiles': 0}
-
-        self.display_surf.fill((100, 100, 100, 100), (0, 0, 800, 800))
-        self.restore_walls()
+        self.labels = [hud.Label(hud.text_cache(), 'Tiles Cleared: {}',
+                                 (830, 300)),
+                       hud.Label(hud.text_cache(), 'Tiles Visited: {}',
+                                 (830, 350))]
+        self.tiles = numpy.zeros(dimensions, dtype=numpy.uint8)
+        self.temporary = set()
+        self.__codes = {color: code + 1
+                        for code, color in enumerate(self.color_map)}
+        self.__tile_images = [self.images['wall']] + [
+            self.__tile_image(self.color_map[color])
+            for color in self.color_map]
+        self.__restart()
+
+        self.draw_view()
         self.display_controls()
+        self.draw_statistics()
 
-    def restore_walls(self):
-        """Fill in temp walk tiles as wall tiles"""
+    def __tile_image(self, color) -> pygame.Surface:
+        """Return a tile sized surface drawn in color, see color_tile"""
 
-        for i in range(0, 800, 16):
-            for j in range(0, 800, 16):
-                if self.display_surf.get_at((i, j)) == (100, 100, 100, 255):
-                    self.display_surf.blit(self.images['wall'], (i, j))
-        pygame.display.flip()
+        surf = pygame.Surface((16, 16))
+        self.__draw_tile(surf, color, (0, 0))
+        return surf
+
+    def __restart(self):
+        """Forget every applied step, going back to a maze of walls"""
+
+        self.index = 0
+        self.finished = False
+        self.tiles[...] = 0
+        self.temporary.clear()
+        self.statistics['cleared_tiles'] = 0
+        self.statistics['visited_tiles'] = 0
+        self.__events = iter(self.steps)
+        self.__due = 0.0
+
+    def restore_walls(self) -> List[pygame.Rect]:
+        """Fill in temp walk tiles as wall tiles
 
-    def color_tile(self, color, tile):
+        Return:
+            The regions of the display that changed.
+        """
+
+        dirty = []
+        for tile in self.temporary:
+            self.tiles[tile] = 0
+            dirty.append(self.color_tile('wall', tile))
+        self.temporary.clear()
+        return [rect for rect in dirty if rect]
+
+    def color_tile(self, color, tile) -> pygame.Rect:
         """Render a tile using the provided color
 
         color can specify an image using a string, or an RBG value using a
-        tuple i.e. (R, B, G)
+        tuple i.e. (R, B, G). Tiles outside of the view are not drawn.
+
+        Return:
+            The region of the display drawn on, empty outside of the view.
         """
 
+        if not VIEW.collidepoint(tile[0] * 16, tile[1] * 16):
+            return pygame.Rect(0, 0, 0, 0)
+
+        return self.__draw_tile(self.display_surf, color,
+                                (tile[0] * 16, tile[1] * 16))
+
+    def __draw_tile(self, surf, color, position) -> pygame.Rect:
         if isinstance(color, str):
-            self.display_surf.blit(self.images[color],
-                                   (tile[0] * 16, tile[1] * 16))
+            return surf.blit(self.images[color], position)
         elif isinstance(color, tuple):
-            pygame.draw.rect(self.display_surf,
-                             color,
-                             (tile[0] * 16, tile[1] * 16, 16, 16))
+            return pygame.draw.rect(surf, color, position + (16, 16))
         else:
             raise ValueError("Unknown tile color: " + color)
 
-    def read_keys(self, keys, color):
-        if keys[pygame.K_s]:
-            self.animate_flags['draw_path'] = False
-        if keys[pygame.K_c]:
-            if color is 'clear':
+    def read_keys(self) -> bool:
+        """Handle the keys pressed since the previous frame
+
+        Return:
+            False if the window was closed, otherwise True.
+        """
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
                 return False
-            else:
-                self.animate_flags['draw_next_clear'] = True
-                self.restore_walls()
-                return True
-        if keys[pygame.K_d]:
-                self.animate_flags['draw_next_clear'] = True
-                self.animate_flags['skip_animation'] = True
-                self.restore_walls()
-                if color is 'clear':
-                    return False
-                return True
-        if keys[pygame.K_p]:
-            while True:
-                event = pygame.event.wait()
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
-                    break
-        return False
+            if event.type != pygame.KEYDOWN:
+                continue
+            if event.key == pygame.K_s:
+                pygame.display.update(self.skip_step())
+            elif event.key == pygame.K_c:
+                self.skip_until_clear()
+            elif event.key == pygame.K_d:
+                self.seek(None)
+            elif event.key == pygame.K_p:
+                self.paused = True
+            elif event.key == pygame.K_r:
+                self.paused = False
+            elif event.key == pygame.K_UP and self.rate is not None:
+                self.rate *= 2
+            elif event.key == pygame.K_DOWN and self.rate is not None:
+                self.rate = max(1, self.rate / 2)
+        return True
 
     def animation_loop(self):
         """Drive the animation"""
@@ -549,105 +881,244 @@ class GameMaze:
         pygame.event.pump()
         pygame.display.flip()
 
-        for step in self.steps:
-            self.animate_flags['draw_path'] = True
-            color, tiles = next(iter(step.items()))
-            self.update_statistics(color, tiles)
+        while not self.finished:
+            seconds = self.clock.tick(self.fps) / 1000
+            if not self.read_keys():
+                break
+            if not self.paused:
+                pygame.display.update(self.play_frame(seconds))
 
-            if self.animate_flags['skip_animation']:
-                self.animate_flags['draw_path'] = False
-                self.animate_flags['draw_next_clear'] = True
+        pygame.display.update(self.restore_walls())
+        time.sleep(1)
 
-            if self.animate_flags['draw_next_clear']:
-                if color is not 'clear':
-                    continue
-                else:
-                    self.animate_flags['draw_next_clear'] = False
+    def play_frame(self, seconds: float) -> List[pygame.Rect]:
+        """Apply the steps due after seconds more of playback
 
-            self.animate_step(tiles, color)
-        time.sleep(1)
+        Steps stop early once the frame budget is spent, and the steps that
+        did not fit are dropped rather than carried into the next frame, so
+        playback slows down instead of frames piling up.
 
-    def animate_step(self, tiles, color):
-        """Animate a single step"""
+        Return:
+            The regions of the display that changed.
+        """
 
-        for tile in tiles:
-            pygame.event.pump()
-            keys = pygame.key.get_pressed()
-            if self.read_keys(keys, color):
+        start = time.perf_counter()
+        if self.rate is None:
+            self.__due = float('inf')
+        else:
+            self.__due += self.rate * seconds
+
+        dirty = []
+        while self.__due >= 1 and not self.finished:
+            self.__advance(dirty)
+            self.__due -= 1
+            if time.perf_counter() - start > self.frame_budget:
+                self.__due = 0.0
                 break
-            self.color_tile(self.color_map[color], tile)
-            if self.animate_flags['draw_path']:
-                pygame.display.flip()
-        pygame.display.flip()
+        if self.rate is None:
+            self.__due = 0.0
 
-    def display_controls(self):
+        # Many small updates cost more than one update of the whole view
+        if len(dirty) > 256:
+            dirty = [VIEW]
+        dirty.extend(self.update_statistics())
+        return dirty
 
-        myfont = pygame.font.Font('maze_pro/assets/fonts/breathe_fire.otf', 20)
-        skip_step = myfont.render(
-                's: skip the current step', True, (0, 0, 0))
-        next_clear = myfont.render(
-                'c: skip until clear', True, (0, 0, 0))
-        complete_animation = myfont.render(
-                'd: rapid finish', True, (0, 0, 0))
-        pause = myfont.render(
-                'p: pause animation', True, (0, 0, 0))
-        resume = myfont.render(
-                'r: resume animation', True, (0, 0, 0))
+    def seek(self, index: int):
+        """Jump to the state after index steps (the last step when None),
 
-        align = 50
-        for control in [skip_step, next_clear, complete_animation, pause, resume]:
-            self.display_surf.blit(control, (830, align))
-            align = align + 50
+        applying the steps in between without drawing them and redrawing
+        the view once
 
-    def update_statistics(self, color, tiles):
+        """
+
+        if index is not None and index < self.index:
+            self.__restart()
+        while not self.finished and (index is None or self.index < index):
+            self.__advance(None)
+
+        self.draw_view()
+        self.update_statistics()
+        pygame.display.update(VIEW)
 
-        if color is 'clear':
+    def skip_step(self) -> List[pygame.Rect]:
+        """Apply the next step right away, also while paused
+
+        Return:
+            The regions of the display that changed.
+        """
+
+        dirty = []
+        self.__advance(dirty)
+        dirty.extend(self.update_statistics())
+        return dirty
+
+    def skip_until_clear(self):
+        """Jump past the next clear step, redrawing the view once"""
+
+        while not self.finished and self.__advance(None) != 'clear':
+            pass
+
+        self.draw_view()
+        self.update_statistics()
+        pygame.display.update(VIEW)
+
+    def __advance(self, dirty: List[pygame.Rect]) -> str:
+        """Apply the next step, drawing the tiles that changed and adding
+
+        their regions to dirty unless it is None
+
+        Return:
+            The type of the step, None after the last step.
+        """
+
+        try:
+            color, tiles = next(self.__events)
+        except StopIteration:
+            self.finished = True
+            return None
+
+        self.index += 1
+        if color == 'clear':
             self.statistics['cleared_tiles'] += len(tiles)
-        if color is 'seek':
+        if color == 'seek':
             self.statistics['visited_tiles'] += len(tiles)
 
-        myfont = pygame.font.Font('maze_pro/assets/fonts/breathe_fire.otf', 20)
-        cleared = myfont.render(
-                'Tiles Cleared: ' + str(self.statistics['cleared_tiles']),
-                True, (0, 0, 0))
-        visited = myfont.render(
-                'Tiles Visited: ' + str(self.statistics['visited_tiles']),
-                True, (0, 0, 0))
+        positions = numpy.array(tiles, dtype=numpy.int64).reshape(-1, 2)
+        code = self.__codes[color]
+        changed = positions[self.tiles[positions[:, 0], positions[:, 1]]
+                            != code]
+        if not changed.size:
+            return color
+        self.tiles[changed[:, 0], changed[:, 1]] = code
+
+        changed = [tuple(tile) for tile in changed.tolist()]
+        if color == 'seek':
+            self.temporary.update(changed)
+        else:
+            self.temporary.difference_update(changed)
+
+        if dirty is not None:
+            for tile in changed:
+                rect = self.color_tile(self.color_map[color], tile)
+                if rect:
+                    dirty.append(rect)
+        return color
+
+    def draw_view(self):
+        """Redraw every tile in the view from the tile states"""
+
+        index = numpy.zeros((VIEW.width // 16, VIEW.height // 16),
+                            dtype=numpy.intp)
+        shown = self.tiles[:index.shape[0], :index.shape[1]]
+        index[:shown.shape[0], :shown.shape[1]] = shown
+        blit_tiles(self.display_surf, index, self.__tile_images, VIEW.topleft)
+
+    def display_controls(self):
+
+        text = hud.text_cache()
+        controls = ['s: skip the current step',
+                    'c: skip until clear',
+                    'd: rapid finish',
+                    'p: pause animation',
+                    'r: resume animation',
+                    'up, down: change speed']
+
+        align = 50
+        for control in controls:
+            self.display_surf.blit(text.render(control), (830, align))
+            align = align + 40
+
+    def update_statistics(self) -> List[pygame.Rect]:
+        """Redraw the statistics whose value changed
+
+        Return:
+            The regions of the display that changed.
+        """
+
+        dirty = []
+        for label, statistic in zip(self.labels, ['cleared_tiles',
+                                                  'visited_tiles']):
+            dirty.extend(label.update(self.statistics[statistic]))
+
+        for rect in dirty:
+            self.draw_statistics(rect)
+        return dirty
 
+    def draw_statistics(self, area: pygame.Rect = STATISTICS_AREA):
+        """Redraw the background and labels of the statistics inside area"""
+
+        self.display_surf.set_clip(area.clip(STATISTICS_AREA))
         for col in range(816, 1040, 16):
             for row in range(300, 380, 16):
-                self.display_surf.blit(self.images['walkable'], (col, row))
-        self.display_surf.blit(cleared, (830, 300))
-        self.display_surf.blit(visited, (830, 350))
+                if area.colliderect(col, row, 16, 16):
+                    self.display_surf.blit(self.images['walkable'],
+                                           (col, row))
+        for label in self.labels:
+            label.draw(self.display_surf)
+        self.display_surf.set_clip(None)
 
 
 class App:
     """Main entrypoint for the game driving the animation process
     
     Attributes:
-        mode: The user selected game mode.
+        mode: The user selected game mode, FIND_EXIT or GATHER.
         resources: Specifications for contracting a maze.Resources object.
         _running: Boolean flag signaling if the game should remain active.
         _display_surf: The main pygame display for the game.
-        images: A dictionary of image assets.
+        images: The atlas.Atlas of the image assets.
         maze: a maze.Maze object.
         game_maze: a GameMaze object.
         player: A Sprite object.
         clock: a pygame.time.Clock used to throttle game FPS.
+        fps: Frames per second the game is drawn at.
+        speed: Simulation speed, a multiple of TICKS_PER_SECOND or None to
+            step as fast as frame_budget allows.
+        frame_budget: Seconds each frame may spend stepping the simulation.
+        scheduler: mining.Scheduler running the miners of GATHER mode in
+            step with the simulation.
+        mines: mining.Mines sharing the resources of the maze between miners.
+        __claimed: Boolean array of the resource tiles miners were sent to.
+        __unclaimed: Number of resource tiles no miner was sent to yet.
+        __travel: Steps from the player start to every tile, the walk of the
+            miners to their source.
         display_mode: String signaling if maze should be drawn as a maze or graph.
+        dirty_rects: Redraw and update only the changed regions of the
+            display each frame instead of flipping the whole display.
+        dimensions: Dimensions of the maze (x, y).
+        pool: maze_pool.MazePool the maze is taken from, or None to build
+            the maze when the game starts.
+        seed: Seed or random stream the maze is built from when there is no
+            pool, see maze.make_rng.
 
     Methods:
         on_init: Handle additional initialization steps not possible in __init__.
+        next_maze: Take a maze from the pool, showing the generation progress
+            while waiting for one.
+        show_progress: Draw the progress of the maze being generated.
         on_event: Handle events triggered during execution.
+        simulate: Step the player on the fixed timestep of the simulation.
+        claim_resources: Send miners to the resources the player sees.
+        take_explored: Return the tiles walked through since the last call.
         on_loop: Call at every iteration of on_execute.
         on_render: Handle process of rendering appropriate surfaces on screen.
+        render_dirty: Render only the regions of the display that changed.
         on_cleanup: Preform a graceful close of the application.
         on_execute: Process user input and track events related to player
             movement.
-        load_images: Load all image assets into the images dictionary.
     """
 
-    def __init__(self, mode, resources):
+    def __init__(self, mode, resources, dirty_rects: bool = True,
+                 dimensions: (int, int) = (50, 50),
+                 pool: maze_pool.MazePool = None, speed: float = 1,
+                 fps: int = FPS, frame_budget: float = FRAME_BUDGET,
+                 seed=None):
+        if mode not in (FIND_EXIT, GATHER):
+            raise ValueError('Invalid game mode: ' + str(mode))
+        if pool is not None:
+            resources, dimensions = pool.resource_allocation, pool.dim
+        init_pygame()
         self.mode = mode
         self.resources = resources
         self._running = True
@@ -657,7 +1128,25 @@ class App:
         self.game_maze = None
         self.player = None
         self.clock = pygame.time.Clock()
+        self.fps = fps
+        self.speed = speed
+        self.frame_budget = frame_budget
+        self.scheduler = mining.Scheduler()
+        self.mines = None
+        self.__claimed = None
+        self.__unclaimed = 0
+        self.__travel = None
         self.display_mode = "maze"
+        self.dirty_rects = dirty_rects
+        self.dimensions = dimensions
+        self.pool = pool
+        self.seed = seed
+        self.__drawn_mode = None
+        self.__sprite_rect = pygame.Rect(0, 0, 0, 0)
+        # Ticks due but not yet simulated, and the tiles walked through
+        # since the previous frame
+        self.__due = 0.0
+        self.__explored = None
 
     def on_init(self):
         """Additional initialization steps"""
@@ -665,40 +1154,202 @@ class App:
         self._display_surf = pygame.display.set_mode(
             (1056, 800), pygame.HWSURFACE)
 
-        img_directory = 'maze_pro/assets/img/sprite_sheets/link/'
-        temp = load_images(img_directory)
-        sprite_img_assets = {}
-        for direction in ['up', 'down', 'left', 'right']:
-            images = [img for key, img in temp.items() if direction in key]
-            sprite_img_assets[direction] = images
+        self.images = atlas.atlas()
+        sprite_img_assets = {direction: self.images.frames(
+                                 'link/' + direction + '_')
+                             for direction in ['up', 'down', 'left', 'right']}
 
-        self.player = Sprite(sprite_img_assets, self.resources)
-        self.maze = self.player.ai.interface.get_maze()
+        builder = None
+        if self.pool is not None:
+            builder = self.next_maze()
+            if builder is None:
+                return False
 
+        self.player = Sprite(sprite_img_assets, self.resources,
+                             self.dimensions, builder, self.seed,
+                             stop_on_resource=self.mode == FIND_EXIT)
+        self.maze = self.player.ai.interface.get_maze()
+        interface = self.player.ai.interface
+        self.mines = mining.Mines(
+            self.maze.resources, self.scheduler,
+            on_mined=interface.refresh_tile)
+        if self.mode == GATHER:
+            self.__claimed = numpy.zeros(self.maze.dim, dtype=bool)
+            self.__unclaimed = len(interface.resource_index)
+            # The player may start in the outer wall, next to the maze
+            start = self.maze.player_start
+            base = [tile for tile in
+                    [start] + [maze.Tile(start.x + dx, start.y + dy)
+                               for dx, dy in ((0, 1), (0, -1), (1, 0), (-1, 0))]
+                    if 0 <= tile.x < self.maze.dim[0]
+                    and 0 <= tile.y < self.maze.dim[1]
+                    and not self.maze.is_wall(tile)]
+            self.__travel = solver.MazeSolver(self.maze.maze).distance_field(
+                base)
+            self.claim_resources()
 
         self._running = True
 
-        img_directory = 'maze_pro/assets/img/enviornment/'
-        self.images = load_images(img_directory)
-
         self.game_maze = GameMaze(self.maze.maze,
                                   self.images,
-                                  self.mode)
+                                  self.mode,
+                                  self.player.graph,
+                                  self.player.trail,
+                                  resources=interface.resource_index)
 
         self.game_maze.draw_ui(self._display_surf)
         pygame.display.flip()
 
-        maze_constructor = MazeConstructor(self.maze.construction_json,
+        maze_constructor = MazeConstructor(self.maze.construction_log,
                                            self.images,
-                                           self._display_surf)
+                                           self._display_surf,
+                                           self.maze.dim)
         maze_constructor.animation_loop()
         del maze_constructor
 
+    def next_maze(self) -> maze.MazeBuilder:
+        """Take the next maze from the pool, drawing the progress of the
+
+        maze being generated until one is ready
+
+        Return:
+            The MazeBuilder of the maze, None if the window was closed.
+        """
+
+        while True:
+            try:
+                return self.pool.get(timeout=0.05)
+            except queue.Empty:
+                pass
+            if pygame.event.peek(pygame.QUIT):
+                return None
+            pygame.event.pump()
+            self.show_progress(self.pool.progress())
+
+    def show_progress(self, fraction: float):
+        """Draw the progress of the maze being generated over the view"""
+
+        text = hud.text_cache()
+        self._display_surf.fill((0, 0, 0), VIEW)
+        label = text.render('Generating maze', 50, (255, 255, 255))
+        self._display_surf.blit(label, label.get_rect(
+            midbottom=(VIEW.centerx, VIEW.centery - 20)))
+        bar = pygame.Rect(0, 0, 400, 24)
+        bar.center = VIEW.center
+        pygame.draw.rect(self._display_surf, (255, 255, 255), bar, 1)
+        self._display_surf.fill((100, 255, 50), (
+            bar.x + 2, bar.y + 2, int((bar.width - 4) * fraction),
+            bar.height - 4))
+        pygame.display.update(VIEW)
+
     def on_event(self, event):
-        """Handle event triggers occuring in on_execute"""
+        """Handle event triggers occuring in on_execute
 
-        if event.type == QUIT:
+        g and m switch between the graph and maze display, 1 to 4 set the
+        simulation speed to the matching entry of SPEEDS.
+
+        """
+
+        if event.type == pygame.QUIT:
             self._running = False
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_g:
+                self.display_mode = "graph"
+            elif event.key == pygame.K_m:
+                self.display_mode = "maze"
+            elif pygame.K_1 <= event.key < pygame.K_1 + len(SPEEDS):
+                self.speed = SPEEDS[event.key - pygame.K_1]
+                self.__due = min(self.__due, 1.0)
+
+    def simulate(self, seconds: float) -> bool:
+        """Step the player the number of ticks due after seconds more of
+
+        play and run the miners for as long, then place the sprite between
+        ticks for drawing
+
+        Ticks stop early once the frame budget is spent, and the ticks that
+        did not fit are dropped rather than carried into the next frame, so
+        the simulation slows down instead of frames piling up.
+
+        Return:
+            True once the player has reached the exit, otherwise False.
+        """
+
+        start = time.perf_counter()
+        if self.speed is None:
+            self.__due = float('inf')
+        else:
+            self.__due += TICKS_PER_SECOND * self.speed * seconds
+
+        won = False
+        ticks = 0
+        interface = self.player.ai.interface
+        position = interface.player_pos
+        if self.__explored is None:
+            self.__explored = pygame.Rect(position.x, position.y, 1, 1)
+        # In GATHER mode the player stops once every resource is claimed
+        exploring = self.mode == FIND_EXIT or self.__unclaimed > 0
+        while self.__due >= 1 and exploring:
+            won = self.player.step()
+            if won:
+                break
+            ticks += 1
+            self.__due -= 1
+            self.claim_resources()
+            exploring = self.mode == FIND_EXIT or self.__unclaimed > 0
+            position = interface.player_pos
+            self.__explored.union_ip((position.x, position.y, 1, 1))
+            if time.perf_counter() - start > self.frame_budget:
+                self.__due = 0.0
+                break
+
+        # Simulated time keeps pace with the ticks when stepping flat out,
+        # and the miners finish right away once the player is done
+        if self.speed is not None:
+            self.scheduler.advance(seconds * self.speed)
+        elif exploring:
+            self.scheduler.advance(ticks / TICKS_PER_SECOND)
+        else:
+            self.scheduler.run()
+        if not exploring:
+            won = not len(interface.resource_index) and not self.mines.in_flight
+        if self.speed is None or won or not exploring:
+            self.__due = 1.0
+        self.game_maze.traversed = self.player.steps
+        self.game_maze.resource['collected'] = self.mines.delivered
+        self.player.animate(min(self.__due, 1.0))
+        return won
+
+    def claim_resources(self):
+        """Send MINERS_PER_SOURCE miners to every resource tile the player
+
+        sees for the first time in GATHER mode, walking to it from the
+        player start
+
+        """
+
+        if self.mode != GATHER:
+            return
+        interface = self.player.ai.interface
+        position = interface.player_pos
+        for x_pos, y_pos in (numpy.argwhere(
+                interface.current_vision() == maze.RESOURCE)
+                             + (position.x - 1, position.y - 1)).tolist():
+            if self.__claimed[x_pos, y_pos]:
+                continue
+            self.__claimed[x_pos, y_pos] = True
+            self.__unclaimed -= 1
+            travel = max(0, int(self.__travel[x_pos, y_pos])) / TICKS_PER_SECOND
+            for _ in range(MINERS_PER_SOURCE):
+                self.scheduler.spawn(mining.miner(
+                    self.mines, maze.Tile(x_pos, y_pos), MINER_CAPACITY,
+                    MINING_RATE, travel))
+
+    def take_explored(self) -> pygame.Rect:
+        """Return the tiles walked through since the last call"""
+
+        explored, self.__explored = self.__explored, None
+        return explored
 
     def on_loop(self):
         """Additional actions to preform every loop"""
@@ -708,22 +1359,72 @@ class App:
     def on_render(self):
         """Actions to preform along with rendering the maze"""
 
+        if self.dirty_rects:
+            self.render_dirty()
+            return
+
+        camera = self.game_maze.camera
+        camera.follow((self.player.pos[0] + 8, self.player.pos[1] + 8))
         self._display_surf.fill((0, 0, 255))
         self.game_maze.draw(self._display_surf,
                             self.player.ai.interface.current_visible_tiles(),
-                            self.player.pos,
-                            self.display_mode)
-        if self.display_mode is 'maze':
+                            self.display_mode,
+                            self.player.ai.interface.player_maze.terrain,
+                            self.take_explored())
+        if self.display_mode == 'maze':
             self._display_surf.blit(self.player.state,
-                                    (self.player.pos[0], self.player.pos[1]))
-        elif self.display_mode is 'graph':
-            self._display_surf.blit(self.player.graph_surf, (0, 0))
+                                    camera.screen_position(self.player.pos))
 
         pygame.display.flip()
 
+    def render_dirty(self):
+        """Render the same frame as a full redraw, but only redraw and push
+
+        to the screen the regions that changed: the sprite, newly discovered
+        tiles, found and mined out resources, the trail and statistics whose
+        text changed. Scrolling the camera redraws the view and switching
+        display mode redraws everything.
+
+        """
+
+        camera = self.game_maze.camera
+        moved = camera.follow((self.player.pos[0] + 8, self.player.pos[1] + 8))
+        rects = self.game_maze.update(
+            self.player.ai.interface.current_visible_tiles(),
+            self.player.ai.interface.player_maze.terrain,
+            self.take_explored())
+
+        sprite_position = camera.screen_position(self.player.pos)
+        sprite_rect = self.player.state.get_rect(topleft=sprite_position)
+        rects.extend([self.__sprite_rect, sprite_rect])
+        self.__sprite_rect = sprite_rect
+        if moved:
+            rects.append(camera.view)
+
+        display_rect = self._display_surf.get_rect()
+        if self.display_mode != self.__drawn_mode:
+            self.__drawn_mode = self.display_mode
+            rects = [display_rect]
+        rects = [rect.clip(display_rect) for rect in rects]
+        rects = [rect for rect in rects if rect]
+
+        for rect in rects:
+            self.game_maze.draw_area(self._display_surf, rect,
+                                     self.display_mode)
+            if self.display_mode == 'maze':
+                self._display_surf.set_clip(rect)
+                self._display_surf.blit(self.player.state, sprite_position)
+                self._display_surf.set_clip(None)
+
+        pygame.display.update(rects)
+
     def on_cleanup(self):
         """Preform a graceful exit from the game"""
 
+        # Fonts and surfaces shared between games are only valid until quit,
+        # the next game loads them again
+        hud.release()
+        atlas.release()
         pygame.quit()
 
     def on_execute(self):
@@ -731,37 +1432,55 @@ class App:
 
         if self.on_init() == False:
             self._running = False
+        # The construction animation is not time the player should catch up
+        self.clock.tick()
 
         while self._running:
-            pygame.event.pump()
-            keys = pygame.key.get_pressed()
-            if keys[pygame.K_g]:
-                self.display_mode = "graph"
-            elif keys[pygame.K_m]:
-                self.display_mode = "maze"
-
-            if self.player.move(self._display_surf):
-                self.game_maze.win_animation(self._display_surf, self.player)
-                self.on_cleanup()
-            self.clock.tick(20)
+            for event in pygame.event.get():
+                self.on_event(event)
+            if not self._running:
+                break
 
+            won = self.simulate(self.clock.tick(self.fps) / 1000)
             self.on_loop()
             self.on_render()
+            if won:
+                self.player.win_animation(self._display_surf,
+                                          self.game_maze.camera)
+                self.game_maze.win_animation(self._display_surf, self.player)
+                self._running = False
         self.on_cleanup()
 
 
-def load_images(directory):
-    """Load all .png files from the provided directory into a dictionary"""
+def init_pygame():
+    """Initialize the pygame modules used by the game, leaving sound off"""
 
-    images = {}
-    for filename in os.listdir(directory):
-        if filename.endswith('.png'):
-            images[filename[:-4]] = pygame.image.load(
-                os.path.join(directory, filename)).convert_alpha()
+    pygame.font.init()
+    pygame.init()
+    pygame.mixer.quit()
+
+def blit_tiles(surf: pygame.Surface, index: numpy.ndarray,
+               tiles: List[pygame.Surface], position: (int, int) = (0, 0)):
+    """Draw a grid of tiles onto surf with a single blit
+
+    Args:
+        surf: The surface drawn on.
+        index: Integer array (x, y) selecting an image from tiles for every
+            cell of the grid.
+        tiles: Opaque images of equal size, the images index refers to.
+        position: Top left corner of the grid on surf.
+    """
 
-    return images
+    # Tile images in the pixel format of surf, so the grid is copied as is
+    mapped = numpy.stack([pygame.surfarray.map_array(
+        surf, pygame.surfarray.array3d(tile)) for tile in tiles])
+    width, height = mapped.shape[1:3]
+    pixels = mapped[index].transpose(0, 2, 1, 3).reshape(
+        index.shape[0] * width, index.shape[1] * height)
+    area = pygame.Rect(position, pixels.shape)
+    pygame.surfarray.blit_array(surf.subsurface(area), pixels)
 
 if __name__ == "__main__":
-    APP = App("find_exit")
+    APP = App(FIND_EXIT, (1, 1, 1))
     APP.on_execute()
 
@@ -0,0 +1,83 @@
+"""Run maze players without rendering
+
+The pygame front end animates a sprite a few pixels per frame, so driving
+an agent through it takes minutes per episode. This module steps an agent
+(any object with a step() method and a PlayerInterface named interface, e.g.
+dfs.DFS or random_mouse.RobertFrostRandomMouse) directly against its
+interface and reports how the episode went. Nothing here imports pygame.
+
+Agents that also have a run(max_steps) method taking all their steps in
+one call, as DFS and RobertFrostRandomMouse do, are run through it: the
+moves are the same as with step(), without the Tile and dictionary work of
+PlayerInterface.move_to on every step.
+"""
+
+import time
+from dataclasses import dataclass
+import numpy as np
+
+EXIT_TILE = 3
+
+
+@dataclass
+class EpisodeStats:
+    """Summary of a single headless episode"""
+    steps: int
+    unique_tiles: int
+    reached_exit: bool
+    seconds: float
+
+    @property
+    def seconds_per_step(self) -> float:
+        """Mean wall time spent on each step"""
+
+        return self.seconds / self.steps if self.steps else 0.0
+
+    @property
+    def steps_per_second(self) -> float:
+        """Step throughput of the episode"""
+
+        return self.steps / self.seconds if self.seconds else 0.0
+
+
+def run_episode(agent, max_steps: int = 100000,
+                fast: bool = True) -> EpisodeStats:
+    """Step agent until it stands on an exit tile or max_steps is reached
+
+    Args:
+        agent: A maze player exposing step() and interface.
+        max_steps: Upper bound on the number of steps taken.
+        fast: Take the steps with agent.run when the agent has it, rather
+            than calling step() for every step.
+
+    Return:
+        An EpisodeStats describing the episode.
+    """
+
+    interface = agent.interface
+    visited = np.zeros(interface.dimensions, dtype=bool)
+    pos = interface.player_pos
+    visited[pos.x, pos.y] = True
+    if fast and hasattr(agent, 'run'):
+        start = time.perf_counter()
+        tiles = agent.run(max_steps)
+        seconds = time.perf_counter() - start
+        visited[tiles[:, 0], tiles[:, 1]] = True
+        return EpisodeStats(len(tiles), int(np.count_nonzero(visited)),
+                            interface.tile_type(interface.player_pos)
+                            == EXIT_TILE, seconds)
+
+    reached_exit = interface.tile_type(pos) == EXIT_TILE
+
+    steps = 0
+    start = time.perf_counter()
+    while not reached_exit and steps < max_steps:
+        agent.step()
+        steps += 1
+        pos = interface.player_pos
+        visited[pos.x, pos.y] = True
+        reached_exit = interface.tile_type(pos) == EXIT_TILE
+    seconds = time.perf_counter() - start
+
+    return EpisodeStats(steps, int(np.count_nonzero(visited)), reached_exit,
+                        seconds)
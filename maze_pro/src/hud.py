@@ -0,0 +1,141 @@
+"""Cached text rendering for the heads up display
+
+Loading a font from disk and rendering text are by far the most expensive
+parts of drawing the game statistics, yet the text rarely changes between
+frames. TextCache loads every font once and keeps rendered text surfaces in
+a least recently used cache, and Label redraws a line of text only when
+the value it displays changes.
+"""
+
+from collections import OrderedDict
+from typing import List
+import pygame
+
+FONT = 'maze_pro/assets/fonts/breathe_fire.otf'
+BLACK = (0, 0, 0)
+
+
+class TextCache():
+    """Fonts loaded once and rendered text surfaces kept in an LRU cache
+
+    Attributes:
+        font_path: The font file used to render text.
+        max_entries: Number of rendered surfaces kept before the least
+            recently used one is dropped.
+        hits: Number of renders served from the cache.
+        misses: Number of renders that had to draw the text.
+
+    Methods:
+        font: Return the font of the given size, loading it on first use.
+        render: Return the surface of a string in a size and colour.
+    """
+
+    def __init__(self, font_path: str = FONT, max_entries: int = 256):
+        self.font_path = font_path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.__fonts = {}
+        self.__surfaces = OrderedDict()
+
+    def font(self, size: int) -> pygame.font.Font:
+        """Return the font in the given size, loaded from disk only once"""
+
+        if size not in self.__fonts:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            self.__fonts[size] = pygame.font.Font(self.font_path, size)
+        return self.__fonts[size]
+
+    def render(self, text: str, size: int = 20,
+               color: tuple = BLACK) -> pygame.Surface:
+        """Return an antialiased rendering of text, shared between callers
+
+        so it must not be drawn on
+
+        """
+
+        key = (text, size, tuple(color))
+        surface = self.__surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.__surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.font(size).render(text, True, color)
+        self.__surfaces[key] = surface
+        while len(self.__surfaces) > self.max_entries:
+            self.__surfaces.popitem(last=False)
+        return surface
+
+
+class Label():
+    """A line of text at a fixed position showing a changing value
+
+    Attributes:
+        cache: The TextCache rendering the text.
+        template: Format string the value is inserted into.
+        position: Top left corner of the text on the display.
+        size: Font size of the text.
+        color: Colour of the text.
+        value: The value currently displayed, None before the first update.
+        surface: The rendered text, None before the first update.
+        rect: The region of the display covered by the text.
+
+    Methods:
+        update: Display a new value, returning the regions that changed.
+        draw: Draw the text onto a surface.
+    """
+
+    def __init__(self, cache: TextCache, template: str, position: (int, int),
+                 size: int = 20, color: tuple = BLACK):
+        self.cache = cache
+        self.template = template
+        self.position = position
+        self.size = size
+        self.color = color
+        self.value = None
+        self.surface = None
+        self.rect = pygame.Rect(position, (0, 0))
+
+    def update(self, value) -> List[pygame.Rect]:
+        """Display value, rendering the text only if value changed
+
+        Return:
+            The regions covered by the old and new text when value changed,
+            otherwise an empty list.
+        """
+
+        if self.surface is not None and value == self.value:
+            return []
+
+        old_rect = self.rect
+        self.value = value
+        self.surface = self.cache.render(self.template.format(value),
+                                         self.size, self.color)
+        self.rect = self.surface.get_rect(topleft=self.position)
+        return [rect for rect in (old_rect, self.rect) if rect]
+
+    def draw(self, surf: pygame.Surface):
+        """Draw the text onto surf"""
+
+        if self.surface is not None:
+            surf.blit(self.surface, self.position)
+
+
+TEXT = None
+
+def text_cache() -> TextCache:
+    """Return the TextCache shared by the whole game, created on first use"""
+
+    global TEXT
+    if TEXT is None:
+        TEXT = TextCache()
+    return TEXT
+
+def release():
+    """Drop the shared TextCache, whose fonts must not outlive pygame.quit"""
+
+    global TEXT
+    TEXT = None
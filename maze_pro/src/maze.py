@@ -3,12 +3,11 @@
 import time
 import random
 from typing import List, Dict
-import copy
-import codecs, json
-from tqdm import tqdm
 import numpy as np
 from dataclasses import dataclass
-import matplotlib.pyplot as pyplot
+from construction_log import ConstructionLog, RECORD_NONE, RECORD_STEPS
+
+UNKNOWN, WALL, WALKABLE, RESOURCE = 0, 1, 2, 3
 
 @dataclass
 class Maze:
@@ -37,17 +36,21 @@ class Resources():
         __max: Maximum resource that can be placed in one location.
         locations: Dictionary of the form Tile:Int where tile is a maze location
             and Int is the amount of resource at that location.
+        rng: Random stream used to choose the amount placed at a location.
 
     Methods:
         place: Place random amount of resource at provided location
-        mine: Simulate mining resource
+        take: Remove resource from a location right away
+        mine: Simulate mining resource, blocking for the mining delay. See
+            mining.Mines for miners sharing a simulated clock.
     """
 
-    def __init__(self, resource_allocation: (int, int, int)):
+    def __init__(self, resource_allocation: (int, int, int), rng=random):
         self.stockpile = resource_allocation[0]
         self.__min = resource_allocation[1]
         self.__max = resource_allocation[2]
         self.locations = {}
+        self.rng = rng
 
     def place(self, location: Tile):
         """Given a tile, allocate random amount of resource from the stockpile
@@ -56,24 +59,34 @@ class Resources():
 
         """
 
-        amount = min(random.randint(self.__min, self.__max), self.stockpile)
+        amount = min(self.rng.randint(self.__min, self.__max), self.stockpile)
         self.locations[location] = amount
         self.stockpile = self.stockpile - amount
 
-    def mine(self, capacity: int, rate: float, source: Tile) -> int:
-        """Mine resource up to max(capacity, available resource at source)
+    def take(self, source: Tile, capacity: int) -> int:
+        """Remove up to capacity of the resource at source, returning the
 
-        returning after a simulated mining delay based on rate
+        amount removed
 
         """
 
-        if source not in self.locations:
-            return 0
+        available = self.locations.get(source, 0)
+        taken = min(capacity, available)
+        if taken:
+            self.locations[source] = available - taken
+        return taken
+
+    def mine(self, capacity: int, rate: float, source: Tile) -> int:
+        """Mine resource up to min(capacity, available resource at source)
 
-        available = self.locations[source]['amount']
-        mined = min(capacity, available)
-        time.sleep(capacity / rate)
-        self.locations[source] = available - mined
+        returning after a simulated mining delay based on rate, or right
+        away when there is nothing to mine
+
+        """
+
+        mined = self.take(source, capacity)
+        if mined:
+            time.sleep(capacity / rate)
 
         return mined
 
@@ -82,24 +95,52 @@ class PlayerInterface():
 
     to the maze to enforce vision restrictions of the maze
 
+    Tile types (UNKNOWN, WALL, WALKABLE, RESOURCE) are precomputed once into
+    a uint8 grid padded with a ring of walls, so vision is a 3x3 slice of
+    that grid and discovering tiles is a single slice assignment into
+    player_maze. The Tile keyed dictionaries returned by move and
+    current_visible_tiles are built from those slices for compatibility.
+
     Members:
-        __maze: Maze class object
+        __maze: MazeBuilder class object, built from dimensions,
+            resource_allocation and seed unless an existing builder is given
+        __tile_types: Padded uint8 grid of the type of every tile, indexed by
+            (x + 1, y + 1).
         player_pos: The player's current position in the maze
+        player_maze: Maze holding the uint8 tile types the player has
+            discovered.
+        resource_index: ResourceIndex of the resources of the maze.
 
     Methods:
         move(): Preform a move from player_pos to a destination tile
+        move_to(): Preform a move, returning the new vision as an array
+        walk(): Preform a sequence of moves at once, see DFS.run
         current_visible_tiles(): Return current visible tiles from player_pos
+        current_vision(): Return current visible tile types as a 3x3 array
+        tile_type_grid(): Return the padded tile type grid, read only
+        refresh_tile_types(): Recompute tile types after resources change
+        refresh_tile(): Recompute the tile type of a tile after its resources
+            change
         __discovered_tiles(): Return visible tiles from given tile
-        __resource_data(): Return amount of resource at provided tile (or None)
+        __vision(): Return visible tile types around a tile as an array
+        __reveal(): Copy the tile types visible from a tile into player_maze
 
     """
 
-    def __init__(self, dimensions: Tile, resource_allocation: (int, int, int)):
-        self.__maze = MazeBuilder(dimensions, resource_allocation)
-        self.player_maze = Maze(np.zeros(dimensions, dtype=int), dimensions)
+    def __init__(self, dimensions: Tile, resource_allocation: (int, int, int),
+                 seed=None, builder: 'MazeBuilder' = None):
+        if builder is None:
+            builder = MazeBuilder(dimensions, resource_allocation, seed)
+        self.__maze = builder
+        self.player_maze = Maze(np.zeros(dimensions, dtype=np.uint8),
+                                dimensions)
         self.dimensions = dimensions
         self.player_pos = self.__maze.player_start
-        self.update_player_maze(self.current_visible_tiles())
+        self.__tile_types = np.full((dimensions[0] + 2, dimensions[1] + 2),
+                                    WALL, dtype=np.uint8)
+        self.resource_index = ResourceIndex(self.__maze.dim)
+        self.refresh_tile_types()
+        self.__reveal(self.player_pos)
 
     def get_maze(self):
         return self.__maze
@@ -112,19 +153,50 @@ class PlayerInterface():
 
         """
 
+        self.move_to(dest_tile)
+        return self.__discovered_tiles(dest_tile)
+
+    def move_to(self, dest_tile: Tile) -> np.ndarray:
+        """Move player to dest_tile with the error checking of move, returning
+
+        the tile types visible from dest_tile as a read only 3x3 array
+
+        """
+
         if self.__maze.is_wall(dest_tile):
             raise ValueError('Dest: ' + str(dest_tile) + ' is a wall tile')
 
-        if dest_tile in adjacent_tiles(self.player_pos, self.__maze.maze):
-            self.player_pos = copy.copy(dest_tile)
-        else:
-            if dest_tile != self.player_pos:
-                raise ValueError(str(self.player_pos) + ' -> ' + str(dest_tile)
-                                 + ' ILLEGAL MOVE')
+        pos = self.player_pos
+        if abs(dest_tile.x - pos.x) + abs(dest_tile.y - pos.y) == 1:
+            self.player_pos = Tile(dest_tile.x, dest_tile.y)
+        elif dest_tile != pos:
+            raise ValueError(str(self.player_pos) + ' -> ' + str(dest_tile)
+                             + ' ILLEGAL MOVE')
+
+        return self.__reveal(dest_tile)
+
+    def walk(self, tiles: np.ndarray):
+        """Move player through tiles, an int array (n, 2) of the (x, y) of
+
+        consecutive steps, with the error checking of n calls to move_to but
+        revealing everything visible along the way in a few array operations
 
-        disc_tiles = self.__discovered_tiles(dest_tile)
-        self.update_player_maze(disc_tiles)
-        return disc_tiles
+        """
+
+        tiles = np.asarray(tiles, dtype=np.int64).reshape(-1, 2)
+        if not len(tiles):
+            return
+        if ((tiles < 0) | (tiles >= self.__maze.dim)).any():
+            raise ValueError('Walk leaves the maze')
+        if not self.__maze.maze.terrain[tiles[:, 0], tiles[:, 1]].all():
+            raise ValueError('Walk goes through a wall tile')
+        pos = self.player_pos
+        moves = np.diff(tiles, axis=0, prepend=[[pos.x, pos.y]])
+        if (np.abs(moves).sum(axis=1) > 1).any():
+            raise ValueError('Walk from ' + str(pos) + ' has an ILLEGAL MOVE')
+
+        paste_visions(self.player_maze.terrain, self.__tile_types, tiles)
+        self.player_pos = Tile(int(tiles[-1, 0]), int(tiles[-1, 1]))
 
     def update_player_maze(self, tiles: Dict[Tile, int]):
         """Updates the players view of the maze with discovered tiles"""
@@ -141,39 +213,96 @@ class PlayerInterface():
 
         return self.__discovered_tiles(self.player_pos)
 
+    def current_vision(self) -> np.ndarray:
+        """Return the tile types visible from player_pos as a read only 3x3
+
+        array indexed by (dx + 1, dy + 1)
+
+        """
+
+        return self.__vision(self.player_pos)
+
     def tile_type(self, tile):
 
-        if self.__resource_data(tile):
-            return 3
-        elif self.__maze.is_wall(tile):
-            return 1
+        return int(self.__tile_types[tile.x + 1, tile.y + 1])
+
+    def tile_type_grid(self) -> np.ndarray:
+        """Return a read only view of the tile types of the maze, padded
+
+        with a ring of walls and indexed by (x + 1, y + 1)
+
+        """
+
+        grid = self.__tile_types.view()
+        grid.flags.writeable = False
+        return grid
+
+    def refresh_tile_types(self):
+        """Recompute the tile type grid from the terrain and resources, and
+
+        update the tiles of resource_index whose amount changed, needed after
+        resources are placed or mined
+
+        """
+
+        index = self.resource_index
+        amounts = ResourceIndex(self.__maze.dim,
+                                self.__maze.resources.locations).amounts
+        # Updating the changed tiles keeps the tree of the index
+        for x_pos, y_pos in np.argwhere(amounts != index.amounts).tolist():
+            index.update(Tile(x_pos, y_pos), int(amounts[x_pos, y_pos]))
+        interior = self.__tile_types[1:-1, 1:-1]
+        interior[...] = np.where(self.__maze.maze.terrain, WALKABLE, WALL)
+        interior[index.amounts > 0] = RESOURCE
+
+    def refresh_tile(self, tile: Tile):
+        """Recompute the type and resource_index entry of tile, needed after
+
+        the resource at tile is placed or mined
+
+        """
+
+        amount = self.__maze.resources.locations.get(tile, 0)
+        self.resource_index.update(tile, amount)
+        if amount:
+            tile_type = RESOURCE
+        elif self.__maze.maze.terrain[tile.x, tile.y]:
+            tile_type = WALKABLE
         else:
-            return 2
+            tile_type = WALL
+        self.__tile_types[tile.x + 1, tile.y + 1] = tile_type
 
-    def __discovered_tiles(self, pos):
-        """Returns a dictionary of tiles obersvable from the provided position
+    def __vision(self, pos: Tile) -> np.ndarray:
+        """Return a read only view of the 3x3 tile types around pos"""
 
-        that maps tiles to the type of tile (wall, not wall, resource)
+        view = self.__tile_types[pos.x:pos.x + 3, pos.y:pos.y + 3]
+        view.flags.writeable = False
+        return view
+
+    def __reveal(self, pos: Tile) -> np.ndarray:
+        """Copy the tile types visible from pos into player_maze in one slice
+
+        assignment, returning the visible tile types
 
         """
 
-        offsets = [(x, y) for x in range(-1, 2) for y in range(-1, 2)]
-        tiles = [Tile(x + pos.x, y + pos.y) for (x, y) in offsets]
-        visited_tiles = {tile : self.tile_type(tile) for tile in tiles}
+        vision = self.__vision(pos)
+        paste_vision(self.player_maze.terrain, pos, vision)
 
-        return visited_tiles
+        return vision
 
-    def __resource_data(self, tile: Tile) -> int:
-        """Returns None if the provided tile is not a resource tile, otherwise
+    def __discovered_tiles(self, pos):
+        """Returns a dictionary of tiles obersvable from the provided position
 
-        returns the amount of resource at the provided tile
+        that maps tiles to the type of tile (wall, not wall, resource)
 
         """
 
-        if tile not in self.__maze.resources.locations:
-            return None
+        vision = self.__vision(pos).tolist()
+        visited_tiles = {Tile(x + pos.x, y + pos.y): vision[x + 1][y + 1]
+                         for x in range(-1, 2) for y in range(-1, 2)}
 
-        return self.__maze.resources.locations[tile]
+        return visited_tiles
 
 class MazeBuilder():
     """Random construction of a data structure representing a maze
@@ -185,8 +314,17 @@ class MazeBuilder():
             available resources in maze.
         player_start: The starting location for players traversing the maze.
         resources: A Resource class object.
+        rng: The random stream driving construction, see make_rng.
+        progress: Display a progress bar while the maze is built, or a
+            function called with (tiles done, tiles in total) as the build
+            progresses instead.
+        construction_log: A ConstructionLog of every step taken to build the
+            maze. record is either a recording level for a new in memory log
+            or a ConstructionLog to record into, e.g. one streaming to a file.
 
     Methods:
+        from_parts: Rebuild a MazeBuilder around an existing maze, e.g. one
+            loaded from a file, without constructing a new maze.
         __build_maze: Drive the random processes that construct a maze.
         random_walk: Preform a random walk from provided tile until a tile
             that is not a wall is discovered.
@@ -205,17 +343,52 @@ class MazeBuilder():
     """
 
     def __init__(self, dimensions: (int, int),
-                 resource_allocation: (int, int, int)):
+                 resource_allocation: (int, int, int),
+                 seed=None, progress: bool = True,
+                 record: str = RECORD_STEPS):
 
         self.dim = dimensions
         self.maze = Maze(np.zeros(dimensions, dtype=bool), dimensions)
         self.resource_allocation = resource_allocation
         self.player_start = None
-        self.resources = Resources(resource_allocation)
-        self.construction_json = {}
+        self.rng = make_rng(seed)
+        self.progress = progress
+        self.resources = Resources(resource_allocation, self.rng)
+        if isinstance(record, ConstructionLog):
+            self.construction_log = record
+        else:
+            self.construction_log = ConstructionLog(record, dimensions)
 
         self.__build_maze()
 
+    @classmethod
+    def from_parts(cls, maze: Maze, player_start: Tile, resources: Resources,
+                   resource_allocation: (int, int, int)) -> 'MazeBuilder':
+        """Return a MazeBuilder wrapping an already constructed maze
+
+        The terrain array is used as is (not copied) and no construction
+        steps are recorded.
+
+        """
+
+        builder = cls.__new__(cls)
+        builder.dim = maze.dim
+        builder.maze = maze
+        builder.resource_allocation = resource_allocation
+        builder.player_start = player_start
+        builder.rng = resources.rng
+        builder.progress = False
+        builder.resources = resources
+        builder.construction_log = ConstructionLog(RECORD_NONE, maze.dim)
+
+        return builder
+
+    @property
+    def construction_json(self) -> dict:
+        """The construction log expanded into the legacy dict of steps"""
+
+        return self.construction_log.as_json()
+
     def __build_maze(self):
         """Starting point for building data structures required for maze
 
@@ -225,72 +398,75 @@ class MazeBuilder():
         randomly build until no more tiles can be randomly selected.
 
         """
-        self.construction_json = {'color_map': {'seek': (100, 100, 100),
-                                                'reset': 'wall',
-                                                'clear': 'walkable'},
-                                 'speed': 1,
-                                 'steps': []}
-
-        self.player_start = random_wall_tile(self.maze)
-        clear_zone(self.player_start, self.maze, self.construction_json)
+
+        self.player_start = random_wall_tile(self.maze, self.rng)
+        clear_zone(self.player_start, self.maze, self.construction_log)
         available_tiles = Maze(np.copy(self.maze.terrain), self.dim)
         available_tiles.terrain[0, :] = available_tiles.terrain[-1, :] = True
         available_tiles.terrain[:, 0] = available_tiles.terrain[:, -1] = True
+        available_tiles = WallTileIndex(available_tiles, self.rng)
 
-        total_available_tiles = (np.size(available_tiles.terrain)
-                                 - np.count_nonzero(available_tiles.terrain))
-
-        with tqdm(total=total_available_tiles) as pbar:
+        total = len(available_tiles)
+        report = self.progress if callable(self.progress) else None
+        with progress_bar(total, self.progress and report is None) as pbar:
             # Place resource and connect to maze through a random walk
             while self.resources.stockpile > 0:
-                tile = random_wall_tile(available_tiles)
+                tile = available_tiles.random_tile()
                 self.resources.place(tile)
 
                 walk = self.random_walk(tile)
-                clear_tiles(walk, self.maze, self.construction_json)
+                clear_tiles(walk, self.maze, self.construction_log)
                 walk = [adjacent_tiles(x, self.maze) for x in walk]
                 walk = [x for sublist in walk for x in sublist]
-                available_tiles = clear_tiles(walk, available_tiles)
+                available_tiles.remove_all(walk)
 
                 pbar.update(len(walk))
+                if report is not None:
+                    report(total - len(available_tiles), total)
 
-            while not np.all(available_tiles.terrain):
-                walk = self.random_walk(random_wall_tile(available_tiles))
-                clear_tiles(walk, self.maze, self.construction_json)
+            while available_tiles:
+                walk = self.random_walk(available_tiles.random_tile())
+                clear_tiles(walk, self.maze, self.construction_log)
                 walk = [adjacent_tiles(x, self.maze) for x in walk]
                 walk = [x for sublist in walk for x in sublist]
-                available_tiles = clear_tiles(walk, available_tiles)
+                available_tiles.remove_all(walk)
 
                 pbar.update(len(walk))
+                if report is not None:
+                    report(total - len(available_tiles), total)
 
     def random_walk(self, start_tile: Tile) -> List[Tile]:
         """Preform a random walk along valid wall tiles return a path"""
 
-        def construct(construction, path, color):
-            construction['steps'].append({color: []})
-            for tile in path:
-                construction['steps'][-1][color].append((tile.x, tile.y))
-
-
+        log = self.construction_log
+        recording = log.recording()
         path = [start_tile]
+        path_index = {start_tile: 0}
+        logged = 0
         curr_tile = start_tile
 
         while not self.maze.terrain[curr_tile.x][curr_tile.y]:
-            next_tile = random_direction(curr_tile, self.maze)
+            next_tile = random_direction(curr_tile, self.maze, self.rng)
             for tile in adjacent_tiles(curr_tile, self.maze):
                 if self.maze.terrain[tile.x][tile.y]:
                     next_tile = tile
 
-            if next_tile in path:
-                construct(self.construction_json, path, 'seek')
-                construct(self.construction_json,
-                        list(reversed(path[path.index(next_tile):])), 'reset')
-                path = path[:path.index(next_tile) + 1]
+            if next_tile in path_index:
+                index = path_index[next_tile]
+                if recording:
+                    log.seek(path[logged:], logged)
+                    log.reset(reversed(path[index:]))
+                    logged = index + 1
+                for tile in path[index + 1:]:
+                    del path_index[tile]
+                del path[index + 1:]
             else:
+                path_index[next_tile] = len(path)
                 path.append(next_tile)
             curr_tile = next_tile
 
-        construct(self.construction_json, path, 'seek')
+        if recording:
+            log.seek(path[logged:], logged)
         return path
 
     def is_wall(self, tile: Tile) -> bool:
@@ -299,6 +475,235 @@ class MazeBuilder():
         return not self.maze.terrain[tile.x][tile.y]
 
 
+class WallTileIndex():
+    """Index of the wall tiles of a maze supporting random selection
+
+    A Fenwick tree over the flattened terrain counts the wall tiles that have
+    not been removed, so a random wall tile can be drawn and removed in
+    O(log n) rather than rescanning the terrain. Tiles are drawn in the same
+    order and with the same call to the random module as random_wall_tile,
+    so a seeded maze is unchanged by using the index.
+
+    Attributes:
+        dim: Dimensions of the indexed maze (x, y).
+        __walls: Flat list of booleans, True if the tile is still indexed.
+        __tree: The Fenwick tree of wall counts (1 indexed).
+        __count: The number of wall tiles still indexed.
+        rng: Random stream used to draw tiles.
+
+    Methods:
+        random_tile: Return a random indexed wall tile.
+        remove: Remove a tile from the index if it is indexed.
+        remove_all: Remove every tile in an iterable of tiles.
+    """
+
+    def __init__(self, maze: Maze, rng=random):
+        self.dim = maze.dim
+        self.rng = rng
+        self.__walls = (maze.terrain == False).ravel().tolist()
+        self.__count = sum(self.__walls)
+
+        size = len(self.__walls)
+        tree = [0] + [int(wall) for wall in self.__walls]
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+        self.__tree = tree
+
+    def __len__(self):
+        return self.__count
+
+    def random_tile(self) -> Tile:
+        """Return a random wall tile without removing it from the index"""
+
+        if not self.__count:
+            raise IndexError('No wall tiles remain in the index')
+
+        rank = self.rng.randrange(self.__count)
+        tree = self.__tree
+        pos = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            if pos + step < len(tree) and tree[pos + step] <= rank:
+                pos += step
+                rank -= tree[pos]
+            step >>= 1
+
+        return Tile(*divmod(pos, self.dim[1]))
+
+    def remove(self, tile: Tile):
+        """Remove tile from the index, ignoring tiles not in the index"""
+
+        if not valid_tile(tile, self):
+            return
+        flat = tile.x * self.dim[1] + tile.y
+        if not self.__walls[flat]:
+            return
+
+        self.__walls[flat] = False
+        self.__count -= 1
+        tree = self.__tree
+        flat += 1
+        while flat < len(tree):
+            tree[flat] -= 1
+            flat += flat & -flat
+
+    def remove_all(self, tiles):
+        """Remove every tile in tiles from the index"""
+
+        for tile in tiles:
+            self.remove(tile)
+
+
+class ResourceIndex():
+    """Index of the tiles holding resource supporting spatial queries
+
+    A dense grid holds the amount at every tile, so looking up and changing
+    the amount of a tile is O(1). Nearest and radius queries go through a
+    scipy.spatial.cKDTree of resource tiles, built on the first query after
+    tiles gain resource. Tiles that run out stay in the tree and are skipped
+    by queries, so mining never rebuilds it, until they make up half of it.
+    Distances are straight line distances in tiles, see
+    solver.MazeSolver.distance_field for distances through the maze.
+
+    Attributes:
+        dim: Dimensions of the indexed maze (x, y).
+        amounts: int64 array (x, y) of the amount of resource at every tile.
+        __count: Number of tiles holding resource.
+        __tree: The cKDTree, None until it is built or once it is outdated.
+        __points: int64 array (n, 2) of the tiles in the tree.
+        __stale: Number of tiles in the tree without resource.
+
+    Methods:
+        amount: Return the amount of resource at a tile.
+        update: Set the amount of resource at a tile.
+        area: Return the resource tiles inside a rectangle of tiles.
+        nearest: Return the k resource tiles closest to a position.
+        within: Return the resource tiles within a radius of a position.
+    """
+
+    def __init__(self, dimensions: (int, int), locations: Dict[Tile, int] = None):
+        self.dim = tuple(dimensions)
+        self.amounts = np.zeros(self.dim, dtype=np.int64)
+        if locations:
+            positions = np.array([(tile.x, tile.y) for tile in locations],
+                                 dtype=np.int64)
+            self.amounts[positions[:, 0], positions[:, 1]] = list(
+                locations.values())
+        self.__count = int(np.count_nonzero(self.amounts))
+        self.__tree = None
+        self.__points = np.zeros((0, 2), dtype=np.int64)
+        self.__stale = 0
+
+    def __len__(self):
+        return self.__count
+
+    def __contains__(self, tile: Tile) -> bool:
+        return self.amount(tile) > 0
+
+    def __iter__(self):
+        return (Tile(x, y) for x, y in np.argwhere(self.amounts > 0).tolist())
+
+    def amount(self, tile: Tile) -> int:
+        """Return the amount of resource at tile, 0 outside of the maze"""
+
+        if not (0 <= tile.x < self.dim[0] and 0 <= tile.y < self.dim[1]):
+            return 0
+        return int(self.amounts[tile.x, tile.y])
+
+    def update(self, tile: Tile, amount: int):
+        """Set the amount of resource at tile"""
+
+        if not (0 <= tile.x < self.dim[0] and 0 <= tile.y < self.dim[1]):
+            raise ValueError(str(tile) + ' is outside of the maze')
+
+        before = self.amounts[tile.x, tile.y]
+        self.amounts[tile.x, tile.y] = amount
+        if bool(before) == bool(amount):
+            return
+        if amount:
+            self.__count += 1
+            # The tile may still be in the tree from before it ran out
+            if self.__tree is not None and ((self.__points == (tile.x, tile.y))
+                                            .all(axis=1).any()):
+                self.__stale -= 1
+            else:
+                self.__tree = None
+        else:
+            self.__count -= 1
+            if self.__tree is not None:
+                self.__stale += 1
+
+    def area(self, low: (int, int), high: (int, int)) -> List[Tile]:
+        """Return the resource tiles (x, y) with low <= (x, y) < high"""
+
+        low = np.maximum(low, 0)
+        found = np.argwhere(self.amounts[low[0]:high[0], low[1]:high[1]] > 0)
+        return [Tile(x, y) for x, y in (found + low).tolist()]
+
+    def nearest(self, position: Tile, k: int = 1,
+                max_distance: float = np.inf) -> List[Tile]:
+        """Return up to k resource tiles no further than max_distance from
+
+        position, closest first
+
+        """
+
+        tree = self.__build()
+        if tree is None or k < 1:
+            return []
+
+        count = min(k + self.__stale, len(self.__points))
+        # The bound of cKDTree.query excludes neighbors at that distance
+        distances, indices = tree.query(
+            (position.x, position.y), count,
+            distance_upper_bound=np.nextafter(max_distance, np.inf))
+        indices = np.atleast_1d(indices)[np.isfinite(np.atleast_1d(distances))]
+        return self.__live(indices)[:k]
+
+    def within(self, position: Tile, radius: float) -> List[Tile]:
+        """Return the resource tiles no further than radius from position,
+
+        closest first
+
+        """
+
+        tree = self.__build()
+        if tree is None:
+            return []
+
+        indices = np.array(tree.query_ball_point((position.x, position.y),
+                                                 radius), dtype=np.int64)
+        offsets = self.__points[indices] - (position.x, position.y)
+        order = np.lexsort((indices, (offsets ** 2).sum(axis=1)))
+        return self.__live(indices[order])
+
+    def __live(self, indices: np.ndarray) -> List[Tile]:
+        """Return the tiles of the tree at indices that hold resource"""
+
+        points = self.__points[indices]
+        points = points[self.amounts[points[:, 0], points[:, 1]] > 0]
+        return [Tile(x, y) for x, y in points.tolist()]
+
+    def __build(self):
+        """Return the tree of resource tiles, rebuilding it if it is missing
+
+        tiles or mostly made of tiles without resource, None when no tile
+        holds resource
+
+        """
+
+        if not self.__count:
+            return None
+        if self.__tree is None or self.__stale * 2 > len(self.__points):
+            from scipy.spatial import cKDTree
+
+            self.__points = np.argwhere(self.amounts > 0)
+            self.__tree = cKDTree(self.__points)
+            self.__stale = 0
+        return self.__tree
+
 def valid_tile(tile, maze: Maze) -> bool:
     """Check for tile actually in maze"""
 
@@ -308,7 +713,8 @@ def valid_tile(tile, maze: Maze) -> bool:
         return False
     return True
 
-def clear_tiles(tiles, maze: Maze, construction = None) -> Maze:
+def clear_tiles(tiles, maze: Maze,
+                construction: ConstructionLog = None) -> Maze:
     """Clear each tile in tiles, concurrency safe over the set of tiles"""
 
     for tile in tiles:
@@ -316,14 +722,12 @@ def clear_tiles(tiles, maze: Maze, construction = None) -> Maze:
             maze.terrain[tile.x][tile.y] = True
 
 
-    if construction:
-        construction['steps'].append({'clear': []})
-        for tile in tiles:
-            construction['steps'][-1]['clear'].append((tile.x,
-                                                            tile.y))
+    if construction is not None:
+        construction.clear(tiles)
     return maze
 
-def clear_zone(center: Tile, maze: Maze, construction,  size: (int, int)=(3, 3)):
+def clear_zone(center: Tile, maze: Maze, construction: ConstructionLog,
+               size: (int, int)=(3, 3)):
     """Clear the 3x3 zone around center tile"""
 
     x, y = size
@@ -340,16 +744,58 @@ def clear_zone(center: Tile, maze: Maze, construction,  size: (int, int)=(3, 3))
 def print_maze_terrain(maze: Maze):
     """build and display a maze"""
 
+    import matplotlib.pyplot as pyplot
+
     pyplot.figure(figsize=(10, 10))
     pyplot.imshow(maze.terrain, cmap="Greys_r", interpolation='nearest')
     pyplot.xticks([]), pyplot.yticks([])
     pyplot.show()
 
-def random_wall_tile(maze: Maze) -> Tile:
+class SilentProgress():
+    """Stand in for a tqdm progress bar that displays nothing"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def update(self, count: int = 1):
+        pass
+
+def progress_bar(total: int, display: bool = True):
+    """Return a tqdm progress bar counting up to total, or a SilentProgress
+
+    when display is False, so tqdm is only imported when a bar is shown
+
+    """
+
+    if not display:
+        return SilentProgress()
+
+    from tqdm import tqdm
+    return tqdm(total=total)
+
+def make_rng(seed=None):
+    """Return the random stream described by seed
+
+    None selects the global random module, preserving the behaviour of
+    random.seed(). A random.Random instance is used as is so one stream can
+    be shared, and any other value seeds a new, independent random.Random.
+
+    """
+
+    if seed is None:
+        return random
+    if isinstance(seed, random.Random):
+        return seed
+    return random.Random(seed)
+
+def random_wall_tile(maze: Maze, rng=random) -> Tile:
     """Return a random wall tile"""
 
     available_tiles = np.column_stack((np.where(maze.terrain == False)))
-    tile_pos = random.choice(available_tiles)
+    tile_pos = rng.choice(available_tiles)
     rand_tile = Tile(tile_pos[0], tile_pos[1])
 
     return rand_tile
@@ -369,7 +815,7 @@ def adjacent_tiles(start_tile: Tile, maze: Maze) -> List[Tile]:
 
     return tiles
 
-def random_direction(start_tile: Tile, maze: Maze) -> Tile:
+def random_direction(start_tile: Tile, maze: Maze, rng=random) -> Tile:
     """Choose a random adjacent tile that is currently a wall"""
 
     possible_tiles = adjacent_tiles(start_tile, maze)
@@ -380,11 +826,50 @@ def random_direction(start_tile: Tile, maze: Maze) -> Tile:
     if not possible_tiles:
         raise ValueError('No valid moves')
     else:
-        return random.choice(possible_tiles)
+        return rng.choice(possible_tiles)
+
+def paste_vision(grid: np.ndarray, pos: Tile, vision: np.ndarray):
+    """Write a 3x3 vision array centered on pos into grid, clipping the
+
+    parts of the vision that fall outside of grid
+
+    """
+
+    width, height = grid.shape
+    low_x, low_y = max(pos.x - 1, 0), max(pos.y - 1, 0)
+    high_x, high_y = min(pos.x + 2, width), min(pos.y + 2, height)
+    grid[low_x:high_x, low_y:high_y] = vision[
+        low_x - pos.x + 1:high_x - pos.x + 1,
+        low_y - pos.y + 1:high_y - pos.y + 1]
+
+def paste_visions(grid: np.ndarray, tile_types: np.ndarray,
+                  positions: np.ndarray):
+    """Write into grid the tile types visible from every one of positions,
+
+    an int array (n, 2) of (x, y), as paste_vision would for each of them
+
+    Args:
+        grid: Array (x, y) the tile types are written into.
+        tile_types: The tile types of grid padded with a ring of walls, see
+            PlayerInterface.tile_type_grid.
+        positions: The positions the tiles are seen from.
+    """
+
+    width, height = grid.shape
+    seen_from = np.zeros((width + 2, height + 2), dtype=bool)
+    seen_from[positions[:, 0] + 1, positions[:, 1] + 1] = True
+    visible = np.zeros((width, height), dtype=bool)
+    for x_shift in range(3):
+        for y_shift in range(3):
+            visible |= seen_from[x_shift:x_shift + width,
+                                 y_shift:y_shift + height]
+    grid[visible] = tile_types[1:-1, 1:-1][visible]
 
 def serialize_maze_json(maze: Maze, file_path: str):
     """Store maze as json file"""
 
+    import codecs, json
+
     formatted_array = maze.terrain.tolist()
     json.dump(formatted_array, codecs.open(
         file_path, 'w', encoding='utf-8'), separators=(',', ':'),
@@ -0,0 +1,136 @@
+"""Versioned binary file format for storing complete mazes
+
+A maze file holds everything needed to rebuild a MazeBuilder: the
+dimensions, player start, resource allocation, remaining stockpile, the
+resource locations and the terrain. All values are little endian.
+
+    offset  size  contents
+    0       4     magic b'MZPR'
+    4       2     format version
+    6       2     flags, bit 0 set when the terrain is bit packed
+    8       8     x and y dimensions (uint32)
+    16      8     player start x and y (int32)
+    24      32    resource allocation total, stockpile, min and max (int64)
+    56      8     number of resource locations (uint64)
+    64      ...   resource locations as (x, y, amount) int64 triples
+    ...     ...   terrain, starting at the next multiple of 64 bytes
+
+Version 1 files lack the allocation total, which is taken to be the
+resource left in the maze plus the stockpile, and start the locations at
+offset 56.
+
+The terrain is stored row major (x then y) either bit packed, eight tiles
+per byte, or as one byte per tile. Files are memory mapped when loaded: an
+unpacked terrain is used directly from the mapping without any copy. A
+packed terrain, the default of save_maze as it is eight times smaller, is
+expanded with a single vectorized unpack into a new array, so loading it
+reads and copies the whole terrain. Save with packed=False for mazes that
+are loaded often or are too large to copy.
+"""
+
+import struct
+import numpy as np
+import maze as maze
+
+MAGIC = b'MZPR'
+VERSION = 2
+FLAG_PACKED = 1
+HEADER = struct.Struct('<4sHHIIiiqqqqQ')
+# The header of version 1, without the allocation total
+HEADER_V1 = struct.Struct('<4sHHIIiiqqqQ')
+PREAMBLE = struct.Struct('<4sH')
+ALIGNMENT = 64
+
+
+def save_maze(builder: maze.MazeBuilder, file_path: str, packed: bool = True):
+    """Write the maze, player start and resources of builder to file_path"""
+
+    width, height = builder.dim
+    resources = builder.resources
+    locations = np.array([(tile.x, tile.y, amount) for tile, amount
+                          in resources.locations.items()],
+                         dtype='<i8').reshape(-1, 3)
+    allocation = builder.resource_allocation
+
+    header = HEADER.pack(MAGIC, VERSION, FLAG_PACKED if packed else 0,
+                         width, height,
+                         builder.player_start.x, builder.player_start.y,
+                         allocation[0], resources.stockpile, allocation[1],
+                         allocation[2], len(locations))
+
+    terrain = np.ascontiguousarray(builder.maze.terrain, dtype=bool)
+    if packed:
+        terrain = np.packbits(terrain, axis=None)
+    else:
+        terrain = terrain.view(np.uint8)
+
+    with open(file_path, 'wb') as maze_file:
+        maze_file.write(header)
+        maze_file.write(locations.tobytes())
+        maze_file.write(bytes(terrain_offset(len(locations))
+                              - HEADER.size - locations.nbytes))
+        maze_file.write(terrain.tobytes())
+
+def load_maze(file_path: str, seed=None) -> maze.MazeBuilder:
+    """Memory map a maze file and rebuild the MazeBuilder stored in it
+
+    The terrain of an unpacked file is a copy on write view of the mapping,
+    so the file on disk is never modified.
+
+    Args:
+        file_path: Path of a file written by save_maze.
+        seed: Seed or random stream for the rebuilt Resources, see
+            maze.make_rng.
+    """
+
+    mapping = np.memmap(file_path, dtype=np.uint8, mode='c')
+    if mapping.size < HEADER_V1.size:
+        raise ValueError(file_path + ' is not a maze file')
+
+    magic, version = PREAMBLE.unpack_from(mapping)
+    if magic != MAGIC:
+        raise ValueError(file_path + ' is not a maze file')
+    if version not in (1, VERSION):
+        raise ValueError('Unsupported maze file version: ' + str(version))
+    header = HEADER if version == VERSION else HEADER_V1
+    if mapping.size < header.size:
+        raise ValueError(file_path + ' is not a maze file')
+    if version == VERSION:
+        (_, _, flags, width, height, start_x, start_y, total, stockpile,
+         low, high, count) = HEADER.unpack_from(mapping)
+    else:
+        (_, _, flags, width, height, start_x, start_y, stockpile,
+         low, high, count) = HEADER_V1.unpack_from(mapping)
+        total = None
+
+    dimensions = (width, height)
+    start = header.size
+    locations = mapping[start:start + count * 24].view('<i8').reshape(-1, 3)
+    if total is None:
+        total = int(locations[:, 2].sum()) + stockpile
+
+    offset = terrain_offset(count, header)
+    tiles = width * height
+    if flags & FLAG_PACKED:
+        packed = mapping[offset:offset + (tiles + 7) // 8]
+        terrain = np.unpackbits(np.asarray(packed), count=tiles).view(bool)
+    else:
+        terrain = mapping[offset:offset + tiles].view(bool)
+    terrain = terrain.reshape(dimensions)
+
+    allocation = (total, low, high)
+    resources = maze.Resources(allocation, maze.make_rng(seed))
+    resources.stockpile = stockpile
+    resources.locations = {maze.Tile(int(x), int(y)): int(amount)
+                           for x, y, amount in locations.tolist()}
+
+    return maze.MazeBuilder.from_parts(maze.Maze(terrain, dimensions),
+                                       maze.Tile(start_x, start_y),
+                                       resources, allocation)
+
+def terrain_offset(resource_count: int,
+                   header: struct.Struct = HEADER) -> int:
+    """Return the aligned offset of the terrain in a maze file"""
+
+    end = header.size + resource_count * 24
+    return -(-end // ALIGNMENT) * ALIGNMENT
@@ -0,0 +1,227 @@
+"""Junction graph of a maze
+
+Corridors in a maze are runs of walkable tiles with exactly two walkable
+neighbours. Compressing every corridor into a single weighted edge leaves a
+graph whose nodes are the dead ends and junctions of the maze, which is far
+smaller than the tile grid and is what rendering, agents and solvers
+actually need. MazeGraph builds that graph once from Maze.terrain.
+
+Tiles are addressed by their flat index (x + 1) * (y + 2) + (y + 1) into the
+terrain padded with a ring of walls, so neighbours are a fixed offset away
+and never fall outside of the grid.
+"""
+
+from typing import List
+import numpy as np
+import maze as maze
+
+
+class MazeGraph():
+    """Dead ends and junctions of a maze joined by corridor edges
+
+    A walkable tile is a node unless it has exactly two walkable neighbours.
+    Every edge joins two nodes (possibly the same node for a corridor that
+    loops back) and stores the corridor tiles between them in order. Loops
+    made only of corridor tiles get one of their tiles promoted to a node so
+    every walkable tile lies on the graph.
+
+    Attributes:
+        dim: Dimensions of the maze (x, y).
+        degree: uint8 array (x, y) of the walkable neighbours of every
+            walkable tile, 0 for walls.
+        node_ids: int32 array (x, y) holding the node index of node tiles and
+            -1 everywhere else.
+        edge_ids: int32 array (x, y) holding the index of the edge a corridor
+            tile belongs to and -1 everywhere else.
+        nodes: int array (node count, 2) of node positions (x, y).
+        edge_nodes: int32 array (edge count, 2) of the nodes each edge joins.
+        edge_lengths: int32 array of the number of steps along each edge.
+
+    Methods:
+        is_node: Return True if the provided tile is a node.
+        node_tile: Return the Tile of a node.
+        neighbours: Return the (neighbour node, edge index) pairs of a node.
+        edge_positions: Return the positions along an edge as an array.
+        edge_path: Return every tile along an edge, endpoints included.
+        edge_paths: Iterate over the tile paths of every edge.
+        edge_bounds: Return the bounding box of every edge.
+    """
+
+    def __init__(self, maze_data: maze.Maze):
+
+        self.dim = tuple(maze_data.dim)
+        width = self.dim[1] + 2
+        padded = np.zeros((self.dim[0] + 2, width), dtype=bool)
+        padded[1:-1, 1:-1] = maze_data.terrain
+        walkable = padded[1:-1, 1:-1]
+
+        degree = (padded[2:, 1:-1].astype(np.uint8) + padded[:-2, 1:-1]
+                  + padded[1:-1, 2:] + padded[1:-1, :-2])
+        self.degree = np.where(walkable, degree, 0).astype(np.uint8)
+        self.__width = width
+        self.__bounds = None
+
+        flat = padded.ravel()
+        is_node = np.zeros(flat.size, dtype=bool)
+        is_node.reshape(padded.shape)[1:-1, 1:-1] = walkable & (degree != 2)
+        corridor = np.zeros(flat.size, dtype=bool)
+        corridor.reshape(padded.shape)[1:-1, 1:-1] = walkable & (degree == 2)
+
+        # Both walkable neighbours of every corridor tile, so tracing a
+        # corridor is a list lookup per tile
+        first = np.full(flat.size, -1, dtype=np.int64)
+        second = np.full(flat.size, -1, dtype=np.int64)
+        for offset in (width, -width, 1, -1):
+            neighbour = np.flatnonzero(corridor & np.roll(flat, -offset))
+            unset = first[neighbour] < 0
+            first[neighbour[unset]] = neighbour[unset] + offset
+            second[neighbour[~unset]] = neighbour[~unset] + offset
+
+        self.__trace(is_node, corridor, first.tolist(), second.tolist())
+
+    def __trace(self, is_node, corridor, first, second):
+        """Follow every corridor leaving a node to build the edges"""
+
+        width = self.__width
+        offsets = (width, -width, 1, -1)
+        node_list = np.flatnonzero(is_node).tolist()
+        node_flags = is_node.tolist()
+        edge_of = [-1] * is_node.size
+
+        # Neighbouring nodes share an edge without any corridor tiles
+        edge_starts, edge_ends = [], []
+        for offset in (width, 1):
+            start = np.flatnonzero(is_node & np.roll(is_node, -offset))
+            edge_starts.extend(start.tolist())
+            edge_ends.extend((start + offset).tolist())
+        path_lengths = [0] * len(edge_starts)
+        path_tiles = []
+
+        def follow(start, current):
+            edge = len(path_lengths)
+            previous = start
+            length = 0
+            while not node_flags[current]:
+                edge_of[current] = edge
+                path_tiles.append(current)
+                length += 1
+                following = first[current]
+                if following == previous:
+                    following = second[current]
+                previous, current = current, following
+            edge_starts.append(start)
+            edge_ends.append(current)
+            path_lengths.append(length)
+
+        entries = []
+        for offset in offsets:
+            start = np.flatnonzero(is_node & np.roll(corridor, -offset))
+            entries.extend(zip(start.tolist(), (start + offset).tolist()))
+        for start, current in entries:
+            if edge_of[current] < 0:
+                follow(start, current)
+
+        # Corridors closed into a loop without any node
+        untraced = corridor & (np.array(edge_of) < 0)
+        for index in np.flatnonzero(untraced).tolist():
+            if edge_of[index] < 0:
+                node_flags[index] = True
+                node_list.append(index)
+                follow(index, first[index])
+
+        grid_shape = (self.dim[0] + 2, width)
+        node_ids = np.full(is_node.size, -1, dtype=np.int32)
+        node_ids[node_list] = np.arange(len(node_list), dtype=np.int32)
+        self.nodes = np.column_stack(np.unravel_index(node_list,
+                                                      grid_shape)) - 1
+        self.node_ids = node_ids.reshape(grid_shape)[1:-1, 1:-1].copy()
+        self.edge_ids = np.array(edge_of, dtype=np.int32).reshape(
+            grid_shape)[1:-1, 1:-1].copy()
+
+        self.edge_nodes = np.column_stack((node_ids[edge_starts],
+                                           node_ids[edge_ends]))
+        self.edge_lengths = np.array(path_lengths, dtype=np.int32) + 1
+        self.__path_offsets = np.zeros(len(path_lengths) + 1, dtype=np.int64)
+        np.cumsum(path_lengths, out=self.__path_offsets[1:])
+        self.__path_tiles = np.array(path_tiles, dtype=np.int64)
+
+        # Edges of every node, sorted by node, with loops listed once
+        loops = self.edge_nodes[:, 0] == self.edge_nodes[:, 1]
+        edges = np.arange(len(path_lengths))
+        ends = np.concatenate((self.edge_nodes[:, 0],
+                               self.edge_nodes[~loops, 1]))
+        order = np.argsort(ends, kind='stable')
+        self.__adjacent_edges = np.concatenate((edges, edges[~loops]))[order]
+        self.__adjacent_nodes = np.concatenate(
+            (self.edge_nodes[:, 1], self.edge_nodes[~loops, 0]))[order]
+        self.__adjacent_offsets = np.searchsorted(
+            ends[order], np.arange(len(node_list) + 1))
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def is_node(self, tile: maze.Tile) -> bool:
+        """Return True if tile is a dead end or junction of the maze"""
+
+        return bool(self.node_ids[tile.x, tile.y] >= 0)
+
+    def node_tile(self, node: int) -> maze.Tile:
+        """Return the position of node as a Tile"""
+
+        x, y = self.nodes[node]
+        return maze.Tile(int(x), int(y))
+
+    def neighbours(self, node: int) -> List[tuple]:
+        """Return the (neighbour node, edge index) pairs of node"""
+
+        low = self.__adjacent_offsets[node]
+        high = self.__adjacent_offsets[node + 1]
+        return list(zip(self.__adjacent_nodes[low:high].tolist(),
+                        self.__adjacent_edges[low:high].tolist()))
+
+    def edge_positions(self, edge: int) -> np.ndarray:
+        """Return an int array (length + 1, 2) of the positions along edge"""
+
+        corridor = self.__path_tiles[self.__path_offsets[edge]:
+                                     self.__path_offsets[edge + 1]]
+        positions = np.empty((len(corridor) + 2, 2), dtype=np.int64)
+        positions[0], positions[-1] = self.nodes[self.edge_nodes[edge]]
+        positions[1:-1, 0], positions[1:-1, 1] = np.divmod(corridor,
+                                                           self.__width)
+        positions[1:-1] -= 1
+        return positions
+
+    def edge_path(self, edge: int) -> List[maze.Tile]:
+        """Return the tiles along edge in order, both endpoints included"""
+
+        return [maze.Tile(x, y) for x, y in self.edge_positions(edge).tolist()]
+
+    def edge_paths(self):
+        """Iterate over the tile paths of every edge, see edge_path"""
+
+        for edge in range(len(self.edge_lengths)):
+            yield self.edge_path(edge)
+
+    def edge_bounds(self) -> np.ndarray:
+        """Return an int array (edge count, 4) of the smallest and largest
+
+        position (min x, min y, max x, max y) along every edge, computed on
+        first use
+
+        """
+
+        if self.__bounds is None:
+            ends = self.nodes[self.edge_nodes]
+            low, high = ends.min(axis=1), ends.max(axis=1)
+            lengths = np.diff(self.__path_offsets)
+            corridors = lengths > 0
+            if corridors.any():
+                positions = np.column_stack(np.divmod(self.__path_tiles,
+                                                      self.__width)) - 1
+                starts = self.__path_offsets[:-1][corridors]
+                low[corridors] = np.minimum(
+                    low[corridors], np.minimum.reduceat(positions, starts))
+                high[corridors] = np.maximum(
+                    high[corridors], np.maximum.reduceat(positions, starts))
+            self.__bounds = np.hstack((low, high))
+        return self.__bounds
@@ -0,0 +1,138 @@
+"""Mazes generated ahead of time in a background process
+
+Building a maze is by far the slowest part of starting a game or an
+episode. MazePool runs MazeBuilder in a worker process and keeps a bounded
+queue of finished mazes, construction logs included, so a new game only
+waits when the queue has run dry. Progress on the maze being built is
+shared with the parent process for the user interface to display.
+
+Every maze is built from its own seed spawned from the root seed with
+numpy.random.SeedSequence, the same seeds maze_pro.generate derives, so a
+pool produces the same mazes as generating them one by one.
+"""
+
+import multiprocessing
+import signal
+import numpy as np
+import maze as maze
+from construction_log import RECORD_STEPS
+
+
+class MazePool():
+    """A bounded queue of mazes kept full by a worker process
+
+    Attributes:
+        dim: Dimensions of every maze (x, y).
+        resource_allocation: Resource allocation used for each maze.
+        size: Number of finished mazes held before the worker waits.
+        seed: Root seed the seed of every maze is spawned from.
+        record: Recording level of the construction logs, see
+            construction_log.ConstructionLog.
+
+    Methods:
+        get: Return the next maze, waiting for it to be built if needed.
+        ready: Return the number of finished mazes waiting in the queue.
+        progress: Return how far the maze being built is, between 0 and 1.
+        close: Stop the worker process.
+    """
+
+    def __init__(self, dimensions: (int, int),
+                 resource_allocation: (int, int, int) = (1, 1, 1),
+                 size: int = 2, seed=None, record: str = RECORD_STEPS):
+        if size < 1:
+            raise ValueError('A maze pool must hold at least one maze')
+
+        self.dim = tuple(dimensions)
+        self.resource_allocation = tuple(resource_allocation)
+        self.size = size
+        self.seed = seed
+        self.record = record
+        self.__queue = multiprocessing.Queue(size)
+        self.__progress = multiprocessing.Array('d', 2)
+        self.__built = multiprocessing.Value('q', 0)
+        self.__taken = 0
+        self.__worker = multiprocessing.Process(
+            target=produce, daemon=True,
+            args=(self.__queue, self.__progress, self.__built, self.dim,
+                  self.resource_allocation, seed, record))
+        self.__worker.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, timeout: float = None) -> maze.MazeBuilder:
+        """Return the next finished maze, waiting at most timeout seconds
+
+        (forever when None) for it to be built
+
+        Raise:
+            queue.Empty: No maze was finished within timeout.
+        """
+
+        if not self.__worker.is_alive() and self.ready() == 0:
+            raise ValueError('The maze pool worker has stopped')
+        builder = self.__queue.get(timeout=timeout)
+        self.__taken += 1
+        return builder
+
+    def ready(self) -> int:
+        """Return the number of finished mazes waiting to be taken"""
+
+        return self.__built.value - self.__taken
+
+    def progress(self) -> float:
+        """Return the fraction of the maze currently being built, 1.0 when
+
+        the queue is full and the worker is waiting
+
+        """
+
+        with self.__progress.get_lock():
+            done, total = self.__progress[:]
+        return min(1.0, done / total) if total else 0.0
+
+    def close(self):
+        """Stop the worker process, dropping any maze it was building"""
+
+        if self.__worker.is_alive():
+            self.__worker.terminate()
+        self.__worker.join()
+        self.__queue.close()
+
+
+def produce(mazes, progress, built, dimensions, resource_allocation, seed,
+            record):
+    """Build mazes forever, run inside the worker process of a MazePool
+
+    Blocks whenever mazes, the queue of finished mazes, is full.
+
+    """
+
+    # Handlers installed by the parent, e.g. by SDL, would keep close from
+    # stopping the worker
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    def report(done, total):
+        with progress.get_lock():
+            progress[:] = [done, total]
+
+    sequence = np.random.SeedSequence(seed)
+    while True:
+        report(0, 0)
+        builder = maze.MazeBuilder(dimensions, resource_allocation,
+                                   maze_seed(sequence.spawn(1)[0]),
+                                   progress=report, record=record)
+        # The reporting function stays behind in the worker
+        builder.progress = False
+        report(1, 1)
+        mazes.put(builder)
+        with built.get_lock():
+            built.value += 1
+
+def maze_seed(sequence: np.random.SeedSequence) -> int:
+    """Return the integer seed of a maze drawn from a spawned SeedSequence"""
+
+    return int.from_bytes(sequence.generate_state(4).tobytes(), 'little')
@@ -0,0 +1,296 @@
+"""Concurrent mining of maze resources on a simulated clock
+
+Miners are coroutines (async def functions) run by a Scheduler instead of
+threads blocked in time.sleep. Awaiting Scheduler.sleep suspends a miner
+until the simulated clock reaches its wake up time, and the clock only
+moves when the Scheduler is told to: run jumps from one event straight to
+the next, so a headless simulation takes as long as its events take to
+process, while advance moves the clock by the seconds a frame took, which
+keeps the simulation in real time under the pygame loop.
+
+Mines arbitrates the sources in Resources.locations between any number of
+miners. Every source has a number of slots that miners take in arrival
+order, and the amount a miner extracts is taken out of locations as soon
+as it starts mining, so miners never extract the same resource twice and
+everything placed is accounted for as remaining, in flight or delivered.
+
+Example:
+    scheduler = Scheduler()
+    mines = Mines(builder.resources, scheduler)
+
+    for source in builder.resources.locations:
+        scheduler.spawn(miner(mines, source, capacity=5, rate=2.0,
+                              travel=3.0))
+    scheduler.run()
+
+The gather mode of the game runs its miners the same way, advancing the
+scheduler every frame.
+"""
+
+import heapq
+import itertools
+from collections import deque
+
+
+class Sleep():
+    """Awaitable suspending a coroutine run by a Scheduler for a number of
+
+    simulated seconds
+
+    """
+
+    def __init__(self, seconds: float):
+        if seconds < 0:
+            raise ValueError('Cannot sleep for negative time: '
+                             + str(seconds))
+        self.seconds = seconds
+
+    def __await__(self):
+        yield self
+
+
+class Future():
+    """Awaitable result that coroutines run by a Scheduler can wait for
+
+    Attributes:
+        done: True once the result has been set.
+        result: The result, None until it has been set.
+        callbacks: Functions called without arguments when the result is set.
+
+    Methods:
+        set_result: Set the result, resuming every coroutine waiting for it.
+    """
+
+    def __init__(self):
+        self.done = False
+        self.result = None
+        self.callbacks = []
+
+    def __await__(self):
+        if not self.done:
+            yield self
+        return self.result
+
+    def set_result(self, result):
+        """Set the result, resuming the coroutines awaiting it"""
+
+        if self.done:
+            raise ValueError('The result of a Future can only be set once')
+        self.done = True
+        self.result = result
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+class Task(Future):
+    """A coroutine run by a Scheduler, whose result is the value returned by
+
+    the coroutine
+
+    Attributes:
+        coroutine: The coroutine being run.
+    """
+
+    def __init__(self, coroutine):
+        super().__init__()
+        self.coroutine = coroutine
+
+
+class Scheduler():
+    """Runs coroutines on a simulated clock
+
+    Coroutines wake up in the order of their wake up time, and in the order
+    they went to sleep when those are equal, so a simulation always plays
+    out the same way.
+
+    Attributes:
+        now: The simulated time in seconds.
+        steps: Number of times a coroutine has been resumed.
+
+    Methods:
+        spawn: Start running a coroutine.
+        sleep: Return an awaitable waiting a number of simulated seconds.
+        future: Return a Future coroutines can wait for.
+        run: Run the coroutines until none is left or the clock reaches a time.
+        advance: Run the coroutines for a number of simulated seconds.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+        self.steps = 0
+        self.__events = []
+        self.__order = itertools.count()
+
+    def __len__(self):
+        return len(self.__events)
+
+    def spawn(self, coroutine) -> Task:
+        """Start running coroutine at the current time, returning its Task"""
+
+        task = Task(coroutine)
+        self.__schedule(self.now, task)
+        return task
+
+    def sleep(self, seconds: float) -> Sleep:
+        """Return an awaitable suspending a coroutine for seconds"""
+
+        return Sleep(seconds)
+
+    def future(self) -> Future:
+        """Return a new Future"""
+
+        return Future()
+
+    def run(self, until: float = None) -> float:
+        """Resume coroutines in the order they wake up, moving the clock
+
+        straight to every wake up time, until no coroutine is left or the
+        next one wakes up after until. The clock is left at until when given.
+
+        Return:
+            The simulated time reached.
+        """
+
+        events = self.__events
+        while events and (until is None or events[0][0] <= until):
+            when, _, task = heapq.heappop(events)
+            self.now = max(self.now, when)
+            self.__resume(task)
+        if until is not None:
+            self.now = max(self.now, until)
+        return self.now
+
+    def advance(self, seconds: float) -> float:
+        """Run the coroutines waking up in the next seconds, e.g. the time
+
+        a frame took to keep the simulation in real time
+
+        """
+
+        return self.run(self.now + seconds)
+
+    def __schedule(self, when: float, task: Task):
+        heapq.heappush(self.__events, (when, next(self.__order), task))
+
+    def __resume(self, task: Task):
+        """Run task until it sleeps, waits or finishes"""
+
+        self.steps += 1
+        try:
+            request = task.coroutine.send(None)
+        except StopIteration as stop:
+            task.set_result(stop.value)
+            return
+
+        if isinstance(request, Sleep):
+            self.__schedule(self.now + request.seconds, task)
+        elif isinstance(request, Future):
+            request.callbacks.append(
+                lambda: self.__schedule(self.now, task))
+        else:
+            raise ValueError('Coroutines run by a Scheduler can only await '
+                             'Scheduler.sleep, futures and tasks, not '
+                             + repr(request))
+
+
+class Mines():
+    """Sources of resources shared by concurrent miners
+
+    Attributes:
+        resources: The maze.Resources whose locations are mined.
+        scheduler: The Scheduler the miners run on.
+        slots: Number of miners that can work a source at the same time.
+        on_mined: Function called with a source whenever resource is taken
+            from it, e.g. PlayerInterface.refresh_tile, None to do nothing.
+        delivered: Total amount of resource mined.
+        in_flight: Amount of resource taken from sources by miners that are
+            still mining it.
+        waiting: Number of miners waiting for a free slot.
+
+    Methods:
+        mine: Mine a source, waiting for a free slot first.
+    """
+
+    def __init__(self, resources, scheduler: Scheduler, slots: int = 1,
+                 on_mined=None):
+        if slots < 1:
+            raise ValueError('A source needs at least one slot')
+        self.resources = resources
+        self.scheduler = scheduler
+        self.slots = slots
+        self.on_mined = on_mined
+        self.delivered = 0
+        self.in_flight = 0
+        self.waiting = 0
+        self.__busy = {}
+        self.__queues = {}
+
+    async def mine(self, source, capacity: int, rate: float) -> int:
+        """Mine up to capacity from source, taking capacity / rate simulated
+
+        seconds once a slot of source is free, like Resources.mine
+
+        Return:
+            The amount mined, 0 without waiting if source is exhausted.
+        """
+
+        if rate <= 0:
+            raise ValueError('Mining rate must be positive: ' + str(rate))
+        if not self.resources.locations.get(source, 0):
+            return 0
+
+        await self.__acquire(source)
+        try:
+            mined = self.resources.take(source, capacity)
+            if mined and self.on_mined is not None:
+                self.on_mined(source)
+            self.in_flight += mined
+            if mined:
+                await self.scheduler.sleep(capacity / rate)
+            self.in_flight -= mined
+            self.delivered += mined
+        finally:
+            self.__release(source)
+
+        return mined
+
+    async def __acquire(self, source):
+        """Take a slot of source, waiting for one in arrival order"""
+
+        if self.__busy.get(source, 0) < self.slots:
+            self.__busy[source] = self.__busy.get(source, 0) + 1
+            return
+
+        turn = self.scheduler.future()
+        self.__queues.setdefault(source, deque()).append(turn)
+        self.waiting += 1
+        await turn
+
+    def __release(self, source):
+        """Hand the slot of source to the next miner waiting, if any"""
+
+        queue = self.__queues.get(source)
+        if queue:
+            self.waiting -= 1
+            queue.popleft().set_result(None)
+        else:
+            self.__busy[source] -= 1
+
+
+async def miner(mines: Mines, source, capacity: int, rate: float,
+                travel: float = 0.0) -> int:
+    """Mine source until it runs out, walking travel simulated seconds to
+
+    source before every load and as long back with it
+
+    Return:
+        The amount this miner mined.
+    """
+
+    total = 0
+    while mines.resources.locations.get(source, 0):
+        await mines.scheduler.sleep(travel)
+        total += await mines.mine(source, capacity, rate)
+        await mines.scheduler.sleep(travel)
+    return total
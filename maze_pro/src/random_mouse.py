@@ -1,8 +1,14 @@
 import random
+from array import array
 from typing import List, Dict
 import numpy as np
 import maze as maze
 
+# Visit counts stop growing at the largest value of their uint16 grid
+MAX_VISITS = np.iinfo(np.uint16).max
+# Default number of the latest tiles visited kept in the path
+PATH_LENGTH = 1024
+
 class RobertFrostRandomMouse():
     """A maze player that traverses the maze randomly.
 
@@ -12,62 +18,139 @@ class RobertFrostRandomMouse():
     Attributes:
         interface: A PlayerInterface object.
         position: The current position of the player.
-        maze: A maze constructed with knowledge of where the player has been.
-        visited: A dictionary mapping a Tile to the number of times the player
-            has been to the given Tile.
-        path: A list containing the ordered sequence of tiles visited.
+        maze: uint8 array of the tile types the player has seen.
+        visited: uint16 array (x, y) of the number of times the player has
+            been to every tile, saturating at MAX_VISITS. Tiles the player
+            has never been to hold 0.
+        path: Ring buffer of the flat indices (x * height + y) of the latest
+            path_length tiles visited, see path_tiles. Older tiles are
+            overwritten, so only visited remembers the whole walk.
+        steps: Number of steps taken.
         direction: A dictionary mapping coordinate shifts in the matrix
             representation of the maze to strings representing direction.
+        rng: Random stream used to break ties, see maze.make_rng.
 
     Methods:
         step: Preform a single move to an adjacent tile, returning the tile and
             direction of the move.
+        run: Take up to a number of steps at once, stopping on the exit.
         update_maze: Update the local maze array with local information.
+        update_vision: Update the local maze array from a 3x3 vision array.
         walkable_tiles: Return the set of walkable tile from the player position.
         is_walkable: Return true if given tile is not a wall.
         get_direction: Given a source and target tile that are a single step
             apart, return the direction from source to target.
+        path_tiles: Return the latest tiles visited in order.
     """
 
-    def __init__(self, interface):
+    def __init__(self, interface, seed=None, path_length: int = PATH_LENGTH):
+        if path_length < 1:
+            raise ValueError('path_length must be positive')
         self.interface = interface
         self.position = interface.player_pos
-        self.maze = np.zeros(interface.dimensions, dtype=int)
-        self.visited = {}
-        self.path = []
+        self.maze = np.zeros(interface.dimensions, dtype=np.uint8)
+        self.visited = np.zeros(interface.dimensions, dtype=np.uint16)
+        self.path = np.zeros(path_length, dtype=np.uint32)
+        self.steps = 0
         self.direction = {'up': (0, -1), 'down': (0, 1), 'left': (1, 0), 'right': (-1, 0)}
+        self.rng = maze.make_rng(seed)
 
     def step(self):
         """Return the next tile to visit"""
 
-        self.update_maze(self.interface.current_visible_tiles())
+        self.update_vision(self.interface.current_vision())
         possible_tiles = self.walkable_tiles()
-        never_visited = [x for x in possible_tiles if x not in self.visited]
+        visits = [int(self.visited[x.x, x.y]) for x in possible_tiles]
+        never_visited = [x for x, count in zip(possible_tiles, visits)
+                         if not count]
         dest = None
         if never_visited:
-            dest = random.choice(never_visited)
-            self.visited[dest] = 0
+            dest = self.rng.choice(never_visited)
         else:
-            least_traveled = possible_tiles[0]
-            for tile in possible_tiles:
-                if self.visited[tile] < self.visited[least_traveled]:
-                    least_traveled = tile
-            dest = least_traveled
+            # The first of the least visited tiles
+            dest = possible_tiles[visits.index(min(visits))]
 
         direct = self.get_direction(dest)
-        observed_tiles = self.interface.move(dest)
+        self.interface.move_to(dest)
         self.position = self.interface.player_pos
-        self.visited[dest] = self.visited[dest] + 1
-        self.path.append(dest)
+        if self.visited[dest.x, dest.y] < MAX_VISITS:
+            self.visited[dest.x, dest.y] += 1
+        self.path[self.steps % len(self.path)] = (
+            dest.x * self.visited.shape[1] + dest.y)
+        self.steps += 1
 
         return direct, dest
 
+    def run(self, max_steps: int) -> np.ndarray:
+        """Step until the player stands on the exit (a resource tile) or
+
+        max_steps steps were taken, moving exactly as calls to step would,
+        on flat copies of the padded tile types and visit counts like
+        dfs.DFS.run
+
+        Return:
+            int64 array (n, 2) of the (x, y) of the tiles stepped to.
+        """
+
+        interface = self.interface
+        grid = interface.tile_type_grid()
+        columns = grid.shape[1]
+        types = grid.tobytes()
+        visited = array('H', np.pad(self.visited, 1).tobytes())
+        position = (self.position.x + 1) * columns + self.position.y + 1
+        # In the order of self.direction, which walkable_tiles follows
+        offsets = [x_offset * columns + y_offset
+                   for x_offset, y_offset in self.direction.values()]
+        choice = self.rng.choice
+        wall, exit_tile = maze.WALL, maze.RESOURCE
+
+        trace = []
+        while len(trace) < max_steps and types[position] != exit_tile:
+            possible = [position + offset for offset in offsets
+                        if types[position + offset] != wall]
+            never_visited = [dest for dest in possible if not visited[dest]]
+            if never_visited:
+                dest = choice(never_visited)
+            else:
+                visits = [visited[dest] for dest in possible]
+                dest = possible[visits.index(min(visits))]
+            if visited[dest] < MAX_VISITS:
+                visited[dest] += 1
+            trace.append(dest)
+            position = dest
+
+        tiles = np.column_stack(divmod(np.array(trace, dtype=np.int64),
+                                       columns)) - 1
+        if len(tiles):
+            # Every step starts by looking around the tile it leaves
+            maze.paste_visions(self.maze, grid, np.vstack((
+                [[self.position.x, self.position.y]], tiles[:-1])))
+        interface.walk(tiles)
+        self.position = interface.player_pos
+        self.visited[...] = np.frombuffer(visited, dtype=np.uint16).reshape(
+            grid.shape)[1:-1, 1:-1]
+        latest = tiles[-len(self.path):]
+        self.path[(self.steps + len(tiles) - len(latest)
+                   + np.arange(len(latest))) % len(self.path)] = (
+                       latest[:, 0] * self.visited.shape[1] + latest[:, 1])
+        self.steps += len(tiles)
+        return tiles
+
     def update_maze(self, observed_tiles: Dict[maze.Tile, int]):
         """Updates players view of the maze with data from last move"""
 
         for tile, tile_type in observed_tiles.items():
             self.maze[tile.x][tile.y] = tile_type
 
+    def update_vision(self, vision: np.ndarray):
+        """Updates players view of the maze with the tile types visible from
+
+        the current position
+
+        """
+
+        maze.paste_vision(self.maze, self.position, vision)
+
     def walkable_tiles(self) -> List[maze.Tile]:
         """Return set of tiles adjacent to player that can be walked on"""
 
@@ -83,6 +166,9 @@ class RobertFrostRandomMouse():
     def is_walkable(self, tile: maze.Tile) -> bool:
         """Return True if the given tile is not a wall"""
 
+        width, height = self.maze.shape
+        if not (0 <= tile.x < width and 0 <= tile.y < height):
+            return False
         tile_value = self.maze[tile.x][tile.y]
         if tile_value == 3:
             return True
@@ -102,3 +188,15 @@ class RobertFrostRandomMouse():
                 return direction
 
         raise ValueError('Cannot move from ' + str(self.position) + ' to ' + str(dest_tile))
+
+    def path_tiles(self) -> List[maze.Tile]:
+        """Return the latest tiles visited, oldest first, at most the length
+
+        of the path
+
+        """
+
+        start = max(0, self.steps - len(self.path))
+        return [maze.Tile(*divmod(int(self.path[step % len(self.path)]),
+                                  self.visited.shape[1]))
+                for step in range(start, self.steps)]
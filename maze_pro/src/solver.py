@@ -0,0 +1,289 @@
+"""Shortest paths and distance fields with full knowledge of a maze
+
+The players in dfs and random_mouse only see the tiles around them. The
+solvers here read Maze.terrain directly, which makes them suitable for
+scoring those players (how far from optimal was a route) and for shaping
+rewards (how far is a tile from the exit or the closest resource).
+
+Tiles are addressed by their flat index (x + 1) * (y + 2) + (y + 1) into the
+terrain padded with a ring of walls, so neighbours are a fixed offset away
+and never fall outside of the grid.
+"""
+
+import heapq
+from collections import OrderedDict, deque
+from typing import List
+import numpy as np
+import maze as maze
+
+UNREACHABLE = -1
+
+
+class MazeSolver():
+    """Solve one maze, caching every result
+
+    Path queries are cached by (method, start, goal) and distance fields by
+    their set of sources, so repeating a query returns the stored result.
+    The terrain is read once when the solver is created; call clear after
+    changing it.
+
+    Attributes:
+        maze: The Maze being solved.
+        max_fields: Number of distance fields kept before the least recently
+            used one is dropped.
+
+    Methods:
+        bfs: Breadth first search from start to goal.
+        astar: A* search from start to goal with a Manhattan heuristic.
+        bidirectional: Breadth first search from both ends until they meet.
+        distance_field: Distance of every tile to the closest of the sources.
+        distance: Distance from a tile to the closest of the sources.
+        path_to: Shortest path from a tile to the closest of the sources.
+        clear: Forget cached results and reread the terrain.
+    """
+
+    def __init__(self, maze_data: maze.Maze, max_fields: int = 16):
+
+        self.maze = maze_data
+        self.max_fields = max_fields
+        self.__paths = {}
+        self.__fields = OrderedDict()
+        self.clear()
+
+    def clear(self):
+        """Forget every cached result and reread the terrain"""
+
+        self.__width = self.maze.dim[1] + 2
+        padded = np.zeros((self.maze.dim[0] + 2, self.__width), dtype=bool)
+        padded[1:-1, 1:-1] = self.maze.terrain
+        self.__walkable = padded.ravel()
+        self.__walkable_list = self.__walkable.tolist()
+        self.__offsets = np.array((self.__width, -self.__width, 1, -1))
+        self.__paths.clear()
+        self.__fields.clear()
+
+    def bfs(self, start: maze.Tile, goal: maze.Tile) -> List[maze.Tile]:
+        """Return a shortest path from start to goal (both included) found
+
+        with breadth first search, or None if goal cannot be reached
+
+        """
+
+        return self.__cached('bfs', start, goal, self.__bfs)
+
+    def astar(self, start: maze.Tile, goal: maze.Tile) -> List[maze.Tile]:
+        """Return a shortest path from start to goal (both included) found
+
+        with A* search, or None if goal cannot be reached
+
+        """
+
+        return self.__cached('astar', start, goal, self.__astar)
+
+    def bidirectional(self, start: maze.Tile,
+                      goal: maze.Tile) -> List[maze.Tile]:
+        """Return a shortest path from start to goal (both included) found
+
+        by searching from both ends, or None if goal cannot be reached
+
+        """
+
+        return self.__cached('bidirectional', start, goal,
+                             self.__bidirectional)
+
+    def distance_field(self, sources) -> np.ndarray:
+        """Return a read only int32 array of the steps from every tile to the
+
+        closest tile in sources (any iterable of Tiles, e.g. the
+        Resources.locations dictionary), UNREACHABLE for walls and tiles cut
+        off from every source
+
+        """
+
+        key = frozenset((int(tile.x), int(tile.y)) for tile in sources)
+        field = self.__fields.get(key)
+        if field is not None:
+            self.__fields.move_to_end(key)
+            return field
+
+        field = self.__expand([self.__index(maze.Tile(*tile)) for tile in key])
+        field = field.reshape(-1, self.__width)[1:-1, 1:-1].copy()
+        field.flags.writeable = False
+        self.__fields[key] = field
+        while len(self.__fields) > self.max_fields:
+            self.__fields.popitem(last=False)
+        return field
+
+    def distance(self, start: maze.Tile, sources) -> int:
+        """Return the steps from start to the closest tile in sources, or
+
+        UNREACHABLE
+
+        """
+
+        return int(self.distance_field(sources)[start.x, start.y])
+
+    def path_to(self, start: maze.Tile, sources) -> List[maze.Tile]:
+        """Return a shortest path from start to the closest tile in sources
+
+        by descending their distance field, or None if none can be reached
+
+        """
+
+        field = self.distance_field(sources)
+        if field[start.x, start.y] == UNREACHABLE:
+            return None
+
+        x, y = int(start.x), int(start.y)
+        path = [maze.Tile(x, y)]
+        for distance in range(int(field[x, y]) - 1, -1, -1):
+            for step_x, step_y in ((x + 1, y), (x - 1, y),
+                                   (x, y + 1), (x, y - 1)):
+                if (0 <= step_x < field.shape[0]
+                        and 0 <= step_y < field.shape[1]
+                        and field[step_x, step_y] == distance):
+                    x, y = step_x, step_y
+                    break
+            path.append(maze.Tile(x, y))
+        return path
+
+    def __cached(self, method: str, start: maze.Tile, goal: maze.Tile,
+                 search) -> List[maze.Tile]:
+        """Return the cached path of a search, running it on a miss"""
+
+        key = (method, int(start.x), int(start.y), int(goal.x), int(goal.y))
+        if key not in self.__paths:
+            begin, end = self.__index(start), self.__index(goal)
+            if begin == end:
+                indices = [begin]
+            else:
+                indices = search(begin, end)
+            self.__paths[key] = (None if indices is None
+                                 else [self.__tile(index)
+                                       for index in indices])
+        path = self.__paths[key]
+        return None if path is None else list(path)
+
+    def __index(self, tile: maze.Tile) -> int:
+        """Return the flat padded index of tile, rejecting wall tiles"""
+
+        if not (0 <= tile.x < self.maze.dim[0]
+                and 0 <= tile.y < self.maze.dim[1]):
+            raise ValueError('Tile: ' + str(tile) + ' is outside the maze')
+        index = (int(tile.x) + 1) * self.__width + int(tile.y) + 1
+        if not self.__walkable_list[index]:
+            raise ValueError('Tile: ' + str(tile) + ' is a wall tile')
+        return index
+
+    def __tile(self, index: int) -> maze.Tile:
+        """Return the Tile of a flat padded index"""
+
+        x, y = divmod(index, self.__width)
+        return maze.Tile(x - 1, y - 1)
+
+    def __expand(self, sources: List[int]) -> np.ndarray:
+        """Expand a frontier from sources one ring of tiles per iteration,
+
+        returning the flat padded distance field
+
+        """
+
+        field = np.full(self.__walkable.size, UNREACHABLE, dtype=np.int32)
+        frontier = np.unique(np.asarray(sources, dtype=np.int64))
+        field[frontier] = 0
+        distance = 0
+        while frontier.size:
+            distance += 1
+            neighbours = (frontier[:, None] + self.__offsets).ravel()
+            neighbours = neighbours[self.__walkable[neighbours]]
+            frontier = np.unique(neighbours[field[neighbours] == UNREACHABLE])
+            field[frontier] = distance
+        return field
+
+    def __neighbours(self, index: int):
+        """Return the walkable neighbours of a flat padded index"""
+
+        walkable = self.__walkable_list
+        width = self.__width
+        return [neighbour for neighbour in (index + width, index - width,
+                                            index + 1, index - 1)
+                if walkable[neighbour]]
+
+    def __bfs(self, start: int, goal: int) -> List[int]:
+        """Breadth first search over flat padded indices"""
+
+        parents = {start: None}
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            for neighbour in self.__neighbours(current):
+                if neighbour not in parents:
+                    parents[neighbour] = current
+                    if neighbour == goal:
+                        return walk_back(parents, goal)[::-1]
+                    queue.append(neighbour)
+        return None
+
+    def __astar(self, start: int, goal: int) -> List[int]:
+        """A* search over flat padded indices"""
+
+        goal_x, goal_y = divmod(goal, self.__width)
+
+        def heuristic(index):
+            x, y = divmod(index, self.__width)
+            return abs(x - goal_x) + abs(y - goal_y)
+
+        parents = {start: None}
+        costs = {start: 0}
+        heap = [(heuristic(start), 0, start)]
+        while heap:
+            _, cost, current = heapq.heappop(heap)
+            if current == goal:
+                return walk_back(parents, goal)[::-1]
+            if cost > costs[current]:
+                continue
+            for neighbour in self.__neighbours(current):
+                if cost + 1 < costs.get(neighbour, cost + 2):
+                    costs[neighbour] = cost + 1
+                    parents[neighbour] = current
+                    heapq.heappush(heap, (cost + 1 + heuristic(neighbour),
+                                          cost + 1, neighbour))
+        return None
+
+    def __bidirectional(self, start: int, goal: int) -> List[int]:
+        """Breadth first search expanding the smaller of two frontiers, one
+
+        from each end, a full ring at a time until they meet
+
+        """
+
+        parents = ({start: None}, {goal: None})
+        frontiers = ([start], [goal])
+        while frontiers[0] and frontiers[1]:
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            mine, theirs = parents[side], parents[1 - side]
+            expanded = []
+            meeting = None
+            for current in frontiers[side]:
+                for neighbour in self.__neighbours(current):
+                    if neighbour not in mine:
+                        mine[neighbour] = current
+                        expanded.append(neighbour)
+                        if meeting is None and neighbour in theirs:
+                            meeting = neighbour
+            if meeting is not None:
+                return (walk_back(parents[0], meeting)[::-1]
+                        + walk_back(parents[1], meeting)[1:])
+            frontiers = ((expanded, frontiers[1]) if side == 0
+                         else (frontiers[0], expanded))
+        return None
+
+
+def walk_back(parents: dict, index: int) -> List[int]:
+    """Follow parents from index to the root of a search"""
+
+    path = []
+    while index is not None:
+        path.append(index)
+        index = parents[index]
+    return path
@@ -0,0 +1,166 @@
+"""Vectorized maze environment for batched training rollouts
+
+PlayerInterface holds one player in one maze and moves it one Python call at
+a time. VectorMazeEnv holds a batch of mazes built by BatchMazeBuilder and
+one agent per maze, with every piece of state in arrays, so stepping all of
+the agents is a fixed number of NumPy operations regardless of batch size.
+
+Observations use the vision rules of PlayerInterface: an agent sees the type
+(maze.WALL, maze.WALKABLE or maze.RESOURCE) of the 3x3 tiles centered on its
+position, and everything it has seen is accumulated in its knowledge map.
+"""
+
+import numpy as np
+import maze as maze
+from batch_maze import BatchMazeBuilder
+
+UP, DOWN, LEFT, RIGHT = 0, 1, 2, 3
+ACTIONS = ('up', 'down', 'left', 'right')
+# Coordinate shift of each action, matching the directions used by dfs.DFS
+ACTION_OFFSETS = np.array([(0, -1), (0, 1), (-1, 0), (1, 0)], dtype=np.int64)
+VISION = np.arange(3)
+
+
+class VectorMazeEnv():
+    """A batch of mazes, each with a single agent, stepped together
+
+    Agents that try to walk into a wall stay where they are. Stepping onto a
+    resource tile collects it for a reward of 1 and turns it into a walkable
+    tile. An environment is done once every resource in its maze has been
+    collected or after max_steps steps, and with auto_reset it is replaced
+    by a freshly generated maze on the same call.
+
+    Attributes:
+        num_envs: The number of mazes (and agents) in the batch.
+        dim: Dimensions of every maze (x, y).
+        resource_allocation: Resource allocation used for each maze.
+        max_steps: Steps after which an episode ends, or None for no limit.
+        auto_reset: Replace finished mazes automatically inside step.
+        rng: The numpy.random.Generator used to generate mazes.
+        tile_types: uint8 array (num_envs, x + 2, y + 2) of tile types,
+            padded with a ring of walls.
+        positions: int array (num_envs, 2) of agent positions (x, y).
+        knowledge: uint8 array (num_envs, x, y) of the tile types each agent
+            has discovered, maze.UNKNOWN where nothing has been seen.
+        remaining: Number of uncollected resources in each maze.
+        steps: Steps taken by each agent in the current episode.
+
+    Methods:
+        reset: Generate new mazes for all (or some) environments.
+        step: Apply one action per agent and return the batched results.
+        observe: Return the current 3x3 vision of every agent.
+    """
+
+    def __init__(self, num_envs: int, dimensions: (int, int),
+                 resource_allocation: (int, int, int) = (1, 1, 1),
+                 max_steps: int = None, auto_reset: bool = True, seed=None):
+
+        self.num_envs = num_envs
+        self.dim = tuple(dimensions)
+        self.resource_allocation = resource_allocation
+        self.max_steps = max_steps
+        self.auto_reset = auto_reset
+        self.rng = np.random.default_rng(seed)
+
+        padded = (num_envs, self.dim[0] + 2, self.dim[1] + 2)
+        self.tile_types = np.full(padded, maze.WALL, dtype=np.uint8)
+        self.positions = np.zeros((num_envs, 2), dtype=np.int64)
+        self.knowledge = np.zeros((num_envs,) + self.dim, dtype=np.uint8)
+        self.remaining = np.zeros(num_envs, dtype=np.int64)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self.__envs = np.arange(num_envs)
+
+        self.reset()
+
+    def reset(self, envs=None) -> np.ndarray:
+        """Generate new mazes for envs (all environments when None) and
+
+        return the observations of every agent
+
+        """
+
+        envs = self.__envs if envs is None else np.asarray(envs).ravel()
+        if envs.dtype == bool:
+            envs = np.flatnonzero(envs)
+        if envs.size:
+            batch = BatchMazeBuilder(envs.size, self.dim,
+                                     self.resource_allocation, self.rng)
+
+            types = np.where(batch.terrain, maze.WALKABLE, maze.WALL)
+            for index, resources in enumerate(batch.resources):
+                for tile, amount in resources.locations.items():
+                    if amount:
+                        types[index, tile.x, tile.y] = maze.RESOURCE
+            self.tile_types[envs, 1:-1, 1:-1] = types
+            self.remaining[envs] = np.count_nonzero(types == maze.RESOURCE,
+                                                    axis=(1, 2))
+            self.positions[envs] = [(tile.x, tile.y)
+                                    for tile in batch.player_start]
+            self.knowledge[envs] = maze.UNKNOWN
+            self.steps[envs] = 0
+            self.__reveal(envs)
+
+        return self.observe()
+
+    def step(self, actions) -> (np.ndarray, np.ndarray, np.ndarray):
+        """Move every agent by its action (UP, DOWN, LEFT or RIGHT)
+
+        Return:
+            observations: uint8 array (num_envs, 3, 3) of visible tile types,
+                for finished environments that of the replacement maze when
+                auto_reset is set.
+            rewards: float32 array of resources collected this step.
+            dones: bool array, True where an episode ended this step.
+        """
+
+        actions = np.asarray(actions, dtype=np.int64)
+        if actions.shape != (self.num_envs,):
+            raise ValueError('Expected ' + str(self.num_envs) + ' actions, got '
+                             + str(actions.shape))
+        if actions.min() < UP or actions.max() > RIGHT:
+            raise ValueError('Actions must be between UP and RIGHT')
+
+        envs = self.__envs
+        target = self.positions + ACTION_OFFSETS[actions]
+        types = self.tile_types[envs, target[:, 0] + 1, target[:, 1] + 1]
+        moved = types != maze.WALL
+        self.positions[moved] = target[moved]
+
+        collected = types == maze.RESOURCE
+        self.tile_types[envs[collected], target[collected, 0] + 1,
+                        target[collected, 1] + 1] = maze.WALKABLE
+        self.remaining -= collected
+        self.steps += 1
+        self.__reveal(envs)
+
+        rewards = collected.astype(np.float32)
+        dones = self.remaining == 0
+        if self.max_steps is not None:
+            dones |= self.steps >= self.max_steps
+
+        if self.auto_reset and dones.any():
+            self.reset(np.flatnonzero(dones))
+
+        return self.observe(), rewards, dones
+
+    def observe(self, envs=None) -> np.ndarray:
+        """Return the 3x3 tile types visible to the agents of envs (all
+
+        environments when None), indexed by (env, dx + 1, dy + 1)
+
+        """
+
+        envs = self.__envs if envs is None else envs
+        x = self.positions[envs, 0, None, None] + VISION[:, None]
+        y = self.positions[envs, 1, None, None] + VISION[None, :]
+        return self.tile_types[envs[:, None, None], x, y]
+
+    def __reveal(self, envs: np.ndarray):
+        """Copy the vision of the agents of envs into their knowledge maps"""
+
+        vision = self.observe(envs)
+        x = self.positions[envs, 0, None, None] + VISION[:, None] - 1
+        y = self.positions[envs, 1, None, None] + VISION[None, :] - 1
+        env, x, y = np.broadcast_arrays(envs[:, None, None], x, y)
+        inside = (x >= 0) & (x < self.dim[0]) & (y >= 0) & (y < self.dim[1])
+        self.knowledge[env[inside], x[inside], y[inside]] = vision[inside]
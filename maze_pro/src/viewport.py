@@ -0,0 +1,311 @@
+"""Camera and chunked surfaces for drawing mazes larger than the display
+
+Only the part of a maze under the camera is ever drawn. The maze is split
+into square chunks of tiles that are rendered to their own surfaces the
+first time the camera shows them and kept in a least recently used cache
+with a memory cap, so the cost of a frame and the memory held by the
+renderer depend on the size of the viewport rather than the size of the
+maze.
+
+Positions are in world pixels, the pixels of the whole maze drawn at
+TILE_SIZE pixels per tile, unless stated otherwise.
+"""
+
+from collections import OrderedDict
+from typing import List
+import numpy as np
+import pygame
+
+TILE_SIZE = 16
+CHUNK_TILES = 32
+# Memory each ChunkCache may hold before dropping chunks, in bytes
+CHUNK_MEMORY = 16 * 2**20
+# Colours of the trail, the latest stretch walked (TRAIL_NEW) and where the
+# player has been before (TRAIL_OLD)
+TRAIL_NEW, TRAIL_OLD = 1, 2
+TRAIL_COLORS = (None, (100, 150, 200), (100, 200, 150))
+
+
+class Camera():
+    """The region of the world shown in the viewport of the display
+
+    Attributes:
+        view: The region of the display the world is drawn in.
+        world: Size of the world (width, height) in pixels.
+        offset: World position [x, y] shown at the top left of the view.
+
+    Methods:
+        follow: Center the view on a world position.
+        world_rect: Return the region of the world shown in a display region.
+        to_screen: Return the region of the display showing a world region.
+        screen_position: Return the display position of a world position.
+    """
+
+    def __init__(self, view: pygame.Rect, world: (int, int)):
+        self.view = pygame.Rect(view)
+        self.world = tuple(world)
+        self.offset = [0, 0]
+
+    def follow(self, position: (int, int)) -> bool:
+        """Center the view on position, without showing past the edges of
+
+        the world, and return True if the camera moved
+
+        """
+
+        offset = [min(max(0, position[axis] - self.view.size[axis] // 2),
+                      max(0, self.world[axis] - self.view.size[axis]))
+                  for axis in (0, 1)]
+        moved = offset != self.offset
+        self.offset = offset
+        return moved
+
+    def world_rect(self, area: pygame.Rect) -> pygame.Rect:
+        """Return the region of the world shown in area of the display,
+
+        empty when area misses the view
+
+        """
+
+        area = pygame.Rect(area).clip(self.view)
+        return area.move(self.offset[0] - self.view.x,
+                         self.offset[1] - self.view.y)
+
+    def to_screen(self, rect: pygame.Rect) -> pygame.Rect:
+        """Return the region of the display showing rect of the world,
+
+        clipped to the view
+
+        """
+
+        return pygame.Rect(rect).move(self.view.x - self.offset[0],
+                                      self.view.y - self.offset[1]).clip(
+                                          self.view)
+
+    def screen_position(self, position: (int, int)) -> (int, int):
+        """Return the display position of a world position"""
+
+        return (position[0] + self.view.x - self.offset[0],
+                position[1] + self.view.y - self.offset[1])
+
+
+class ChunkCache():
+    """Chunk surfaces built on demand and dropped least recently used first
+
+    Attributes:
+        build: Function (chunk_x, chunk_y) -> pygame.Surface rendering a chunk.
+        world: Size of the world (width, height) in pixels.
+        chunk_size: Width and height of a chunk in pixels.
+        max_bytes: Memory the cached surfaces may use.
+        nbytes: Memory used by the cached surfaces.
+        builds: Number of chunks rendered so far.
+
+    Methods:
+        get: Return the surface of a chunk, rendering it on a miss.
+        cached: Return the surface of a chunk if it is cached, else None.
+        chunk_rect: Return the world region covered by a chunk.
+        chunks: Return the chunks overlapping a world region.
+        draw: Blit the chunks shown in a region of the display.
+        clear: Drop every cached chunk.
+    """
+
+    def __init__(self, build, world: (int, int),
+                 chunk_size: int = CHUNK_TILES * TILE_SIZE,
+                 max_bytes: int = CHUNK_MEMORY):
+        self.build = build
+        self.world = tuple(world)
+        self.chunk_size = chunk_size
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.builds = 0
+        self.__surfaces = OrderedDict()
+
+    def __len__(self):
+        return len(self.__surfaces)
+
+    def get(self, chunk: (int, int)) -> pygame.Surface:
+        """Return the surface of chunk, rendering it if it is not cached"""
+
+        surface = self.__surfaces.get(chunk)
+        if surface is not None:
+            self.__surfaces.move_to_end(chunk)
+            return surface
+
+        surface = self.build(*chunk)
+        self.builds += 1
+        self.__surfaces[chunk] = surface
+        self.nbytes += surface_bytes(surface)
+        # Never drop the chunk just built, even if it alone is over the cap
+        while self.nbytes > self.max_bytes and len(self.__surfaces) > 1:
+            _, dropped = self.__surfaces.popitem(last=False)
+            self.nbytes -= surface_bytes(dropped)
+        return surface
+
+    def cached(self, chunk: (int, int)) -> pygame.Surface:
+        """Return the surface of chunk if it is cached, otherwise None"""
+
+        return self.__surfaces.get(chunk)
+
+    def chunk_rect(self, chunk: (int, int)) -> pygame.Rect:
+        """Return the region of the world covered by chunk"""
+
+        left, top = chunk[0] * self.chunk_size, chunk[1] * self.chunk_size
+        return pygame.Rect(left, top,
+                           min(self.chunk_size, self.world[0] - left),
+                           min(self.chunk_size, self.world[1] - top))
+
+    def chunks(self, rect: pygame.Rect) -> List[tuple]:
+        """Return the chunks overlapping rect of the world"""
+
+        rect = pygame.Rect(rect).clip((0, 0) + self.world)
+        if not rect:
+            return []
+        size = self.chunk_size
+        return [(chunk_x, chunk_y)
+                for chunk_x in range(rect.left // size,
+                                     (rect.right - 1) // size + 1)
+                for chunk_y in range(rect.top // size,
+                                     (rect.bottom - 1) // size + 1)]
+
+    def draw(self, display_surf: pygame.Surface, camera: Camera,
+             area: pygame.Rect):
+        """Blit the parts of the chunks shown in area of the display"""
+
+        shown = camera.world_rect(area)
+        for chunk in self.chunks(shown):
+            rect = self.chunk_rect(chunk)
+            part = shown.clip(rect)
+            display_surf.blit(self.get(chunk), camera.to_screen(part),
+                              part.move(-rect.x, -rect.y))
+
+    def clear(self):
+        """Drop every cached chunk"""
+
+        self.__surfaces.clear()
+        self.nbytes = 0
+
+
+class Trail():
+    """The trail of the player over the tiles of the world, drawn over the
+
+    surfaces of chunks
+
+    The colour of the circle at every tile and of the edge from every tile
+    to its neighbours is kept in arrays, so the memory held by a trail
+    depends on the size of the world rather than the number of steps, and
+    drawing the trail over a region only reads the tiles inside it. Edges
+    are drawn first and circles over them, whatever order they were added
+    in.
+
+    Attributes:
+        tile_size: Width and height of a tile in pixels.
+        nodes: uint8 array (x, y) indexing TRAIL_COLORS with the colour of
+            the circle at every tile, 0 for none.
+        edges: uint8 array (2, x, y) indexing TRAIL_COLORS with the colour of
+            the edge from every tile to the tile right of it ([0]) and below
+            it ([1]), 0 for none.
+        pending: World regions of the tiles whose colour changed since they
+            were last taken.
+
+    Methods:
+        node: Colour the circle at a tile.
+        edge: Colour the edge between two adjacent tiles.
+        draw: Draw the trail inside a region of the world onto a surface.
+        take_pending: Return and forget the regions changed since the last
+            call.
+    """
+
+    def __init__(self, dimensions: (int, int), tile_size: int = TILE_SIZE):
+        self.tile_size = tile_size
+        self.nodes = np.zeros(dimensions, dtype=np.uint8)
+        self.edges = np.zeros((2,) + tuple(dimensions), dtype=np.uint8)
+        self.pending = []
+
+    def node(self, tile, color: int) -> pygame.Rect:
+        """Colour the circle at tile, returning the world region it covers"""
+
+        rect = self.__tile_rect(tile.x, tile.y)
+        if self.nodes[tile.x, tile.y] != color:
+            self.nodes[tile.x, tile.y] = color
+            self.pending.append(rect)
+        return rect
+
+    def edge(self, start, end, color: int) -> pygame.Rect:
+        """Colour the edge between the adjacent tiles start and end,
+
+        returning the world region it covers
+
+        """
+
+        low, high = sorted([(start.x, start.y), (end.x, end.y)])
+        if (high[0] - low[0], high[1] - low[1]) not in ((1, 0), (0, 1)):
+            raise ValueError(str(start) + ' and ' + str(end)
+                             + ' are not adjacent')
+
+        axis = high[1] - low[1]
+        rect = self.__tile_rect(*low).union(self.__tile_rect(*high))
+        if self.edges[axis, low[0], low[1]] != color:
+            self.edges[axis, low[0], low[1]] = color
+            self.pending.append(rect)
+        return rect
+
+    def draw(self, surf: pygame.Surface, area: pygame.Rect,
+             origin: (int, int)):
+        """Draw the trail inside area of the world onto surf, whose top left
+
+        is origin in the world, leaving the rest of surf untouched
+
+        """
+
+        size = self.tile_size
+        area = pygame.Rect(area)
+        low = (max(area.left // size, 0), max(area.top // size, 0))
+        high = ((area.right - 1) // size + 1, (area.bottom - 1) // size + 1)
+        clip = surf.get_clip()
+        surf.set_clip(area.move(-origin[0], -origin[1]).clip(clip))
+
+        # The edges from the tiles left of and above area end inside it
+        for axis, (x_step, y_step) in enumerate(((1, 0), (0, 1))):
+            left, top = max(low[0] - x_step, 0), max(low[1] - y_step, 0)
+            edges = self.edges[axis, left:high[0], top:high[1]]
+            for x_pos, y_pos in (np.argwhere(edges) + (left, top)).tolist():
+                start = self.__center(x_pos, y_pos, origin)
+                end = self.__center(x_pos + x_step, y_pos + y_step, origin)
+                pygame.draw.line(surf, TRAIL_COLORS[edges[x_pos - left,
+                                                          y_pos - top]],
+                                 start, end, 1)
+
+        nodes = self.nodes[low[0]:high[0], low[1]:high[1]]
+        for x_pos, y_pos in (np.argwhere(nodes) + low).tolist():
+            pygame.draw.circle(surf, TRAIL_COLORS[nodes[x_pos - low[0],
+                                                        y_pos - low[1]]],
+                               self.__center(x_pos, y_pos, origin),
+                               size * 3 // 8)
+        surf.set_clip(clip)
+
+    def take_pending(self) -> List[pygame.Rect]:
+        """Return the world regions changed since the last call and forget
+
+        them
+
+        """
+
+        pending, self.pending = self.pending, []
+        return pending
+
+    def __tile_rect(self, x_pos: int, y_pos: int) -> pygame.Rect:
+        size = self.tile_size
+        return pygame.Rect(x_pos * size, y_pos * size, size, size)
+
+    def __center(self, x_pos: int, y_pos: int,
+                 origin: (int, int)) -> (int, int):
+        """Return the position on a surface at origin of a tile center"""
+
+        return (x_pos * self.tile_size + self.tile_size // 2 - origin[0],
+                y_pos * self.tile_size + self.tile_size // 2 - origin[1])
+
+
+def surface_bytes(surf: pygame.Surface) -> int:
+    """Return the memory used by the pixels of surf"""
+
+    return surf.get_pitch() * surf.get_height()
@@ -0,0 +1,30 @@
+"""Shared setup for the maze pro tests
+
+The game modules import each other as top level modules and load their
+assets relative to the repository root, like maze_pro.py does, so the tests
+run with maze_pro/src on the path from the repository root.
+"""
+
+import os
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'maze_pro', 'src'))
+# Rendering tests draw offscreen
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+
+@pytest.fixture(autouse=True)
+def repository_root(monkeypatch):
+    """Run every test from the repository root"""
+
+    monkeypatch.chdir(ROOT)
+
+
+@pytest.fixture(autouse=True, scope='session')
+def user_cache(tmp_path_factory):
+    """Keep the atlas cached by the tests out of the user cache directory"""
+
+    os.environ['XDG_CACHE_HOME'] = str(tmp_path_factory.mktemp('cache'))
@@ -0,0 +1,118 @@
+"""Tests of the game loop of App"""
+
+import hashlib
+import time
+from typing import List
+import pygame
+import pytest
+import game_enviornment
+
+
+def played_terrain(seed) -> bytes:
+    """Return the terrain of the maze an App builds for seed"""
+
+    app = game_enviornment.App(game_enviornment.FIND_EXIT, (1, 1, 1),
+                               dimensions=(12, 10), seed=seed)
+    app.on_init()
+    terrain = app.maze.maze.terrain.tobytes()
+    app.on_cleanup()
+    return terrain
+
+
+def test_seed_builds_same_maze():
+    assert played_terrain(3) == played_terrain(3)
+    assert played_terrain(3) != played_terrain(4)
+    assert not pygame.get_init()
+
+
+def frame_digests(mode, dirty_rects: bool) -> List[str]:
+    """Play a seeded game to the end, returning a digest of every frame"""
+
+    app = game_enviornment.App(mode, (20, 3, 6), dirty_rects=dirty_rects,
+                               dimensions=(30, 30), speed=10,
+                               frame_budget=float('inf'), seed=5)
+    app.on_init()
+    digests = []
+    won = False
+    while not won and len(digests) < 2000:
+        won = app.simulate(0.1)
+        app.on_render()
+        digests.append(hashlib.sha256(pygame.image.tostring(
+            app._display_surf, 'RGB')).hexdigest())
+    app.on_cleanup()
+    assert won
+    return digests
+
+
+@pytest.mark.parametrize('mode', [game_enviornment.FIND_EXIT,
+                                  game_enviornment.GATHER])
+def test_dirty_rects_match_full_redraws(monkeypatch, mode):
+    monkeypatch.setattr(time, 'time', lambda: 0.0)
+    assert frame_digests(mode, True) == frame_digests(mode, False)
+
+
+class FakeClock:
+    """Stands in for time.perf_counter, advancing by tick every call"""
+
+    def __init__(self, tick: float = 0.0):
+        self.now = 0.0
+        self.tick = tick
+
+    def __call__(self) -> float:
+        self.now += self.tick
+        return self.now
+
+
+@pytest.fixture
+def fast_app(monkeypatch):
+    """A find_exit App on a large maze, skipping the construction animation"""
+
+    monkeypatch.setattr(game_enviornment.MazeConstructor, 'animation_loop',
+                        lambda self: None)
+    app = game_enviornment.App(game_enviornment.FIND_EXIT, (1, 1, 1),
+                               dimensions=(80, 80), seed=7)
+    app.on_init()
+    yield app
+    app.on_cleanup()
+
+
+@pytest.mark.parametrize('key', range(len(game_enviornment.SPEEDS)))
+def test_number_keys_select_speeds(fast_app, key):
+    fast_app.on_event(pygame.event.Event(pygame.KEYDOWN,
+                                         key=pygame.K_1 + key))
+    assert fast_app.speed == game_enviornment.SPEEDS[key]
+
+
+@pytest.mark.parametrize('speed', [speed for speed in game_enviornment.SPEEDS
+                                   if speed is not None])
+@pytest.mark.parametrize('frames', [1, 13, 40])
+def test_ticks_follow_time_not_frames(monkeypatch, fast_app, speed, frames):
+    monkeypatch.setattr(time, 'perf_counter', FakeClock())
+    fast_app.speed = speed
+    # 32.5 ticks of play, however many frames they are drawn in
+    seconds = 32.5 / (game_enviornment.TICKS_PER_SECOND * speed)
+    for _ in range(frames):
+        assert not fast_app.simulate(seconds / frames)
+    assert fast_app.player.steps == 32
+
+
+def test_flat_out_ticks_fill_frame_budget(monkeypatch, fast_app):
+    monkeypatch.setattr(time, 'perf_counter', FakeClock(0.001))
+    fast_app.speed = None
+    steps = []
+    for seconds in (1 / 60, 1 / 10, 1.0):
+        before = fast_app.player.steps
+        fast_app.simulate(seconds)
+        steps.append(fast_app.player.steps - before)
+    assert steps[0] > 1 and steps.count(steps[0]) == len(steps)
+
+
+def test_app_builds_maze_quietly(monkeypatch, capfd):
+    monkeypatch.setattr(game_enviornment.MazeConstructor, 'animation_loop',
+                        lambda self: None)
+    capfd.readouterr()
+    app = game_enviornment.App(game_enviornment.FIND_EXIT, (1, 1, 1),
+                               dimensions=(12, 10), seed=1)
+    app.on_init()
+    app.on_cleanup()
+    assert capfd.readouterr() == ('', '')
@@ -0,0 +1,83 @@
+"""Tests of packing the texture atlas and of its cache"""
+
+import os
+import random
+import shutil
+import pygame
+import pytest
+import atlas
+
+
+@pytest.fixture
+def display():
+    pygame.display.init()
+    pygame.display.set_mode((64, 64))
+    yield
+    atlas.release()
+    pygame.quit()
+
+
+@pytest.fixture
+def sources(tmp_path):
+    """A copy of the environment images, free to change"""
+
+    directory = tmp_path / 'images'
+    shutil.copytree(atlas.SOURCES[''], directory)
+    return {'': str(directory)}
+
+
+def test_pack_without_overlap():
+    rng = random.Random(4)
+    sizes = {str(index): (rng.randint(1, 90), rng.randint(1, 90))
+             for index in range(200)}
+    rects = atlas.pack(sizes, 256)
+    assert {name: rect.size for name, rect in rects.items()} == sizes
+    assert all(rect.left >= 0 and rect.top >= 0 and rect.right <= 256
+               for rect in rects.values())
+    placed = list(rects.values())
+    for index, rect in enumerate(placed):
+        assert rect.collidelist(placed[index + 1:]) == -1
+
+
+def test_pack_rejects_wide_images():
+    with pytest.raises(ValueError):
+        atlas.pack({'wide': (300, 10)}, 256)
+
+
+def test_cache_path_in_user_cache(monkeypatch, tmp_path):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    assert atlas.cache_path() == str(tmp_path / 'maze_pro' / 'atlas')
+    monkeypatch.delenv('XDG_CACHE_HOME')
+    monkeypatch.setenv('HOME', str(tmp_path))
+    assert atlas.cache_path() == str(tmp_path / '.cache' / 'maze_pro'
+                                     / 'atlas')
+
+
+def test_cache_hit_skips_packing(display, sources, tmp_path, monkeypatch):
+    cache = str(tmp_path / 'cache' / 'atlas')
+    packed = atlas.load(sources, cache)
+
+    def build(*args):
+        raise AssertionError('packed again')
+
+    monkeypatch.setattr(atlas, 'build', build)
+    cached = atlas.load(sources, cache)
+    assert cached.rects == packed.rects
+    assert (pygame.image.tobytes(cached.surface, 'RGBA')
+            == pygame.image.tobytes(packed.surface, 'RGBA'))
+
+
+def test_changed_source_rebuilds_cache(display, sources, tmp_path):
+    cache = str(tmp_path / 'atlas')
+    atlas.load(sources, cache)
+    path = os.path.join(sources[''], 'wall.png')
+    image = pygame.image.load(path)
+    image.fill((255, 0, 0))
+    pygame.image.save(image, path)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    rebuilt = atlas.load(sources, cache)
+    assert rebuilt['wall'].get_at((0, 0))[:3] == (255, 0, 0)
+    assert atlas.load(sources, cache)['wall'].get_at((0, 0))[:3] == (
+        255, 0, 0)
@@ -0,0 +1,72 @@
+"""Tests of the mazes built by BatchMazeBuilder"""
+
+import random
+import numpy as np
+import pytest
+from scipy import ndimage
+import batch_maze
+import maze
+
+
+@pytest.fixture(scope='module', params=[(12, (25, 25)), (5, (40, 17))])
+def batch(request):
+    count, dimensions = request.param
+    return batch_maze.BatchMazeBuilder(count, dimensions, (10, 1, 3), seed=2)
+
+
+def test_mazes_connected(batch):
+    for terrain in batch.terrain:
+        _, regions = ndimage.label(terrain)
+        assert regions == 1
+
+
+def test_mazes_fill_interior(batch):
+    """Every interior wall tile is next to a walkable tile"""
+
+    for terrain in batch.terrain:
+        near = ndimage.binary_dilation(terrain, np.ones((3, 3), dtype=bool))
+        assert near[1:-1, 1:-1].all()
+
+
+def test_resources_placed_on_walkable_tiles(batch):
+    for terrain, resources in zip(batch.terrain, batch.resources):
+        assert resources.stockpile == 0
+        assert sum(resources.locations.values()) == 10
+        assert all(terrain[tile.x, tile.y] for tile in resources.locations)
+
+
+def test_player_start_reaches_maze(batch):
+    for terrain, start in zip(batch.terrain, batch.player_start):
+        low_x, low_y = max(start.x - 1, 0), max(start.y - 1, 0)
+        assert terrain[low_x:start.x + 2, low_y:start.y + 2].any()
+
+
+def test_seed_reproducible():
+    first = batch_maze.BatchMazeBuilder(4, (20, 20), (5, 1, 2), seed=9)
+    second = batch_maze.BatchMazeBuilder(4, (20, 20), (5, 1, 2), seed=9)
+    assert (first.terrain == second.terrain).all()
+    assert first.player_start == second.player_start
+
+
+def test_resources_ignore_global_random():
+    placed = []
+    for global_seed in (1, 2):
+        random.seed(global_seed)
+        resources = batch_maze.BatchMazeBuilder(2, (15, 15), (20, 1, 3),
+                                                seed=4).resources[1]
+        resources.stockpile = 100
+        for y_pos in range(1, 11):
+            resources.place(maze.Tile(1, y_pos))
+        placed.append(resources.locations)
+    assert placed[0] == placed[1]
+
+
+def test_mazes_share_terrain(batch):
+    mazes = batch.mazes()
+    assert len(mazes) == batch.count
+    assert np.shares_memory(mazes[-1].terrain, batch.terrain)
+
+
+def test_rejects_mazes_without_interior():
+    with pytest.raises(ValueError):
+        batch_maze.BatchMazeBuilder(2, (2, 10), (1, 1, 1))
@@ -0,0 +1,38 @@
+"""Tests of comparing benchmark results"""
+
+import json
+from maze_pro import benchmark
+
+META = {'python': '3.11.7', 'platform': 'Linux', 'machine': 'x86_64',
+        'node': 'bench'}
+
+
+def document(value, **meta):
+    return {'meta': dict(META, **meta),
+            'results': {'generate.seconds[25x25]':
+                        {'value': value, 'unit': 's', 'better': 'lower'}}}
+
+
+def write(path, contents):
+    path.write_text(json.dumps(contents))
+    return str(path)
+
+
+def test_flags_regression_beyond_tolerance():
+    assert benchmark.compare(document(1.0), document(1.2), 0.25) == []
+    assert benchmark.compare(document(1.0), document(1.3), 0.25) == [
+        'generate.seconds[25x25]']
+
+
+def test_compare_exit_status(tmp_path):
+    before = write(tmp_path / 'before.json', document(1.0))
+    after = write(tmp_path / 'after.json', document(2.0))
+    assert benchmark.main(['compare', before, before]) == 0
+    assert benchmark.main(['compare', before, after]) == 1
+
+
+def test_refuses_other_machine(tmp_path, capsys):
+    before = write(tmp_path / 'before.json', document(1.0))
+    other = write(tmp_path / 'other.json', document(1.0, node='laptop'))
+    assert benchmark.main(['compare', before, other]) == 2
+    assert 'node: bench != laptop' in capsys.readouterr().out
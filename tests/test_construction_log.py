@@ -0,0 +1,101 @@
+"""Tests of the construction log and its binary encodings"""
+
+import io
+import numpy as np
+import pytest
+import construction_log
+import maze
+from construction_log import ConstructionLog
+
+
+@pytest.fixture(scope='module')
+def builder():
+    return maze.MazeBuilder((30, 20), (20, 3, 8), seed=4, progress=False)
+
+
+def written(log: ConstructionLog, encoding: str) -> io.BytesIO:
+    file = io.BytesIO()
+    log.write(file, encoding)
+    file.seek(0)
+    return file
+
+
+@pytest.mark.parametrize('encoding', construction_log.ENCODINGS)
+def test_load_round_trip(builder, encoding):
+    log = builder.construction_log
+    loaded = ConstructionLog.load(written(log, encoding))
+    assert len(loaded) == len(log)
+    assert loaded.as_json() == log.as_json()
+
+
+@pytest.mark.parametrize('encoding', construction_log.ENCODINGS)
+def test_read_events_round_trip(builder, encoding):
+    log = builder.construction_log
+    events = list(construction_log.read_events(written(log, encoding)))
+    assert events == [(color, [tuple(tile) for tile in tiles])
+                      for color, tiles in log]
+
+
+@pytest.mark.parametrize('encoding', construction_log.ENCODINGS)
+def test_streamed_log_matches_memory(builder, encoding):
+    file = io.BytesIO()
+    streamed = ConstructionLog(stream=file, encoding=encoding)
+    maze.MazeBuilder((30, 20), (20, 3, 8), seed=4, progress=False,
+                     record=streamed)
+    file.seek(0)
+    assert (list(construction_log.read_events(file))
+            == list(construction_log.read_events(
+                written(builder.construction_log, encoding))))
+
+
+def test_delta_encoding_smaller(builder):
+    log = builder.construction_log
+    assert (len(written(log, construction_log.ENCODING_DELTA).getvalue())
+            < len(written(log, construction_log.ENCODING_RAW).getvalue()))
+
+
+def test_seek_keeps_walker_prefix():
+    log = ConstructionLog()
+    log.seek([maze.Tile(1, 1), maze.Tile(1, 2), maze.Tile(1, 3)])
+    log.seek([maze.Tile(2, 2)], keep=2)
+    assert [tiles for _, tiles in log][-1] == [(1, 1), (1, 2), (2, 2)]
+
+
+def test_record_none_discards_events():
+    log = ConstructionLog(construction_log.RECORD_NONE)
+    log.clear([maze.Tile(1, 1)])
+    assert len(log) == 0 and not log.as_json()['steps']
+
+
+def test_load_rejects_other_files():
+    with pytest.raises(ValueError):
+        ConstructionLog.load(io.BytesIO(b'not a log'))
+
+
+@pytest.mark.parametrize('values', [
+    [0], [1, 127, 128, 255, 300, 16383, 16384],
+    [2**32 - 1, 2**32, 2**63, 2**64 - 1], []])
+def test_varints_round_trip(values):
+    values = np.array(values, dtype=np.uint64)
+    encoded = construction_log.encode_varints(values)
+    assert construction_log.decode_varints(encoded).tolist() == values.tolist()
+
+
+def test_varint_lengths():
+    encoded = construction_log.encode_varints(np.array([127, 128, 16384]))
+    assert len(encoded) == 1 + 2 + 3
+
+
+def test_read_varint_matches_decode():
+    values = [5, 128, 2**40]
+    file = io.BytesIO(construction_log.encode_varints(np.array(values)))
+    assert [construction_log.read_varint(file) for _ in values] == values
+    with pytest.raises(EOFError):
+        construction_log.read_varint(file)
+
+
+def test_zigzag_round_trip():
+    values = np.array([0, -1, 1, -2, 2, -2**63, 2**63 - 1], dtype=np.int64)
+    encoded = construction_log.zigzag(values)
+    assert encoded[:5].tolist() == [0, 1, 2, 3, 4]
+    assert construction_log.unzigzag(encoded).tolist() == values.tolist()
@@ -0,0 +1,150 @@
+"""Tests of what GameMaze tracks and draws: found resources, the fog over
+
+unseen tiles and the minimap
+
+"""
+
+import numpy as np
+import pygame
+import pytest
+import atlas
+import game_enviornment
+import hud
+import maze
+from game_enviornment import MINI_MAP
+
+
+@pytest.fixture
+def display():
+    game_enviornment.init_pygame()
+    surface = pygame.display.set_mode((1056, 800))
+    yield surface
+    hud.release()
+    atlas.release()
+    pygame.quit()
+
+
+@pytest.fixture
+def interface():
+    builder = maze.MazeBuilder((20, 20), (100, 1, 5), seed=11,
+                               progress=False)
+    return maze.PlayerInterface(builder.dim, (100, 1, 5), builder=builder)
+
+
+@pytest.fixture
+def game_maze(display, interface):
+    return game_enviornment.GameMaze(
+        interface.get_maze().maze, atlas.atlas(), 'find_resource',
+        resources=interface.resource_index)
+
+
+@pytest.fixture
+def knowledge(interface):
+    """Every tile type of the maze, as if the player had seen it all"""
+
+    terrain = interface.get_maze().maze.terrain
+    known = np.where(terrain, maze.WALKABLE, maze.WALL).astype(np.uint8)
+    known[interface.resource_index.amounts > 0] = maze.RESOURCE
+    return known
+
+
+def tile_pixels(surface: pygame.Surface, game_maze, tile: maze.Tile):
+    position = game_maze.camera.screen_position((tile.x * 16, tile.y * 16))
+    return pygame.surfarray.array3d(
+        surface.subsurface(pygame.Rect(position, (16, 16))))
+
+
+def test_counts_found_resources(game_maze, interface, knowledge):
+    game_maze.update({}, knowledge)
+    assert game_maze.resource['count'] == len(interface.resource_index)
+
+
+def test_counts_found_resources_once(game_maze, interface, knowledge):
+    game_maze.update({}, knowledge)
+    game_maze.update({interface.player_pos: 0}, knowledge)
+    assert game_maze.resource['count'] == len(interface.resource_index)
+
+
+def test_marks_found_tiles(game_maze, knowledge):
+    game_maze.update({}, knowledge)
+    assert (game_maze.resource['found']
+            == (knowledge == maze.RESOURCE)).all()
+
+
+def test_draws_found_tiles_holding_resource(display, game_maze, interface,
+                                            knowledge):
+    tile = next(iter(interface.resource_index))
+    game_maze.draw(display, {}, 'maze', knowledge)
+    assert (tile_pixels(display, game_maze, tile)
+            == pygame.surfarray.array3d(atlas.atlas()['mineral'])).all()
+
+
+def test_hides_found_tiles_mined_out(display, game_maze, interface,
+                                     knowledge):
+    tile = next(iter(interface.resource_index))
+    game_maze.draw(display, {}, 'maze', knowledge)
+    interface.get_maze().resources.locations[tile] = 0
+    interface.refresh_tile(tile)
+    dirty = game_maze.update({}, knowledge)
+    position = game_maze.camera.screen_position((tile.x * 16, tile.y * 16))
+    assert pygame.Rect(position, (16, 16)).collidelist(dirty) >= 0
+    game_maze.draw_area(display, display.get_rect(), 'maze')
+    assert (tile_pixels(display, game_maze, tile)
+            != pygame.surfarray.array3d(atlas.atlas()['mineral'])).any()
+
+
+def test_fog_covers_unseen_tiles(display, game_maze, knowledge):
+    seen = np.zeros(knowledge.shape, dtype=bool)
+    seen[:8, :] = True
+    seen[12:, 5:9] = True
+    known = np.where(seen, knowledge, maze.UNKNOWN)
+    game_maze.draw(display, {}, 'maze', known)
+    assert (game_maze.fog_mask == ~seen).all()
+
+    terrain = pygame.Surface(display.get_size())
+    game_maze.maze_chunks.draw(terrain, game_maze.camera,
+                               game_maze.camera.view)
+    for (x_pos, y_pos), tile_seen in np.ndenumerate(seen):
+        if knowledge[x_pos, y_pos] == maze.RESOURCE:
+            continue
+        tile = maze.Tile(x_pos, y_pos)
+        clear = (tile_pixels(display, game_maze, tile)
+                 == tile_pixels(terrain, game_maze, tile)).all()
+        assert clear == tile_seen
+
+
+def test_fog_cleared_only_once_seen(display, game_maze, knowledge):
+    known = np.full(knowledge.shape, maze.UNKNOWN, dtype=np.uint8)
+    game_maze.update({}, known)
+    assert game_maze.fog_mask.all()
+    known[3, 4] = knowledge[3, 4]
+    game_maze.update({maze.Tile(3, 4): 0}, known)
+    assert not game_maze.fog_mask[3, 4]
+    assert game_maze.fog_mask.sum() == game_maze.fog_mask.size - 1
+
+
+def test_mini_map_uses_palette(display, game_maze, knowledge):
+    known = knowledge.copy()
+    known[10:, :] = maze.UNKNOWN
+    game_maze.draw(display, {}, 'maze', known)
+    columns = np.arange(MINI_MAP.width) * known.shape[0] // MINI_MAP.width
+    rows = np.arange(MINI_MAP.height) * known.shape[1] // MINI_MAP.height
+    expected = game_maze.mini_palette[known[np.ix_(columns, rows)]]
+    assert (pygame.surfarray.array3d(display.subsurface(MINI_MAP))
+            == expected).all()
+    assert {tuple(color) for color in expected.reshape(-1, 3).tolist()} == {
+        tuple(game_maze.mini_palette[tile_type].tolist())
+        for tile_type in np.unique(known)}
+
+
+def test_mini_map_follows_knowledge(display, game_maze, knowledge):
+    known = np.full(knowledge.shape, maze.UNKNOWN, dtype=np.uint8)
+    game_maze.update({}, known)
+    known[4:7, 2:5] = knowledge[4:7, 2:5]
+    game_maze.update({maze.Tile(5, 3): 0}, known)
+    columns = np.arange(MINI_MAP.width) * known.shape[0] // MINI_MAP.width
+    rows = np.arange(MINI_MAP.height) * known.shape[1] // MINI_MAP.height
+    panel = game_maze.panel_surf.subsurface(
+        MINI_MAP.move(-game_enviornment.PANEL.x, -game_enviornment.PANEL.y))
+    assert (pygame.surfarray.array3d(panel)
+            == game_maze.mini_palette[known[np.ix_(columns, rows)]]).all()
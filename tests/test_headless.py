@@ -0,0 +1,138 @@
+"""Tests of headless episodes and the agents' run() fast path"""
+
+import copy
+import numpy as np
+import pytest
+import dfs
+import headless
+import maze
+import random_mouse
+
+AGENTS = {
+    'dfs': lambda interface, seed: dfs.DFS(interface.dimensions, None,
+                                           interface=interface),
+    'mouse': random_mouse.RobertFrostRandomMouse,
+}
+
+
+@pytest.fixture(params=[(2, (25, 25)), (6, (40, 30)), (8, (50, 50))])
+def builder(request):
+    seed, dimensions = request.param
+    return maze.MazeBuilder(dimensions, (1, 1, 1), seed=seed,
+                            progress=False)
+
+
+def play(builder, kind: str, fast: bool, max_steps: int = 100000):
+    """Run an episode of a fresh agent in a copy of builder's maze"""
+
+    builder = copy.deepcopy(builder)
+    interface = maze.PlayerInterface(builder.dim, (1, 1, 1), builder=builder)
+    agent = AGENTS[kind](interface, 4)
+    return agent, headless.run_episode(agent, max_steps, fast)
+
+
+def agent_state(agent) -> list:
+    state = [agent.interface.player_pos,
+             agent.interface.player_maze.terrain.tolist(),
+             agent.visited.tolist()]
+    if isinstance(agent, dfs.DFS):
+        return state + [list(agent.path)]
+    return state + [agent.maze.tolist(), agent.path.tolist(), agent.steps,
+                    agent.position, agent.rng.getstate()]
+
+
+@pytest.mark.parametrize('kind', sorted(AGENTS))
+def test_episode_reaches_exit(builder, kind):
+    _, stats = play(builder, kind, fast=True)
+    assert stats.reached_exit
+
+
+@pytest.mark.parametrize('kind', sorted(AGENTS))
+@pytest.mark.parametrize('max_steps', [0, 17, 100000])
+def test_run_stats_match_step(builder, kind, max_steps):
+    _, stepped = play(builder, kind, False, max_steps)
+    _, run = play(builder, kind, True, max_steps)
+    assert ((stepped.steps, stepped.unique_tiles, stepped.reached_exit)
+            == (run.steps, run.unique_tiles, run.reached_exit))
+
+
+@pytest.mark.parametrize('kind', sorted(AGENTS))
+@pytest.mark.parametrize('max_steps', [17, 100000])
+def test_run_state_matches_step(builder, kind, max_steps):
+    stepped, _ = play(builder, kind, False, max_steps)
+    run, _ = play(builder, kind, True, max_steps)
+    assert agent_state(stepped) == agent_state(run)
+
+
+def test_run_then_step_continues(builder):
+    stepped, _ = play(builder, 'dfs', False, 30)
+    run, _ = play(builder, 'dfs', True, 10)
+    headless.run_episode(run, 20, fast=False)
+    assert agent_state(stepped) == agent_state(run)
+
+
+def test_mouse_run_keeps_latest_path(builder):
+    mouse, _ = play(builder, 'mouse', True, 3000)
+    stepped, _ = play(builder, 'mouse', False, 3000)
+    assert mouse.path_tiles() == stepped.path_tiles()
+
+
+@pytest.mark.parametrize('fast', [False, True])
+def test_mouse_path_length(builder, fast):
+    builder = copy.deepcopy(builder)
+    interface = maze.PlayerInterface(builder.dim, (1, 1, 1), builder=builder)
+    mouse = random_mouse.RobertFrostRandomMouse(interface, 4, path_length=7)
+    headless.run_episode(mouse, 40, fast)
+    full, _ = play(builder, 'mouse', fast, 40)
+    assert len(mouse.path_tiles()) == 7
+    assert mouse.path_tiles() == full.path_tiles()[-7:]
+
+
+def test_mouse_path_length_positive(interface):
+    with pytest.raises(ValueError):
+        random_mouse.RobertFrostRandomMouse(interface, path_length=0)
+
+
+def test_steps_per_second():
+    stats = headless.EpisodeStats(10, 5, True, 0.5)
+    assert (stats.steps_per_second, stats.seconds_per_step) == (20.0, 0.05)
+
+
+@pytest.fixture
+def interface(builder):
+    return maze.PlayerInterface(builder.dim, (1, 1, 1), builder=builder)
+
+
+def test_walk_rejects_jumps(interface):
+    pos = interface.player_pos
+    far = [tile for tile in np.argwhere(
+        interface.get_maze().maze.terrain).tolist()
+           if abs(tile[0] - pos.x) + abs(tile[1] - pos.y) > 1][0]
+    with pytest.raises(ValueError):
+        interface.walk([far])
+
+
+def test_walk_rejects_walls(interface):
+    wall = np.argwhere(~interface.get_maze().maze.terrain)[-1]
+    with pytest.raises(ValueError, match='wall'):
+        interface.walk([wall])
+
+
+def test_walk_rejects_leaving_maze(interface):
+    with pytest.raises(ValueError):
+        interface.walk([(-1, 0)])
+
+
+def test_walk_reveals_like_move_to(builder):
+    stepped = maze.PlayerInterface(builder.dim, (1, 1, 1), builder=builder)
+    walked = maze.PlayerInterface(builder.dim, (1, 1, 1), builder=builder)
+    agent = dfs.DFS(builder.dim, None, interface=stepped)
+    tiles = [agent.step()[1] for _ in range(25)]
+    walked.walk([(tile.x, tile.y) for tile in tiles])
+    assert ((walked.player_pos, walked.player_maze.terrain.tolist())
+            == (stepped.player_pos, stepped.player_maze.terrain.tolist()))
+
+
+def test_tile_type_grid_read_only(interface):
+    with pytest.raises(ValueError):
+        interface.tile_type_grid()[0, 0] = maze.WALKABLE
@@ -0,0 +1,61 @@
+"""Tests of the shared fonts and images across pygame sessions"""
+
+import pygame
+import pytest
+import atlas
+import game_enviornment
+import hud
+
+
+@pytest.fixture
+def session():
+    """A pygame session with a display, cleaned up like App.on_cleanup"""
+
+    game_enviornment.init_pygame()
+    pygame.display.set_mode((64, 64))
+    yield
+    hud.release()
+    atlas.release()
+    pygame.quit()
+
+
+def quit_and_init():
+    """Clean up like App.on_cleanup and start the next session"""
+
+    hud.release()
+    atlas.release()
+    pygame.quit()
+    game_enviornment.init_pygame()
+    pygame.display.set_mode((64, 64))
+
+
+def test_text_cache_renders_after_reinit(session):
+    hud.text_cache().render('Tiles Visited: 1')
+    quit_and_init()
+    assert hud.text_cache().render('Tiles Visited: 2').get_width() > 0
+
+
+def test_text_cache_shared_within_session(session):
+    assert hud.text_cache() is hud.text_cache()
+
+
+def test_release_drops_text_cache(session):
+    cache = hud.text_cache()
+    hud.release()
+    assert hud.text_cache() is not cache
+
+
+def test_atlas_blits_after_reinit(session):
+    atlas.atlas()['wall']
+    quit_and_init()
+    pygame.display.get_surface().blit(atlas.atlas()['wall'], (0, 0))
+
+
+def test_app_runs_twice_in_one_process():
+    for _ in range(2):
+        app = game_enviornment.App(game_enviornment.FIND_EXIT, (1, 1, 1),
+                                   dimensions=(10, 10), seed=2)
+        app.on_init()
+        app.on_render()
+        app.on_cleanup()
+    assert not pygame.get_init()
@@ -0,0 +1,33 @@
+"""Tests that the headless modules import without the heavy dependencies"""
+
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ('matplotlib', 'pygame', 'tqdm')
+
+
+def run_python(script: str) -> subprocess.CompletedProcess:
+    """Run script in a fresh interpreter with maze_pro/src on the path"""
+
+    return subprocess.run(
+        [sys.executable, '-c', script], capture_output=True, text=True,
+        check=True, cwd=ROOT,
+        env=dict(os.environ, PYTHONPATH=os.path.join(ROOT, 'maze_pro', 'src')))
+
+
+@pytest.mark.parametrize('module', ['maze', 'dfs', 'random_mouse'])
+def test_import_skips_heavy_modules(module):
+    result = run_python('import sys\nimport {}\nprint([name for name in {!r} '
+                        'if name in sys.modules])'.format(module, HEAVY))
+    assert result.stdout.strip() == '[]'
+
+
+def test_silent_builder_skips_tqdm():
+    result = run_python('import sys\nimport maze\n'
+                        'maze.MazeBuilder((12, 10), (1, 1, 1), seed=1, '
+                        'progress=False)\nprint("tqdm" in sys.modules)')
+    assert result.stdout.strip() == 'False'
+    assert result.stderr == ''
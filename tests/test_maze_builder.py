@@ -0,0 +1,67 @@
+"""Tests that MazeBuilder builds the same mazes as the original algorithm"""
+
+import hashlib
+import json
+import random
+import pytest
+import maze
+from maze_pro import generate
+
+# Digests of mazes built by the original MazeBuilder, before the wall tile
+# index, after random.seed(seed)
+BASELINE = [
+    (1, (10, 10), (1, 1, 1), 'e31b73c363e0333d'),
+    (2, (25, 25), (1, 1, 1), 'e991d52a8571223d'),
+    (5, (30, 20), (20, 3, 8), '3c4b9b179936c069'),
+    (9, (50, 50), (100, 5, 15), '33ec49f53d4d6089'),
+]
+
+
+def digest(builder: maze.MazeBuilder) -> str:
+    """Return a digest of the terrain, player start, resources and
+
+    construction steps of a maze
+
+    """
+
+    locations = sorted(([tile.x, tile.y], amount) for tile, amount
+                       in builder.resources.locations.items())
+    start = builder.player_start
+    data = [builder.maze.terrain.tolist(), [start.x, start.y], locations,
+            builder.construction_log.as_json()['steps']]
+    return hashlib.sha256(
+        json.dumps(data, default=int).encode()).hexdigest()[:16]
+
+
+@pytest.mark.parametrize('seed, dimensions, resources, expected', BASELINE)
+def test_matches_baseline(seed, dimensions, resources, expected):
+    random.seed(seed)
+    builder = maze.MazeBuilder(dimensions, resources, progress=False)
+    assert digest(builder) == expected
+
+
+def test_seed_matches_seeded_global_random():
+    random.seed(5)
+    seeded_global = maze.MazeBuilder((30, 20), (20, 3, 8), progress=False)
+    seeded = maze.MazeBuilder((30, 20), (20, 3, 8), seed=5, progress=False)
+    assert digest(seeded) == digest(seeded_global)
+
+
+def test_seed_ignores_global_random():
+    random.seed(1)
+    first = maze.MazeBuilder((25, 25), (10, 1, 3), seed=7, progress=False)
+    random.seed(2)
+    second = maze.MazeBuilder((25, 25), (10, 1, 3), seed=7, progress=False)
+    assert digest(first) == digest(second)
+
+
+def test_generate_independent_of_workers(tmp_path):
+    outputs = []
+    for workers in (1, 2):
+        output = tmp_path / str(workers)
+        generate.main(['--count', '5', '--dims', '20x15', '--seed', '3',
+                       '--workers', str(workers), '--output', str(output)])
+        outputs.append({path.name: path.read_bytes()
+                        for path in sorted(output.iterdir())})
+    assert outputs[0] == outputs[1]
+    assert len(outputs[0]) == 6
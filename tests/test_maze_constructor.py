@@ -0,0 +1,124 @@
+"""Tests of the construction playback of MazeConstructor"""
+
+import numpy as np
+import pygame
+import pytest
+import atlas
+import game_enviornment
+import hud
+import maze
+from game_enviornment import VIEW, MazeConstructor
+
+
+@pytest.fixture
+def display():
+    game_enviornment.init_pygame()
+    surface = pygame.display.set_mode((1056, 800))
+    yield surface
+    hud.release()
+    atlas.release()
+    pygame.quit()
+
+
+@pytest.fixture(scope='module')
+def builder():
+    return maze.MazeBuilder((30, 25), (20, 1, 3), seed=6, progress=False)
+
+
+def constructor(display, builder, **kwargs) -> MazeConstructor:
+    kwargs.setdefault('frame_budget', float('inf'))
+    return MazeConstructor(builder.construction_log, atlas.atlas(), display,
+                           builder.dim, **kwargs)
+
+
+def state(display, playback: MazeConstructor):
+    return (playback.index, playback.finished, playback.tiles.tolist(),
+            playback.temporary, dict(playback.statistics),
+            pygame.image.tostring(display.subsurface(VIEW), 'RGB'))
+
+
+def seek_code(playback: MazeConstructor) -> int:
+    return list(playback.color_map).index('seek') + 1
+
+
+@pytest.mark.parametrize('steps', [1, 40, 10 ** 6])
+def test_seek_matches_playing_steps(display, builder, steps):
+    played = constructor(display, builder, rate=steps)
+    played.play_frame(1.0)
+    expected = state(display, played)
+    sought = constructor(display, builder)
+    sought.seek(steps)
+    assert state(display, sought) == expected
+
+
+def test_seek_backwards_restarts(display, builder):
+    playback = constructor(display, builder)
+    playback.seek(60)
+    playback.seek(25)
+    expected = state(display, playback)
+    fresh = constructor(display, builder)
+    fresh.seek(25)
+    assert state(display, fresh) == expected
+
+
+def test_play_frame_carries_fraction_of_step(display, builder):
+    playback = constructor(display, builder, rate=4)
+    playback.play_frame(0.5)
+    assert playback.index == 2
+    playback.play_frame(0.375)
+    assert playback.index == 3
+    playback.play_frame(0.125)
+    assert playback.index == 4
+
+
+def test_play_frame_drops_steps_over_budget(display, builder):
+    playback = constructor(display, builder, rate=1000, frame_budget=0.0)
+    playback.play_frame(1.0)
+    assert playback.index == 1
+    playback.play_frame(0.0)
+    assert playback.index == 1
+
+
+def test_unlimited_rate_plays_to_end(display, builder):
+    playback = constructor(display, builder, rate=None)
+    playback.play_frame(0.0)
+    assert playback.finished
+    assert playback.index == len(builder.construction_log)
+
+
+def test_temporary_holds_walker_path(display, builder):
+    playback = constructor(display, builder)
+    while not playback.finished:
+        playback.skip_step()
+        seeking = np.argwhere(playback.tiles == seek_code(playback))
+        assert playback.temporary == {tuple(tile)
+                                      for tile in seeking.tolist()}
+
+
+def test_restore_walls_clears_walker_path(display, builder):
+    playback = constructor(display, builder)
+    while not playback.temporary:
+        playback.skip_step()
+    path = set(playback.temporary)
+    playback.restore_walls()
+    assert not playback.temporary
+    assert all(playback.tiles[tile] == 0 for tile in path)
+
+
+def test_skip_until_clear_stops_after_clear(display, builder):
+    playback = constructor(display, builder)
+    cleared = playback.statistics['cleared_tiles']
+    playback.skip_until_clear()
+    assert playback.statistics['cleared_tiles'] > cleared
+    expected = state(display, playback)
+    fresh = constructor(display, builder)
+    fresh.seek(playback.index)
+    assert state(display, fresh) == expected
+
+
+def test_skip_step_while_paused(display, builder):
+    playback = constructor(display, builder)
+    playback.paused = True
+    playback.skip_step()
+    playback.skip_step()
+    assert playback.index == 2
@@ -0,0 +1,88 @@
+"""Tests of saving and memory mapping maze files"""
+
+import numpy as np
+import pytest
+import maze
+import maze_file
+
+
+@pytest.fixture(scope='module')
+def builder():
+    return maze.MazeBuilder((37, 23), (40, 2, 9), seed=6, progress=False)
+
+
+@pytest.mark.parametrize('packed', [True, False])
+def test_round_trip(builder, tmp_path, packed):
+    path = str(tmp_path / 'maze.mzp')
+    maze_file.save_maze(builder, path, packed)
+    loaded = maze_file.load_maze(path)
+
+    assert loaded.dim == builder.dim
+    assert (loaded.maze.terrain == builder.maze.terrain).all()
+    assert loaded.player_start == builder.player_start
+    assert loaded.resources.locations == builder.resources.locations
+    assert loaded.resources.stockpile == builder.resources.stockpile
+    assert loaded.resource_allocation == builder.resource_allocation
+
+
+def test_keeps_allocation_after_mining(tmp_path):
+    builder = maze.MazeBuilder((20, 20), (30, 2, 6), seed=4, progress=False)
+    for tile in list(builder.resources.locations)[:3]:
+        builder.resources.take(tile, 100)
+    path = str(tmp_path / 'maze.mzp')
+    maze_file.save_maze(builder, path)
+    loaded = maze_file.load_maze(path)
+    assert loaded.resource_allocation == (30, 2, 6)
+    assert loaded.resources.locations == builder.resources.locations
+
+
+def test_loads_version_1(builder, tmp_path):
+    path = str(tmp_path / 'maze.mzp')
+    maze_file.save_maze(builder, path, packed=False)
+    current = maze_file.load_maze(path)
+    resources = builder.resources
+    locations = np.array([(tile.x, tile.y, amount) for tile, amount
+                          in resources.locations.items()], dtype='<i8')
+    header = maze_file.HEADER_V1.pack(
+        maze_file.MAGIC, 1, 0, *builder.dim, builder.player_start.x,
+        builder.player_start.y, resources.stockpile,
+        *builder.resource_allocation[1:], len(locations))
+    offset = maze_file.terrain_offset(len(locations), maze_file.HEADER_V1)
+    old_path = str(tmp_path / 'old.mzp')
+    with open(old_path, 'wb') as old_file:
+        old_file.write(header + locations.tobytes())
+        old_file.write(bytes(offset - len(header) - locations.nbytes))
+        old_file.write(builder.maze.terrain.astype(np.uint8).tobytes())
+
+    loaded = maze_file.load_maze(old_path)
+    assert (loaded.maze.terrain == current.maze.terrain).all()
+    assert loaded.player_start == current.player_start
+    assert loaded.resources.locations == current.resources.locations
+    assert loaded.resource_allocation == current.resource_allocation
+
+
+def test_packed_file_smaller(builder, tmp_path):
+    packed, unpacked = tmp_path / 'packed.mzp', tmp_path / 'unpacked.mzp'
+    maze_file.save_maze(builder, str(packed), True)
+    maze_file.save_maze(builder, str(unpacked), False)
+    assert packed.stat().st_size < unpacked.stat().st_size
+
+
+def test_load_leaves_file_unchanged(builder, tmp_path):
+    path = tmp_path / 'maze.mzp'
+    maze_file.save_maze(builder, str(path), packed=False)
+    contents = path.read_bytes()
+    loaded = maze_file.load_maze(str(path))
+    loaded.maze.terrain[:] = True
+    del loaded
+    assert path.read_bytes() == contents
+
+
+@pytest.mark.parametrize('contents', [b'MZ', b'NOPE' + bytes(100),
+                                      b'MZPR' + bytes((2, 0)) + bytes(52),
+                                      b'MZPR' + bytes((9, 0)) + bytes(100)])
+def test_load_rejects_other_files(tmp_path, contents):
+    path = tmp_path / 'other.mzp'
+    path.write_bytes(contents)
+    with pytest.raises(ValueError):
+        maze_file.load_maze(str(path))
@@ -0,0 +1,99 @@
+"""Tests of the junction graph of a maze"""
+
+import numpy as np
+import pytest
+from scipy import ndimage
+import maze
+from maze_graph import MazeGraph
+
+# A ring made of corridor tiles only, a dead end, an open room and a
+# corridor looping back to the junction it starts from
+HANDMADE = '''
+#########
+#.....#.#
+#.###.#.#
+#.#...#.#
+#.#.###.#
+#...#...#
+######..#
+#.......#
+#.###.###
+#.....###
+#########
+'''
+
+
+def handmade() -> maze.Maze:
+    rows = HANDMADE.split()
+    terrain = np.array([[char == '.' for char in row] for row in rows]).T
+    return maze.Maze(terrain, terrain.shape)
+
+
+@pytest.fixture(params=['handmade', 3, 11])
+def maze_data(request):
+    if request.param == 'handmade':
+        return handmade()
+    return maze.MazeBuilder((31, 27), (10, 1, 3), seed=request.param,
+                            progress=False).maze
+
+
+@pytest.fixture
+def graph(maze_data):
+    return MazeGraph(maze_data)
+
+
+def test_every_walkable_tile_on_graph(maze_data, graph):
+    covered = np.zeros(graph.dim, dtype=int)
+    for path in graph.edge_paths():
+        for tile in path[1:-1]:
+            covered[tile.x, tile.y] += 1
+    covered[graph.nodes[:, 0], graph.nodes[:, 1]] += 1
+    assert (covered == maze_data.terrain).all()
+
+
+def test_edges_follow_walkable_tiles(maze_data, graph):
+    for edge, path in enumerate(graph.edge_paths()):
+        positions = np.array([(tile.x, tile.y) for tile in path])
+        assert (np.abs(np.diff(positions, axis=0)).sum(axis=1) == 1).all()
+        assert maze_data.terrain[positions[:, 0], positions[:, 1]].all()
+        assert graph.edge_lengths[edge] == len(path) - 1
+        assert graph.is_node(path[0]) and graph.is_node(path[-1])
+        assert (graph.edge_ids[positions[1:-1, 0], positions[1:-1, 1]]
+                == edge).all()
+
+
+def test_nodes_are_dead_ends_and_junctions(maze_data, graph):
+    junctions = maze_data.terrain & (graph.degree != 2)
+    assert ((graph.node_ids >= 0) >= junctions).all()
+    assert ((graph.node_ids >= 0) <= maze_data.terrain).all()
+    assert (graph.degree[~maze_data.terrain] == 0).all()
+
+
+def test_neighbours_symmetric(graph):
+    for node in range(len(graph)):
+        for other, edge in graph.neighbours(node):
+            assert (node, edge) in graph.neighbours(other)
+            assert sorted(graph.edge_nodes[edge]) == sorted((node, other))
+
+
+def test_edge_bounds_contain_paths(graph):
+    for bounds, path in zip(graph.edge_bounds(), graph.edge_paths()):
+        positions = np.array([(tile.x, tile.y) for tile in path])
+        assert (bounds[:2] == positions.min(axis=0)).all()
+        assert (bounds[2:] == positions.max(axis=0)).all()
+
+
+def test_corridor_ring_gets_a_node():
+    maze_data = handmade()
+    graph = MazeGraph(maze_data)
+    regions, _ = ndimage.label(maze_data.terrain)
+    ring = np.argwhere(regions == regions[1, 1])
+    assert (graph.node_ids[ring[:, 0], ring[:, 1]] >= 0).sum() == 1
+
+
+def test_loop_joins_junction_to_itself():
+    graph = MazeGraph(handmade())
+    junction = graph.node_ids[5, 7]
+    loops = [edge for other, edge in graph.neighbours(junction)
+             if other == junction]
+    assert loops and graph.edge_lengths[loops[0]] == 12
@@ -0,0 +1,69 @@
+"""Tests of the mazes built ahead of time by MazePool"""
+
+import time
+import pytest
+import maze
+from maze_pool import MazePool
+from maze_pro import generate
+
+DIMENSIONS = (15, 12)
+RESOURCES = (5, 1, 2)
+
+
+def wait_until(condition, seconds: float = 30.0):
+    """Poll condition until it holds, failing after seconds"""
+
+    deadline = time.monotonic() + seconds
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def pool():
+    with MazePool(DIMENSIONS, RESOURCES, size=2, seed=3) as pool:
+        yield pool
+
+
+def test_mazes_match_generated_seeds(pool):
+    for seed in generate.maze_seeds(3, 3):
+        expected = maze.MazeBuilder(DIMENSIONS, RESOURCES, seed,
+                                    progress=False)
+        pooled = pool.get(timeout=30)
+        assert (pooled.maze.terrain == expected.maze.terrain).all()
+        assert pooled.player_start == expected.player_start
+        assert (pooled.resources.locations
+                == expected.resources.locations)
+        assert (pooled.construction_log.as_json()
+                == expected.construction_log.as_json())
+
+
+def test_progress_reaches_total(pool):
+    # The worker builds one more maze before waiting on the full queue
+    wait_until(lambda: pool.ready() == pool.size and pool.progress() == 1.0)
+    time.sleep(0.5)
+    assert pool.progress() == 1.0
+
+
+def test_full_queue_holds_worker_back(pool):
+    wait_until(lambda: pool.ready() == pool.size)
+    time.sleep(0.5)
+    assert pool.ready() == pool.size
+    pool.get(timeout=30)
+    wait_until(lambda: pool.ready() == pool.size)
+    time.sleep(0.5)
+    assert pool.ready() == pool.size
+
+
+def test_close_stops_waiting_worker():
+    pool = MazePool(DIMENSIONS, RESOURCES, size=1, seed=3)
+    wait_until(lambda: pool.ready() == 1)
+    start = time.monotonic()
+    pool.close()
+    pool.close()
+    assert time.monotonic() - start < 5
+
+
+def test_rejects_empty_pool():
+    with pytest.raises(ValueError):
+        MazePool(DIMENSIONS, size=0)
@@ -0,0 +1,216 @@
+"""Tests of the simulated clock and the miners sharing resources"""
+
+import pytest
+import game_enviornment
+import maze
+import mining
+
+
+@pytest.fixture
+def scheduler():
+    return mining.Scheduler()
+
+
+@pytest.fixture
+def resources():
+    """Four sources of 20 resource each"""
+
+    resources = maze.Resources((80, 20, 20), maze.make_rng(0))
+    for x_pos in range(4):
+        resources.place(maze.Tile(x_pos, 0))
+    return resources
+
+
+@pytest.fixture
+def mines(resources, scheduler):
+    return mining.Mines(resources, scheduler)
+
+
+def test_sleep_moves_clock(scheduler):
+    async def sleeper():
+        await scheduler.sleep(2.5)
+        return scheduler.now
+
+    task = scheduler.spawn(sleeper())
+    scheduler.run()
+    assert task.result == 2.5
+
+
+def test_wakes_in_time_then_arrival_order(scheduler):
+    woken = []
+
+    async def sleeper(name, seconds):
+        await scheduler.sleep(seconds)
+        woken.append(name)
+
+    for name, seconds in (('a', 2), ('b', 1), ('c', 2), ('d', 1)):
+        scheduler.spawn(sleeper(name, seconds))
+    scheduler.run()
+    assert woken == ['b', 'd', 'a', 'c']
+
+
+def test_run_until_stops_clock(scheduler):
+    async def sleeper():
+        await scheduler.sleep(10)
+
+    scheduler.spawn(sleeper())
+    assert scheduler.run(4) == 4 and len(scheduler) == 1
+
+
+def test_advance_moves_by_seconds(scheduler):
+    scheduler.advance(1.5)
+    assert scheduler.advance(1.5) == 3.0
+
+
+def test_task_awaits_task(scheduler):
+    async def child():
+        await scheduler.sleep(1)
+        return 7
+
+    async def parent():
+        return await scheduler.spawn(child()) * 2
+
+    task = scheduler.spawn(parent())
+    scheduler.run()
+    assert task.result == 14
+
+
+def test_negative_sleep_raises(scheduler):
+    with pytest.raises(ValueError):
+        scheduler.sleep(-1)
+
+
+def test_awaiting_other_awaitables_raises(scheduler):
+    class Other():
+        def __await__(self):
+            yield 'other'
+
+    async def waiter():
+        await Other()
+
+    scheduler.spawn(waiter())
+    with pytest.raises(ValueError):
+        scheduler.run()
+
+
+def test_future_result_set_once():
+    future = mining.Future()
+    future.set_result(1)
+    with pytest.raises(ValueError):
+        future.set_result(2)
+
+
+def test_mines_need_a_slot(resources, scheduler):
+    with pytest.raises(ValueError):
+        mining.Mines(resources, scheduler, slots=0)
+
+
+def test_mine_takes_capacity_over_rate(mines, scheduler):
+    task = scheduler.spawn(mines.mine(maze.Tile(0, 0), 5, 2.0))
+    scheduler.run()
+    assert (task.result, scheduler.now) == (5, 2.5)
+
+
+def test_mine_exhausted_source_returns_at_once(mines, scheduler):
+    task = scheduler.spawn(mines.mine(maze.Tile(9, 9), 5, 2.0))
+    scheduler.run()
+    assert (task.result, scheduler.now) == (0, 0)
+
+
+def test_mine_rejects_non_positive_rate(mines, scheduler):
+    scheduler.spawn(mines.mine(maze.Tile(0, 0), 5, 0))
+    with pytest.raises(ValueError):
+        scheduler.run()
+
+
+def test_contending_miners_queue_for_slot(mines, scheduler):
+    source = maze.Tile(0, 0)
+    tasks = [scheduler.spawn(mines.mine(source, 5, 5.0)) for _ in range(3)]
+    scheduler.run(0)
+    assert (mines.waiting, mines.in_flight) == (2, 5)
+    scheduler.run()
+    assert [task.result for task in tasks] == [5, 5, 5]
+    assert scheduler.now == 3.0
+
+
+def test_slots_mine_in_parallel(resources, scheduler):
+    mines = mining.Mines(resources, scheduler, slots=3)
+    for _ in range(3):
+        scheduler.spawn(mines.mine(maze.Tile(0, 0), 5, 5.0))
+    scheduler.run()
+    assert scheduler.now == 1.0
+
+
+def test_many_miners_account_for_everything(mines, resources, scheduler):
+    sources = list(resources.locations)
+    total = sum(resources.locations.values())
+    checks = []
+
+    async def auditor():
+        while len(scheduler) > 1:
+            checks.append(sum(resources.locations.values())
+                          + mines.in_flight + mines.delivered)
+            await scheduler.sleep(0.25)
+
+    tasks = [scheduler.spawn(mining.miner(mines, sources[index % 4], 3, 2.0,
+                                          travel=1.0))
+             for index in range(100)]
+    scheduler.spawn(auditor())
+    scheduler.run()
+    assert set(checks) == {total}
+    assert mines.delivered == total == sum(task.result for task in tasks)
+    assert not any(resources.locations.values())
+
+
+def test_on_mined_called_with_source(resources, scheduler):
+    mined = []
+    mines = mining.Mines(resources, scheduler, on_mined=mined.append)
+    scheduler.spawn(mining.miner(mines, maze.Tile(1, 0), 10, 5.0))
+    scheduler.run()
+    assert mined == [maze.Tile(1, 0)] * 2
+
+
+def test_miner_walks_there_and_back(mines, scheduler):
+    task = scheduler.spawn(mining.miner(mines, maze.Tile(0, 0), 20, 10.0,
+                                        travel=3.0))
+    scheduler.run()
+    assert (task.result, scheduler.now) == (20, 8.0)
+
+
+@pytest.fixture
+def gather_app():
+    app = game_enviornment.App(game_enviornment.GATHER, (60, 5, 15),
+                               dimensions=(20, 20), speed=None, seed=4)
+    app.on_init()
+    yield app
+    app.on_cleanup()
+
+
+def test_gather_mode_mines_every_resource(gather_app):
+    total = sum(gather_app.maze.resources.locations.values())
+    for _ in range(1000):
+        if gather_app.simulate(1 / 60):
+            break
+    assert gather_app.mines.delivered == total
+
+
+def test_gather_mode_counts_collected(gather_app):
+    for _ in range(1000):
+        if gather_app.simulate(1 / 60):
+            break
+    assert (gather_app.game_maze.resource['collected']
+            == gather_app.mines.delivered)
+
+
+def test_find_exit_mode_sends_no_miners():
+    app = game_enviornment.App(game_enviornment.FIND_EXIT, (1, 1, 1),
+                               dimensions=(10, 10), speed=None, seed=2)
+    app.on_init()
+    app.simulate(1 / 60)
+    app.on_cleanup()
+    assert app.scheduler.steps == 0
+
+
+def test_invalid_game_mode_raises():
+    with pytest.raises(ValueError):
+        game_enviornment.App('race', (1, 1, 1))
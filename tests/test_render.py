@@ -0,0 +1,71 @@
+"""Tests that the tile grids and chunks cached by GameMaze draw the same
+
+pixels as drawing them from scratch
+
+"""
+
+import numpy as np
+import pygame
+import pytest
+import atlas
+import game_enviornment
+import hud
+import maze
+import viewport
+from maze import Tile
+
+
+@pytest.fixture
+def display():
+    game_enviornment.init_pygame()
+    surface = pygame.display.set_mode((1056, 800))
+    yield surface
+    hud.release()
+    atlas.release()
+    pygame.quit()
+
+
+@pytest.fixture
+def game_maze(display):
+    builder = maze.MazeBuilder((70, 60), (10, 1, 3), seed=8, progress=False)
+    return game_enviornment.GameMaze(builder.maze, atlas.atlas(),
+                                     game_enviornment.FIND_EXIT)
+
+
+def pixels(surface: pygame.Surface) -> np.ndarray:
+    return pygame.surfarray.array3d(surface)
+
+
+def test_blit_tiles_matches_tile_by_tile(display):
+    images = [atlas.atlas()['wall'], atlas.atlas()['walkable']]
+    index = np.random.default_rng(3).integers(0, 2, (9, 7))
+    grid = pygame.Surface((9 * 16, 7 * 16))
+    game_enviornment.blit_tiles(grid, index, images)
+    expected = pygame.Surface(grid.get_size())
+    for (x_pos, y_pos), image in np.ndenumerate(index):
+        expected.blit(images[image], (x_pos * 16, y_pos * 16))
+    assert (pixels(grid) == pixels(expected)).all()
+
+
+@pytest.mark.parametrize('mode', ['maze', 'graph'])
+def test_cached_chunks_match_fresh_chunks(display, game_maze, mode):
+    knowledge = np.full(game_maze.maze.dim, maze.UNKNOWN, dtype=np.uint8)
+    knowledge[:20, :20] = maze.WALKABLE
+    game_maze.update({}, knowledge)
+    game_maze.draw_area(display, display.get_rect(), mode)
+
+    # Changes after the chunks are cached are drawn into them in place
+    game_maze.reveal(Tile(x_pos, y_pos) for x_pos in range(30, 40)
+                     for y_pos in range(5, 15))
+    for y_pos in range(1, 30):
+        game_maze.trail.node(Tile(3, y_pos), viewport.TRAIL_NEW)
+    game_maze.update_trail()
+    game_maze.camera.follow((600, 500))
+    game_maze.draw_area(display, display.get_rect(), mode)
+    cached = pixels(display)
+
+    for chunks in (game_maze.maze_chunks, game_maze.graph_chunks,
+                   game_maze.fog_chunks):
+        chunks.clear()
+    game_maze.draw_area(display, display.get_rect(), mode)
+    assert (pixels(display) == cached).all()
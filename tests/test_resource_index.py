@@ -0,0 +1,127 @@
+"""Tests of maze.ResourceIndex and its upkeep by PlayerInterface"""
+
+import numpy as np
+import pytest
+import maze
+
+
+@pytest.fixture
+def locations():
+    """Resource amounts spread over a 40x30 maze, some of them empty"""
+
+    rng = np.random.default_rng(3)
+    tiles = {maze.Tile(int(x), int(y)) for x, y in
+             zip(rng.integers(0, 40, 120), rng.integers(0, 30, 120))}
+    return {tile: int(rng.integers(0, 4)) for tile in tiles}
+
+
+@pytest.fixture
+def index(locations):
+    return maze.ResourceIndex((40, 30), locations)
+
+
+@pytest.fixture
+def interface():
+    return maze.PlayerInterface((25, 25), (100, 1, 5), seed=5,
+                                builder=maze.MazeBuilder(
+                                    (25, 25), (100, 1, 5), seed=5,
+                                    progress=False))
+
+
+def distance(tile: maze.Tile, position: maze.Tile) -> float:
+    return float(np.hypot(tile.x - position.x, tile.y - position.y))
+
+
+def test_counts_tiles_holding_resource(index, locations):
+    assert len(index) == sum(1 for amount in locations.values() if amount)
+
+
+def test_iterates_tiles_holding_resource(index, locations):
+    assert set(index) == {tile for tile, amount in locations.items()
+                          if amount}
+
+
+def test_amount_outside_maze_is_zero(index):
+    assert index.amount(maze.Tile(-1, 40)) == 0
+
+
+def test_update_outside_maze_raises(index):
+    with pytest.raises(ValueError):
+        index.update(maze.Tile(40, 0), 1)
+
+
+def test_area_matches_brute_force(index, locations):
+    expected = {tile for tile, amount in locations.items()
+                if amount and 5 <= tile.x < 20 and 10 <= tile.y < 25}
+    assert set(index.area((5, 10), (20, 25))) == expected
+
+
+@pytest.mark.parametrize('k', [1, 5, 200])
+def test_nearest_matches_brute_force(index, locations, k):
+    position = maze.Tile(17, 9)
+    found = index.nearest(position, k)
+    expected = sorted(distance(tile, position)
+                      for tile, amount in locations.items() if amount)[:k]
+    assert [distance(tile, position) for tile in found] == expected
+
+
+def test_nearest_includes_max_distance(index):
+    position = maze.Tile(0, 0)
+    farthest = index.nearest(position, len(index))[-1]
+    bound = distance(farthest, position)
+    assert farthest in index.nearest(position, len(index), bound)
+
+
+@pytest.mark.parametrize('radius', [0, 3, 7.5])
+def test_within_matches_brute_force(index, locations, radius):
+    position = maze.Tile(20, 15)
+    expected = {tile for tile, amount in locations.items()
+                if amount and distance(tile, position) <= radius}
+    found = index.within(position, radius)
+    assert set(found) == expected
+    assert [distance(tile, position) for tile in found] == sorted(
+        distance(tile, position) for tile in found)
+
+
+def test_queries_skip_emptied_tiles(index):
+    position = maze.Tile(20, 15)
+    emptied = index.nearest(position, 3)
+    for tile in emptied:
+        index.update(tile, 0)
+    assert not set(emptied) & set(index.within(position, 50))
+
+
+def test_queries_find_refilled_tiles(index):
+    position = maze.Tile(20, 15)
+    tile = index.nearest(position)[0]
+    index.update(tile, 0)
+    index.nearest(position)
+    index.update(tile, 2)
+    assert index.nearest(position) == [tile]
+
+
+def test_empty_index_finds_nothing():
+    assert maze.ResourceIndex((5, 5)).nearest(maze.Tile(2, 2)) == []
+
+
+def test_refresh_tile_types_keeps_index(interface):
+    index = interface.resource_index
+    interface.refresh_tile_types()
+    assert interface.resource_index is index
+
+
+def test_refresh_tile_types_updates_changed_tiles(interface):
+    locations = interface.get_maze().resources.locations
+    tile = next(iter(interface.resource_index))
+    locations[tile] = 0
+    interface.refresh_tile_types()
+    assert (tile not in interface.resource_index
+            and interface.tile_type(tile) == maze.WALKABLE)
+
+
+def test_refresh_tile_matches_locations(interface):
+    resources = interface.get_maze().resources
+    tile = next(iter(interface.resource_index))
+    resources.take(tile, 1)
+    interface.refresh_tile(tile)
+    assert interface.resource_index.amount(tile) == resources.locations[tile]
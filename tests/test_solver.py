@@ -0,0 +1,96 @@
+"""Tests that the shortest path solvers agree with each other"""
+
+import numpy as np
+import pytest
+import maze
+import solver
+from solver import MazeSolver
+
+
+@pytest.fixture(params=[(3, 0), (8, 60)])
+def maze_data(request):
+    """A generated maze, with some of its interior walls knocked out to
+
+    make loops and several shortest paths
+
+    """
+
+    seed, openings = request.param
+    terrain = maze.MazeBuilder((33, 25), (10, 1, 3), seed=seed,
+                               progress=False).maze.terrain.copy()
+    rng = np.random.default_rng(seed)
+    walls = np.argwhere(~terrain[1:-1, 1:-1]) + 1
+    for x_pos, y_pos in walls[rng.choice(len(walls), openings,
+                                         replace=False)]:
+        terrain[x_pos, y_pos] = True
+    return maze.Maze(terrain, terrain.shape)
+
+
+def check_path(maze_data, path, start, goal):
+    positions = np.array([(tile.x, tile.y) for tile in path])
+    assert (path[0], path[-1]) == (start, goal)
+    assert maze_data.terrain[positions[:, 0], positions[:, 1]].all()
+    assert (np.abs(np.diff(positions, axis=0)).sum(axis=1) == 1).all()
+
+
+def test_solvers_agree(maze_data):
+    solve = MazeSolver(maze_data)
+    walkable = [maze.Tile(int(x), int(y))
+                for x, y in np.argwhere(maze_data.terrain)]
+    rng = np.random.default_rng(1)
+    for _ in range(40):
+        start, goal = (walkable[index]
+                       for index in rng.choice(len(walkable), 2))
+        distance = solve.distance(start, [goal])
+        assert distance >= 0
+        for method in (solve.bfs, solve.astar, solve.bidirectional,
+                       lambda start, goal: solve.path_to(start, [goal])):
+            path = method(start, goal)
+            check_path(maze_data, path, start, goal)
+            assert len(path) - 1 == distance
+
+
+def test_distance_field_is_closest_source(maze_data):
+    solve = MazeSolver(maze_data)
+    sources = [maze.Tile(int(x), int(y))
+               for x, y in np.argwhere(maze_data.terrain)[::97]]
+    field = solve.distance_field(sources)
+    single = np.stack([solve.distance_field([tile]) for tile in sources])
+    expected = np.where(maze_data.terrain, single.min(axis=0),
+                        solver.UNREACHABLE)
+    assert (field == expected).all()
+
+
+def test_unreachable_goal():
+    terrain = np.zeros((7, 5), dtype=bool)
+    terrain[1, 1:4] = terrain[3:6, 2] = True
+    solve = MazeSolver(maze.Maze(terrain, terrain.shape))
+    start, goal = maze.Tile(1, 1), maze.Tile(5, 2)
+    assert solve.bfs(start, goal) is None
+    assert solve.astar(start, goal) is None
+    assert solve.bidirectional(start, goal) is None
+    assert solve.path_to(start, [goal]) is None
+    assert solve.distance(start, [goal]) == solver.UNREACHABLE
+
+
+def test_same_start_and_goal(maze_data):
+    tile = maze.Tile(*np.argwhere(maze_data.terrain)[0].tolist())
+    assert MazeSolver(maze_data).bfs(tile, tile) == [tile]
+
+
+def test_rejects_wall_tiles(maze_data):
+    wall = maze.Tile(0, 0)
+    walkable = maze.Tile(*np.argwhere(maze_data.terrain)[0].tolist())
+    with pytest.raises(ValueError, match='wall'):
+        MazeSolver(maze_data).bfs(wall, walkable)
+
+
+def test_cached_results_are_copies(maze_data):
+    solve = MazeSolver(maze_data)
+    walkable = np.argwhere(maze_data.terrain)
+    start, goal = (maze.Tile(*walkable[0].tolist()),
+                   maze.Tile(*walkable[-1].tolist()))
+    solve.bfs(start, goal).clear()
+    assert solve.bfs(start, goal)[0] == start
+    with pytest.raises(ValueError):
+        solve.distance_field([goal])[0, 0] = 1
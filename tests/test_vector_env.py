@@ -0,0 +1,107 @@
+"""Tests of stepping and resetting VectorMazeEnv"""
+
+import numpy as np
+import pytest
+import maze
+import vector_env
+from vector_env import VectorMazeEnv
+
+
+@pytest.fixture
+def env():
+    return VectorMazeEnv(6, (15, 12), (4, 1, 2), auto_reset=False, seed=1)
+
+
+def reference_step(tile_types, position, action):
+    """Step a single agent with plain Python, returning its new position
+
+    and reward
+
+    """
+
+    x_step, y_step = vector_env.ACTION_OFFSETS[action].tolist()
+    target = (position[0] + x_step, position[1] + y_step)
+    tile = tile_types[target[0] + 1, target[1] + 1]
+    if tile == maze.WALL:
+        return position, 0.0
+    if tile == maze.RESOURCE:
+        tile_types[target[0] + 1, target[1] + 1] = maze.WALKABLE
+        return target, 1.0
+    return target, 0.0
+
+
+def test_reset_observations(env):
+    observations = env.reset()
+    assert observations.shape == (6, 3, 3)
+    for index, (x_pos, y_pos) in enumerate(env.positions.tolist()):
+        assert (observations[index]
+                == env.tile_types[index, x_pos:x_pos + 3,
+                                  y_pos:y_pos + 3]).all()
+    assert (env.steps == 0).all()
+    assert (env.remaining
+            == (env.tile_types == maze.RESOURCE).sum(axis=(1, 2))).all()
+
+
+def test_step_matches_single_agents(env):
+    rng = np.random.default_rng(0)
+    tile_types = env.tile_types.copy()
+    positions = [tuple(position) for position in env.positions.tolist()]
+    for _ in range(300):
+        actions = rng.integers(0, 4, env.num_envs)
+        observations, rewards, _ = env.step(actions)
+        expected = [reference_step(tile_types[index], positions[index],
+                                   action)
+                    for index, action in enumerate(actions.tolist())]
+        positions = [position for position, _ in expected]
+        assert env.positions.tolist() == [list(pos) for pos in positions]
+        assert rewards.tolist() == [reward for _, reward in expected]
+        assert (env.tile_types == tile_types).all()
+        assert (observations == env.observe()).all()
+    assert (env.steps == 300).all()
+
+
+def test_knowledge_holds_everything_seen(env):
+    rng = np.random.default_rng(1)
+    seen = env.knowledge != maze.UNKNOWN
+    for _ in range(50):
+        env.step(rng.integers(0, 4, env.num_envs))
+        now = env.knowledge != maze.UNKNOWN
+        assert (now >= seen).all()
+        seen = now
+    # Tiles outside the maze are seen as walls
+    padded = np.pad(env.knowledge, ((0, 0), (1, 1), (1, 1)),
+                    constant_values=maze.WALL)
+    for index, (x_pos, y_pos) in enumerate(env.positions.tolist()):
+        assert (padded[index, x_pos:x_pos + 3, y_pos:y_pos + 3]
+                == env.observe()[index]).all()
+
+
+def test_max_steps_auto_reset():
+    env = VectorMazeEnv(4, (15, 12), max_steps=5, seed=2)
+    for step in range(5):
+        _, _, dones = env.step(np.zeros(4, dtype=np.int64))
+        assert dones.all() == (step == 4)
+    assert (env.steps == 0).all()
+    assert (env.remaining == 1).all()
+
+
+def test_collecting_every_resource_ends_episode():
+    env = VectorMazeEnv(1, (15, 12), auto_reset=False, seed=3)
+    position = env.positions[0]
+    action = [action for action, offset
+              in enumerate(vector_env.ACTION_OFFSETS)
+              if (0 <= position + offset).all()
+              and (position + offset < env.dim).all()][0]
+    x_pos, y_pos = position + vector_env.ACTION_OFFSETS[action] + 1
+    env.tile_types[env.tile_types == maze.RESOURCE] = maze.WALKABLE
+    env.tile_types[0, x_pos, y_pos] = maze.RESOURCE
+    env.remaining[0] = 1
+    _, rewards, dones = env.step([action])
+    assert rewards.tolist() == [1.0] and dones.tolist() == [True]
+    assert env.remaining[0] == 0
+
+
+@pytest.mark.parametrize('actions', [[0, 1], [0] * 5 + [4]])
+def test_step_rejects_bad_actions(env, actions):
+    with pytest.raises(ValueError):
+        env.step(actions)
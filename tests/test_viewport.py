@@ -0,0 +1,166 @@
+"""Tests of the camera, the chunk cache and the trail drawn over the graph
+
+chunks
+
+"""
+
+import random
+import numpy
+import pygame
+import pytest
+import viewport
+from maze import Tile
+
+
+def random_walk(trail, dimensions, steps, seed=0):
+    """Walk the trail back and forth across a grid, recoloring the tiles
+
+    left behind like Sprite.color_trail
+
+    """
+
+    rng = random.Random(seed)
+    pos = Tile(dimensions[0] // 2, dimensions[1] // 2)
+    for _ in range(steps):
+        moves = [Tile(pos.x + x_step, pos.y + y_step)
+                 for x_step, y_step in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                 if 0 <= pos.x + x_step < dimensions[0]
+                 and 0 <= pos.y + y_step < dimensions[1]]
+        dest = rng.choice(moves)
+        trail.node(pos, viewport.TRAIL_OLD)
+        trail.edge(pos, dest, viewport.TRAIL_NEW)
+        trail.node(dest, viewport.TRAIL_NEW)
+        pos = dest
+
+
+@pytest.mark.parametrize('position, offset', [
+    ((500, 400), [300, 275]),
+    ((10, 10), [0, 0]),
+    ((1190, 990), [800, 750]),
+])
+def test_camera_clamps_to_world(position, offset):
+    camera = viewport.Camera(pygame.Rect(0, 0, 400, 250), (1200, 1000))
+    camera.follow(position)
+    assert camera.offset == offset
+
+
+def test_camera_centers_small_world_at_origin():
+    camera = viewport.Camera(pygame.Rect(0, 0, 800, 800), (480, 320))
+    assert not camera.follow((400, 300))
+    assert camera.offset == [0, 0]
+
+
+def test_camera_follow_reports_moves():
+    camera = viewport.Camera(pygame.Rect(0, 0, 400, 400), (1200, 1200))
+    assert camera.follow((600, 600))
+    assert not camera.follow((600, 600))
+    assert camera.follow((616, 600))
+
+
+def test_camera_maps_world_to_screen():
+    camera = viewport.Camera(pygame.Rect(20, 10, 400, 400), (1200, 1200))
+    camera.follow((600, 600))
+    assert camera.screen_position((400, 400)) == (20, 10)
+    assert camera.to_screen((384, 400, 32, 16)) == pygame.Rect(20, 10, 16, 16)
+    assert camera.to_screen((0, 0, 16, 16)).size == (0, 0)
+    assert camera.world_rect((0, 0, 100, 100)) == pygame.Rect(400, 400,
+                                                               80, 90)
+
+
+def chunk_cache(max_bytes: int, built: list) -> viewport.ChunkCache:
+    """A cache of 16x16 chunks recording the chunks it builds"""
+
+    def build(chunk_x, chunk_y):
+        built.append((chunk_x, chunk_y))
+        return pygame.Surface((16, 16))
+
+    return viewport.ChunkCache(build, (64, 64), 16, max_bytes)
+
+
+def test_chunk_cache_evicts_least_recently_used():
+    built = []
+    size = viewport.surface_bytes(pygame.Surface((16, 16)))
+    cache = chunk_cache(3 * size, built)
+    for chunk in [(0, 0), (1, 0), (2, 0)]:
+        cache.get(chunk)
+    cache.get((0, 0))
+    cache.get((3, 0))
+    assert cache.cached((1, 0)) is None
+    assert cache.cached((0, 0)) is not None
+    assert built == [(0, 0), (1, 0), (2, 0), (3, 0)]
+    assert cache.builds == 4
+
+
+def test_chunk_cache_respects_memory_cap():
+    built = []
+    size = viewport.surface_bytes(pygame.Surface((16, 16)))
+    cache = chunk_cache(5 * size, built)
+    for chunk in cache.chunks((0, 0, 64, 64)):
+        cache.get(chunk)
+        assert cache.nbytes <= cache.max_bytes
+    assert len(cache) == 5
+    assert cache.nbytes == 5 * size
+
+
+def test_chunk_cache_keeps_chunk_over_cap():
+    cache = chunk_cache(1, [])
+    surface = cache.get((0, 0))
+    assert cache.cached((0, 0)) is surface
+    cache.get((1, 0))
+    assert len(cache) == 1 and cache.cached((0, 0)) is None
+
+
+def test_chunk_cache_clips_edge_chunks():
+    cache = viewport.ChunkCache(None, (40, 20), 16)
+    assert cache.chunk_rect((2, 1)) == pygame.Rect(32, 16, 8, 4)
+    assert cache.chunks((30, 0, 100, 100)) == [(1, 0), (1, 1), (2, 0),
+                                               (2, 1)]
+    assert cache.chunks((50, 50, 10, 10)) == []
+
+
+def test_trail_memory_does_not_grow():
+    trail = viewport.Trail((8, 8))
+    random_walk(trail, (8, 8), 100)
+    trail.take_pending()
+    sizes = trail.nodes.nbytes, trail.edges.nbytes
+    random_walk(trail, (8, 8), 10000, seed=1)
+    trail.take_pending()
+    assert (trail.nodes.nbytes, trail.edges.nbytes) == sizes
+    assert not trail.pending
+
+
+def test_trail_incremental_draw_matches_rebuild():
+    dimensions = (12, 12)
+    size = viewport.TILE_SIZE
+    chunk = pygame.Rect(4 * size, 4 * size, 4 * size, 4 * size)
+    trail = viewport.Trail(dimensions)
+    incremental = pygame.Surface(chunk.size)
+    incremental.fill((0, 0, 0))
+    for seed in range(20):
+        random_walk(trail, dimensions, 10, seed)
+        for rect in trail.take_pending():
+            trail.draw(incremental, rect.clip(chunk), chunk.topleft)
+
+    rebuilt = pygame.Surface(chunk.size)
+    rebuilt.fill((0, 0, 0))
+    trail.draw(rebuilt, chunk, chunk.topleft)
+    assert (pygame.image.tobytes(incremental, 'RGB')
+            == pygame.image.tobytes(rebuilt, 'RGB'))
+    assert numpy.any(pygame.surfarray.array3d(rebuilt))
+
+
+def test_trail_records_only_changes():
+    trail = viewport.Trail((4, 4))
+    trail.node(Tile(1, 1), viewport.TRAIL_NEW)
+    trail.edge(Tile(1, 1), Tile(1, 2), viewport.TRAIL_NEW)
+    trail.take_pending()
+    trail.node(Tile(1, 1), viewport.TRAIL_NEW)
+    trail.edge(Tile(1, 2), Tile(1, 1), viewport.TRAIL_NEW)
+    assert not trail.take_pending()
+    assert trail.edges[1, 1, 1] == viewport.TRAIL_NEW
+
+
+def test_trail_edge_rejects_distant_tiles():
+    trail = viewport.Trail((4, 4))
+    with pytest.raises(ValueError):
+        trail.edge(Tile(0, 0), Tile(1, 1), viewport.TRAIL_NEW)